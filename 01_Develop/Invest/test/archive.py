@@ -0,0 +1,134 @@
+import glob
+import os
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+import gap_planner
+
+
+# 🔹 1분봉 Parquet 보관소
+# - 장이 끝난 날짜의 1분봉을 hot 테이블(SOXL_minute_data / minute_bars)에서 빼서
+#   root/symbol=SOXL/date=2025-03-03/bars.parquet 로 저장 (zstd 압축, row group 통계 포함)
+# - hot 테이블에 남기는 기간 = keep_days 일과 누락 탐지 구간(gap_planner.scan_start, 거래일 기준) 중 긴 쪽
+#   (휴장일이 끼어도 누락 탐지 구간의 분봉은 hot 테이블에 있음 → 보관한 날짜를 다시 받지 않음)
+# - 같은 날짜를 다시 보관하면 기존 파일과 합쳐 다시 씀 (hot 쪽 값 우선)
+# - minute_history 뷰: Parquet 보관분 + hot 테이블을 하나로 조회
+#   symbol / date 조건을 주면 해당 파티션 파일만 읽는다 (hive 파티션 pruning)
+
+ROW_GROUP_SIZE = 100_000
+PRICE_COLUMNS = "time, open, high, low, close, volume"
+
+
+def _partition_dir(root, symbol, day):
+    return os.path.join(root, f"symbol={symbol}", f"date={day.isoformat()}")
+
+
+def _hot_select(table, symbol):
+    """hot 테이블을 (symbol, time, ohlcv) 형태로 맞추는 SELECT"""
+    if symbol is None:
+        return f"SELECT symbol, {PRICE_COLUMNS} FROM {table}"
+    return f"SELECT '{symbol}' AS symbol, {PRICE_COLUMNS} FROM {table}"
+
+
+def cutoff(today=None, keep_days=7, lookback_days=None):
+    """hot 테이블에 남길 첫 날짜 (이 날짜 이전만 보관 대상)"""
+    today = today or datetime.now().date()
+    before = today - timedelta(days=keep_days)
+    if lookback_days is not None:
+        before = min(before, gap_planner.scan_start(today, lookback_days).date())
+    return before
+
+
+def archive_closed_days(con, root, table='SOXL_minute_data', symbol='SOXL', keep_days=7, today=None,
+                        lookback_days=None):
+    """cutoff 이전 날짜를 Parquet 로 옮기고 hot 테이블에서 삭제
+
+    symbol=None 이면 table 에 symbol 컬럼이 있는 것으로 보고 종목별로 나눠 저장한다.
+    lookback_days 를 주면 그 거래일 수만큼은 keep_days 보다 오래돼도 hot 테이블에 남긴다.
+    """
+    before = cutoff(today, keep_days, lookback_days)
+    hot = _hot_select(table, symbol)
+
+    days = con.execute(f"""
+        SELECT DISTINCT symbol, CAST(time AS DATE) AS day FROM ({hot})
+        WHERE time < ? ORDER BY day
+    """, [datetime.combine(before, datetime.min.time())]).fetchall()
+
+    archived = 0
+    for sym, day in days:
+        part_dir = _partition_dir(root, sym, day)
+        os.makedirs(part_dir, exist_ok=True)
+        path = os.path.join(part_dir, "bars.parquet")
+        tmp = path + ".tmp"
+        start, end = datetime.combine(day, datetime.min.time()), datetime.combine(day + timedelta(days=1), datetime.min.time())
+
+        rows = f"SELECT {PRICE_COLUMNS} FROM ({hot}) WHERE symbol = ? AND time >= ? AND time < ?"
+        params = [sym, start, end]
+        if os.path.exists(path):
+            # 기존 보관 파일과 병합 (같은 시각이면 hot 테이블 값 사용)
+            rows = f"""
+                {rows}
+                UNION ALL
+                SELECT {PRICE_COLUMNS} FROM read_parquet('{path}')
+                WHERE time NOT IN (SELECT time FROM ({hot}) WHERE symbol = ? AND time >= ? AND time < ?)
+            """
+            params = params * 2
+
+        con.execute(f"""
+            COPY ({rows} ORDER BY time)
+            TO '{tmp}' (FORMAT PARQUET, COMPRESSION ZSTD, ROW_GROUP_SIZE {ROW_GROUP_SIZE})
+        """, params)
+        os.replace(tmp, path)
+
+        if symbol is None:
+            con.execute(f"DELETE FROM {table} WHERE symbol = ? AND time >= ? AND time < ?", [sym, start, end])
+        else:
+            con.execute(f"DELETE FROM {table} WHERE time >= ? AND time < ?", [start, end])
+        archived += 1
+
+    if archived:
+        print(f"📦 {archived}개 일자 Parquet 보관 완료 ({root})")
+    return archived
+
+
+def last_archived_day(root, symbol='SOXL'):
+    """Parquet 로 보관한 마지막 날짜 (없으면 None)"""
+    days = [os.path.basename(d)[len("date="):] for d in glob.glob(os.path.join(root, f"symbol={symbol}", "date=*"))]
+    return max(datetime.strptime(d, "%Y-%m-%d").date() for d in days) if days else None
+
+
+def _archive_glob(root):
+    return os.path.join(root, "symbol=*", "date=*", "*.parquet")
+
+
+def create_history_view(con, root, table='SOXL_minute_data', symbol='SOXL', view='minute_history',
+                        watch_table=None):
+    """보관분 + hot 테이블 통합 뷰 (컬럼: symbol, date, time, open, high, low, close, volume)
+
+    watch_table: symbol 컬럼이 있는 감시 종목 테이블 (minute_bars), table 의 종목과 겹치는 행은 제외
+    """
+    hot = f"SELECT symbol, CAST(time AS DATE) AS date, {PRICE_COLUMNS} FROM ({_hot_select(table, symbol)})"
+    if watch_table:
+        hot += f"""
+            UNION ALL
+            SELECT symbol, CAST(time AS DATE) AS date, {PRICE_COLUMNS} FROM {watch_table} WHERE symbol <> '{symbol}'
+        """
+    if glob.glob(_archive_glob(root)):
+        cold = f"""
+            SELECT symbol, date, {PRICE_COLUMNS}
+            FROM read_parquet('{_archive_glob(root)}', hive_partitioning = true, hive_types = {{'date': DATE}})
+        """
+        con.execute(f"CREATE OR REPLACE VIEW {view} AS {cold} UNION ALL {hot}")
+    else:
+        con.execute(f"CREATE OR REPLACE VIEW {view} AS {hot}")
+
+
+def read_history(con, symbol, start, end, view='minute_history'):
+    """[start, end] 구간 1분봉 (date 조건으로 필요한 파티션만 읽음)"""
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    return con.execute(f"""
+        SELECT {PRICE_COLUMNS} FROM {view}
+        WHERE symbol = ? AND date BETWEEN ? AND ? AND time BETWEEN ? AND ?
+        ORDER BY time
+    """, [symbol, start.date(), end.date(), start.to_pydatetime(), end.to_pydatetime()]).df()
@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+
+import main_s
+
+
+# 🔹 백테스트 엔진 (롱 전용, 벡터 연산)
+# - 저장된 1분봉을 N분봉으로 묶은 뒤 main_s 의 시그널 함수를 그대로 적용
+# - 시그널은 봉 마감에 발생, 체결은 다음 봉 시가 (슬리피지 / 수수료 bps 반영)
+# - 결과: 거래 목록, 자산 곡선, 요약 통계 (수익률, MDD, 샤프, 회전율 등)
+#
+#   result = backtest.run(df_minute, interval=15)
+#   print(result['stats'])
+
+
+def resample(df, interval):
+    """1분봉(time 또는 datetime 컬럼) → interval 분봉"""
+    time_col = 'time' if 'time' in df.columns else 'datetime'
+    return df.resample(f'{interval}min', on=time_col).agg({
+        'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'
+    }).dropna().reset_index().rename(columns={time_col: 'time'})
+
+
+def prepare(df):
+    """main_s.prepare_frame 과 같은 전처리 (뉴욕 시간 인덱스, float 변환, 시그널 컬럼 초기화)"""
+    return main_s.prepare_frame(df)
+
+
+# 시그널 파라미터 기본값 (main_s.SIGNAL_CONFIG 와 동일)
+DEFAULT_PARAMS = {k: main_s.SIGNAL_CONFIG[k] for k in (
+    'macd_fast', 'macd_slow', 'macd_signal', 'rsi_window', 'rsi_lower', 'rsi_upper',
+)}
+
+
+def apply_signals(df, use_macd=True, use_rsi=False, **params):
+    """main_s.apply_signals 로 매매 시그널만 계산 (차트용 밴드 지표는 생략)"""
+    return main_s.apply_signals(df, {
+        'macd': use_macd, 'rsi': use_rsi, 'bollinger': False, 'hedging_band': False, **params,
+    })
+
+
+def positions(buy, sell):
+    """시그널 → 봉별 보유 비중 (다음 봉 시가부터 반영, 같은 봉에 매수·매도가 겹치면 무시)"""
+    event = np.where(buy & ~sell, 1.0, np.where(sell & ~buy, 0.0, np.nan))
+    state = pd.Series(event).ffill().fillna(0.0).to_numpy()
+    pos = np.zeros(len(state))
+    pos[1:] = state[:-1]
+    return pos
+
+
+def simulate(df, slippage_bps=5.0, commission_bps=2.5, initial_capital=10_000.0):
+    """시그널이 붙은 봉 데이터로 체결 / 자산 곡선 계산"""
+    open_ = df['open'].to_numpy()
+    close = df['close'].to_numpy()
+    pos = positions(df['buy_signal'].to_numpy(bool), df['sell_signal'].to_numpy(bool))
+
+    prev_close = np.empty_like(close)
+    prev_close[:1] = open_[:1]  # 빈 구간이면 그대로 빈 배열
+    prev_close[1:] = close[:-1]
+    prev_pos = np.zeros_like(pos)
+    prev_pos[1:] = pos[:-1]
+
+    # 직전 종가 → 시가 구간은 이전 비중, 시가 → 종가 구간은 새 비중 (두 구간 수익률은 복리로 연결)
+    gross = (1 + prev_pos * (open_ / prev_close - 1)) * (1 + pos * (close / open_ - 1)) - 1
+    turnover = np.abs(pos - prev_pos)
+    cost = turnover * (slippage_bps + commission_bps) / 1e4
+    equity = initial_capital * np.cumprod(1 + gross - cost)
+
+    curve = pd.DataFrame({'position': pos, 'return': gross - cost, 'equity': equity}, index=df.index)
+    return curve, _trades(df.index, open_, pos, prev_pos, slippage_bps, commission_bps)
+
+
+def _trades(index, open_, pos, prev_pos, slippage_bps, commission_bps):
+    entries = np.flatnonzero((pos > 0) & (prev_pos == 0))
+    exits = np.flatnonzero((pos == 0) & (prev_pos > 0))
+    slip = slippage_bps / 1e4
+    fee = commission_bps / 1e4
+
+    n = len(entries)
+    exit_idx = np.full(n, -1)
+    exit_idx[:len(exits)] = exits[:n]
+    closed = exit_idx >= 0
+
+    entry_price = open_[entries] * (1 + slip)
+    exit_price = np.where(closed, open_[np.where(closed, exit_idx, 0)] * (1 - slip), np.nan)
+    return pd.DataFrame({
+        'entry_time': index[entries],
+        'entry_price': entry_price,
+        'exit_time': [index[i] if i >= 0 else pd.NaT for i in exit_idx],
+        'exit_price': exit_price,
+        'return': exit_price * (1 - fee) / (entry_price * (1 + fee)) - 1,
+        'bars_held': np.where(closed, exit_idx - entries, len(pos) - entries),
+    })
+
+
+def summarize(curve, trades, interval, initial_capital=10_000.0):
+    """요약 통계 (interval 은 호출 호환용, 연율화는 curve 의 거래일당 봉 수로 계산)"""
+    if curve.empty:
+        # 봉이 없는 구간 / 파라미터 조합 → 0 통계 (sweep 풀 전체가 멈추지 않도록)
+        return {'start': None, 'end': None, 'bars': 0, 'total_return': 0.0, 'max_drawdown': 0.0, 'sharpe': 0.0,
+                'trades': len(trades), 'win_rate': 0.0, 'avg_trade_return': 0.0, 'turnover': 0.0, 'exposure': 0.0}
+    equity = curve['equity'].to_numpy()
+    returns = curve['return'].to_numpy()
+    # 연율화는 실제 거래일당 봉 수 기준 (프리 / 애프터마켓 04:00 ~ 20:00 포함 데이터도 그대로)
+    days = pd.DatetimeIndex(curve.index).normalize().nunique()
+    bars_per_year = 252 * len(curve) / days
+    drawdown = equity / np.maximum.accumulate(equity) - 1
+    closed = trades.dropna(subset=['exit_price'])
+    std = returns.std()
+    return {
+        'start': curve.index[0],
+        'end': curve.index[-1],
+        'bars': len(curve),
+        'total_return': equity[-1] / initial_capital - 1,
+        'max_drawdown': drawdown.min(),
+        'sharpe': returns.mean() / std * np.sqrt(bars_per_year) if std > 0 else 0.0,
+        'trades': len(trades),
+        'win_rate': (closed['return'] > 0).mean() if len(closed) else 0.0,
+        'avg_trade_return': closed['return'].mean() if len(closed) else 0.0,
+        'turnover': np.abs(np.diff(curve['position'].to_numpy(), prepend=0)).sum(),
+        'exposure': curve['position'].mean(),
+    }
+
+
+def run(df_minute, interval=15, use_macd=True, use_rsi=False, slippage_bps=5.0, commission_bps=2.5,
+        initial_capital=10_000.0, **params):
+    """1분봉 DataFrame(time/datetime, open, high, low, close, volume) 백테스트
+
+    params: DEFAULT_PARAMS 의 키 (macd_fast, rsi_window 등) 로 시그널 파라미터 변경
+    """
+    bars = prepare(resample(df_minute, interval) if interval > 1 else df_minute)
+    bars = apply_signals(bars, use_macd=use_macd, use_rsi=use_rsi, **params)
+    curve, trades = simulate(bars, slippage_bps, commission_bps, initial_capital)
+    return {'bars': bars, 'equity': curve, 'trades': trades, 'stats': summarize(curve, trades, interval, initial_capital)}
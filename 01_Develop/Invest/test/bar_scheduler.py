@@ -0,0 +1,129 @@
+import threading
+import time
+from datetime import datetime, timezone
+
+
+# 🔹 봉 마감 스케줄러
+# - 다음 봉 경계(+ offset 초)까지 한 번에 sleep (0.5초 폴링 / now.second == 3 판정 없음)
+# - 대기는 time.monotonic 기준이라 시스템 시각 보정(NTP 등)에 흔들리지 않음
+# - 작업이 길어지거나 PC 절전 등으로 경계를 놓치면 missed 개수를 넘겨서 한 번에 따라잡음
+# - 작업은 의존 관계가 있는 단계(Pipeline)로 실행하고 단계별 소요 시간을 기록
+#
+#   pipeline = bar_scheduler.Pipeline()
+#   pipeline.add('ingest', ingest)
+#   pipeline.add('analysis', analyze, deps=['ingest'])
+#   bar_scheduler.BarScheduler(pipeline, interval=60, offset=2).run_forever()
+
+
+class BarClock:
+    """interval 초 봉 경계 + offset 초마다 깨어나는 시계"""
+
+    def __init__(self, interval=60, offset=2.0, stop_event=None):
+        self.interval = interval
+        self.offset = offset
+        self.stop_event = stop_event or threading.Event()
+        self._last = None
+
+    def _boundary(self, wall):
+        return (wall - self.offset) // self.interval * self.interval
+
+    def wait_next(self):
+        """다음 봉 경계까지 대기 후 (봉 마감 시각 epoch, 놓친 경계 수) 반환, 중지되면 None"""
+        target = (self._boundary(time.time()) + self.interval) if self._last is None else self._last + self.interval
+        deadline = time.monotonic() + max(0.0, target + self.offset - time.time())
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            if self.stop_event.wait(remaining):
+                return None
+
+        # 깨어난 시점 기준 가장 최근 경계 (작업 지연으로 여러 개를 건너뛰었으면 missed > 0)
+        current = max(target, self._boundary(time.time()))
+        missed = int((current - target) // self.interval)
+        self._last = current
+        return current, missed
+
+    def stop(self):
+        self.stop_event.set()
+
+
+class Pipeline:
+    """의존 관계가 있는 작업 묶음 (등록 순서를 유지한 위상 정렬 순서로 실행)"""
+
+    def __init__(self):
+        self.stages = {}
+        self.stats = {}
+
+    def add(self, name, fn, deps=(), when=None):
+        """fn(ctx) 등록, deps 단계가 모두 성공해야 실행 / when(ctx) 가 False 면 건너뜀"""
+        for dep in deps:
+            if dep not in self.stages:
+                raise ValueError(f"등록되지 않은 단계: {dep}")
+        self.stages[name] = (fn, tuple(deps), when)
+        self.stats[name] = {'runs': 0, 'errors': 0, 'total': 0.0, 'max': 0.0}
+        return self
+
+    def run(self, ctx):
+        """모든 단계 실행 → {단계: 소요 초}, 실패 / 건너뛴 단계는 이후 의존 단계도 건너뜀"""
+        done, timings = set(), {}
+        for name, (fn, deps, when) in self.stages.items():
+            if any(dep not in done for dep in deps):
+                continue
+            if when is not None and not when(ctx):
+                continue
+
+            started = time.perf_counter()
+            stat = self.stats[name]
+            try:
+                ctx[name] = fn(ctx)
+                done.add(name)
+            except Exception as e:
+                stat['errors'] += 1
+                print(f"❌ [{name}] 단계 오류:", e)
+            elapsed = time.perf_counter() - started
+            timings[name] = elapsed
+            stat['runs'] += 1
+            stat['total'] += elapsed
+            stat['max'] = max(stat['max'], elapsed)
+        return timings
+
+
+class BarScheduler:
+    """봉 마감마다 Pipeline 실행"""
+
+    def __init__(self, pipeline, interval=60, offset=2.0, tz=None, context=None, verbose=True):
+        """context(ctx): 매 봉마다 단계 실행 전에 ctx 에 합칠 값 (ex. 장 구간 판정)"""
+        self.pipeline = pipeline
+        self.clock = BarClock(interval, offset)
+        self.tz = tz
+        self.context = context
+        self.verbose = verbose
+
+    def run_once(self, bar_close, missed=0):
+        wall = datetime.fromtimestamp(bar_close, tz=timezone.utc)
+        ctx = {
+            'bar_close': wall.astimezone(self.tz) if self.tz else wall,
+            'missed': missed,
+        }
+        if self.context is not None:
+            ctx.update(self.context(ctx))
+        if missed:
+            print(f"⚠️ 봉 경계 {missed}개 놓침 → 이번 실행에서 보완")
+        timings = self.pipeline.run(ctx)
+
+        if self.verbose and timings:
+            lag = time.time() - bar_close
+            stages = " · ".join(f"{name} {sec:.2f}s" for name, sec in timings.items())
+            print(f"⏱ {ctx['bar_close']:%H:%M} 마감 | {stages} | 마감 후 {lag:.2f}s")
+        return ctx
+
+    def run_forever(self):
+        while True:
+            tick = self.clock.wait_next()
+            if tick is None:
+                return
+            self.run_once(*tick)
+
+    def stop(self):
+        self.clock.stop()
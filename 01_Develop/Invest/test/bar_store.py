@@ -0,0 +1,137 @@
+import pandas as pd
+
+
+# 🔹 다중 시간봉 저장소 (5분 / 15분 / 60분 / 일봉)
+# - 1분봉이 저장될 때 해당 시각이 속한 구간만 다시 집계해서 bars_* 테이블에 upsert
+#   (보관된 날짜에 늦게 채운 분봉은 재집계하지 않음 → hot 테이블 일부 분봉으로 일봉 / 60분봉을 덮어쓰지 않음)
+# - 분석 쪽은 원본 1분봉을 매번 다시 읽고 resample 하지 않고 집계된 봉을 바로 조회
+# - DuckDB: time_bucket + arg_min / arg_max 로 시가 / 종가
+# - MySQL : ROW_NUMBER() 윈도 함수로 시가 / 종가 (GROUP_CONCAT 문자열 생성 없음)
+
+TIMEFRAMES = {5: 'bars_5m', 15: 'bars_15m', 60: 'bars_60m', 1440: 'bars_1d'}
+
+
+def table_for(interval):
+    """분 단위 간격에 해당하는 봉 테이블 이름 (없으면 None)"""
+    return TIMEFRAMES.get(interval)
+
+
+def bucket_start(ts, interval):
+    ts = pd.Timestamp(ts)
+    return ts.floor('D') if interval == 1440 else ts.floor(f'{interval}min')
+
+
+# DuckDB ###############################################################################
+
+def init_duckdb(con, source='SOXL_minute_data'):
+    for interval, table in TIMEFRAMES.items():
+        con.execute(f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            time TIMESTAMP PRIMARY KEY,
+            open DECIMAL(18,8),
+            high DECIMAL(18,8),
+            low DECIMAL(18,8),
+            close DECIMAL(18,8),
+            volume DECIMAL(18,8)
+        )
+        """)
+    # 기존 1분봉은 있는데 봉 테이블이 비어 있으면 한 번 전체 집계
+    if con.execute(f"SELECT COUNT(*) FROM {TIMEFRAMES[15]}").fetchone()[0] == 0:
+        refresh_duckdb(con, None, source)
+
+
+def refresh_duckdb(con, since, source='SOXL_minute_data', not_before=None):
+    """since 이후(구간 시작 기준) 1분봉으로 모든 시간봉 재집계, since=None 이면 전체
+
+    not_before: 이 시각 이전 구간은 다시 집계하지 않음 (Parquet 로 보관한 날짜 = source 에 일부만 남은 날짜)
+    """
+    if not_before is not None:
+        not_before = pd.Timestamp(not_before)
+        since = not_before if since is None else max(pd.Timestamp(since), not_before)
+    for interval, table in TIMEFRAMES.items():
+        bucket = "INTERVAL '1 day'" if interval == 1440 else f"INTERVAL '{interval} minutes'"
+        where, params = "", []
+        if since is not None:
+            where, params = "WHERE time >= ?", [bucket_start(since, interval).to_pydatetime()]
+        con.execute(f"""
+            INSERT OR REPLACE INTO {table} (time, open, high, low, close, volume)
+            SELECT
+                time_bucket({bucket}, time) AS bucket,
+                arg_min(open, time), MAX(high), MIN(low), arg_max(close, time), SUM(volume)
+            FROM {source}
+            {where}
+            GROUP BY bucket
+        """, params)
+
+
+def read_duckdb(con, interval, limit):
+    """최근 limit 개 봉 (시간 오름차순)"""
+    return con.execute(f"""
+        SELECT time, open, high, low, close, volume FROM (
+            SELECT * FROM {table_for(interval)} ORDER BY time DESC LIMIT {int(limit)}
+        ) ORDER BY time ASC
+    """).df()
+
+
+# MySQL ################################################################################
+
+def _mysql_bucket(interval):
+    if interval == 1440:
+        return "TIMESTAMP(DATE(`time`))"
+    seconds = interval * 60
+    return f"FROM_UNIXTIME(UNIX_TIMESTAMP(`time`) - MOD(UNIX_TIMESTAMP(`time`), {seconds}))"
+
+
+def init_mysql(conn, source='SOXL_minute_data'):
+    with conn.cursor() as cursor:
+        for table in TIMEFRAMES.values():
+            cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                `time` DATETIME PRIMARY KEY,
+                open DECIMAL(18,8),
+                high DECIMAL(18,8),
+                low DECIMAL(18,8),
+                close DECIMAL(18,8),
+                volume DECIMAL(18,8)
+            )
+            """)
+        cursor.execute(f"SELECT COUNT(*) FROM {TIMEFRAMES[15]}")
+        empty = cursor.fetchone()[0] == 0
+    if empty:
+        refresh_mysql(conn, None, source)
+
+
+def refresh_mysql(conn, since, source='SOXL_minute_data'):
+    with conn.cursor() as cursor:
+        for interval, table in TIMEFRAMES.items():
+            where, params = "", []
+            if since is not None:
+                where, params = "WHERE `time` >= %s", [bucket_start(since, interval).strftime('%Y-%m-%d %H:%M:%S')]
+            cursor.execute(f"""
+                INSERT INTO {table} (`time`, open, high, low, close, volume)
+                SELECT bucket, MAX(CASE WHEN rn_first = 1 THEN open END), MAX(high), MIN(low),
+                       MAX(CASE WHEN rn_last = 1 THEN close END), SUM(volume)
+                FROM (
+                    SELECT bucket, open, high, low, close, volume,
+                        ROW_NUMBER() OVER (PARTITION BY bucket ORDER BY actual_time ASC) AS rn_first,
+                        ROW_NUMBER() OVER (PARTITION BY bucket ORDER BY actual_time DESC) AS rn_last
+                    FROM (
+                        SELECT {_mysql_bucket(interval)} AS bucket, `time` AS actual_time, open, high, low, close, volume
+                        FROM {source}
+                        {where}
+                    ) AS raw
+                ) AS ranked
+                GROUP BY bucket
+                ON DUPLICATE KEY UPDATE
+                    open=VALUES(open), high=VALUES(high), low=VALUES(low), close=VALUES(close), volume=VALUES(volume)
+            """, params)
+
+
+def read_mysql(conn, interval, limit):
+    df = pd.read_sql(f"""
+        SELECT `time`, open, high, low, close, volume FROM (
+            SELECT * FROM {table_for(interval)} ORDER BY `time` DESC LIMIT {int(limit)}
+        ) AS recent
+        ORDER BY `time` ASC
+    """, conn)
+    return df
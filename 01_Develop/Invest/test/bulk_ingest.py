@@ -0,0 +1,64 @@
+import time
+
+
+# 🔹 분봉 대량 저장 (iterrows 없는 컬럼 단위 처리)
+# - DuckDB: DataFrame 을 뷰로 등록 후 INSERT OR REPLACE ... SELECT 한 번으로 저장
+# - MySQL : 여러 행을 한 문장에 담은 VALUES 배치 + ON DUPLICATE KEY UPDATE
+# - 두 방식 모두 기존과 같은 upsert(같은 시각이면 덮어쓰기) 동작, 처리 속도(rows/s) 반환
+#
+# df 컬럼: datetime, open, high, low, close, volume (+ symbol, excd 등 추가 키 컬럼)
+
+PRICE_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+
+def _report(rows, started):
+    elapsed = time.perf_counter() - started
+    rate = rows / elapsed if elapsed > 0 else float('inf')
+    return {'rows': rows, 'seconds': elapsed, 'rows_per_sec': rate}
+
+
+def duckdb_upsert(con, table, df, key_columns=()):
+    """DuckDB 테이블에 DataFrame 전체를 한 번에 upsert"""
+    started = time.perf_counter()
+    if df.empty:
+        return _report(0, started)
+
+    view = f"_ingest_{table}"
+    frame = df[list(key_columns) + ['datetime'] + PRICE_COLUMNS]
+    con.register(view, frame)
+    try:
+        cols = list(key_columns) + ['time'] + PRICE_COLUMNS
+        select = list(key_columns) + ['CAST(datetime AS TIMESTAMP)'] + [f'CAST({c} AS DECIMAL(18,8))' for c in PRICE_COLUMNS]
+        con.execute(f"""
+            INSERT OR REPLACE INTO {table} ({', '.join(cols)})
+            SELECT {', '.join(select)} FROM {view}
+        """)
+    finally:
+        con.unregister(view)
+    return _report(len(frame), started)
+
+
+def mysql_upsert(conn, table, df, key_columns=(), batch_size=1000):
+    """MySQL 테이블에 multi-row VALUES 배치로 upsert (배치당 왕복 1회)"""
+    started = time.perf_counter()
+    if df.empty:
+        return _report(0, started)
+
+    cols = list(key_columns) + ['time'] + PRICE_COLUMNS
+    columns = [df[c].tolist() for c in key_columns]
+    columns.append(df['datetime'].dt.strftime('%Y-%m-%d %H:%M:%S').tolist())
+    columns += [df[c].tolist() for c in PRICE_COLUMNS]
+    rows = list(zip(*columns))
+
+    placeholder = '(' + ', '.join(['%s'] * len(cols)) + ')'
+    update = ', '.join(f'{c}=VALUES({c})' for c in PRICE_COLUMNS)
+    with conn.cursor() as cursor:
+        for i in range(0, len(rows), batch_size):
+            batch = rows[i:i + batch_size]
+            sql = (
+                f"INSERT INTO {table} ({', '.join(cols)}) VALUES "
+                + ', '.join([placeholder] * len(batch))
+                + f" ON DUPLICATE KEY UPDATE {update}"
+            )
+            cursor.execute(sql, [v for row in batch for v in row])
+    return _report(len(rows), started)
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+
+# 🔹 해외주식 분봉(inquire-time-itemchartprice) output2 → 고정 스키마 DataFrame
+# - xymd / xhms 문자열을 정수로 한 번 변환 → 날짜 · 시각을 정수 연산으로 int64 epoch(ns) 계산
+#   (date + time.str.zfill(6) 문자열 결합 / format 파싱 없음)
+# - 가격 · 거래량은 바로 float64 (이후 astype(float) 불필요)
+# - 응답은 최신순이라 역순 view 로 시간순 정렬 (순서가 섞여 있을 때만 argsort)
+#
+#   df = chart_decoder.decode(main_api.get_overseas_price_quot_inquire_time_itemchartprice(...))
+#
+# 시각은 응답 그대로 뉴욕 현지시각(tz 없음) = DB 에 저장된 time 컬럼과 동일
+
+COLUMNS = ['datetime', 'open', 'high', 'low', 'close', 'volume']
+SOURCE = {'open': 'open', 'high': 'high', 'low': 'low', 'close': 'last', 'volume': 'evol'}
+
+_NS_PER_SECOND = 1_000_000_000
+_NS_PER_DAY = 86_400 * _NS_PER_SECOND
+
+
+def empty(extra=None):
+    """빈 결과 (컬럼 / dtype 고정)"""
+    columns = {'datetime': np.array([], dtype='datetime64[ns]')}
+    columns.update({col: np.array([], dtype=np.float64) for col in COLUMNS[1:]})
+    for col, value in (extra or {}).items():
+        columns[col] = np.array([], dtype=object)
+    return pd.DataFrame(columns)
+
+
+def _ints(values):
+    arr = np.asarray(values)
+    if arr.dtype == object:
+        arr = arr.astype(str)
+    return arr.astype(np.int64)
+
+
+def epoch_ns(xymd, xhms):
+    """YYYYMMDD / HHMMSS 문자열 배열 → int64 epoch(ns)"""
+    ymd, hms = _ints(xymd), _ints(xhms)
+    months = (ymd // 10000 - 1970) * 12 + (ymd // 100 % 100 - 1)
+    days = months.astype('datetime64[M]').astype('datetime64[D]').astype(np.int64) + (ymd % 100 - 1)
+    seconds = hms // 10000 * 3600 + hms // 100 % 100 * 60 + hms % 100
+    return days * _NS_PER_DAY + seconds * _NS_PER_SECOND
+
+
+def decode(output2, extra=None):
+    """output2 (APIResp.frame / columns 결과) → datetime + OHLCV float64, 시간순
+
+    extra: 모든 행에 같은 값으로 붙일 컬럼 (ex. {'symbol': 'SOXL', 'excd': 'AMS'})
+    """
+    if output2 is None or len(output2) == 0 or len(output2['xymd']) == 0:
+        return empty(extra)
+
+    ns = epoch_ns(output2['xymd'], output2['xhms'])
+    if len(ns) > 1 and np.all(ns[:-1] > ns[1:]):
+        order = slice(None, None, -1)  # 최신순 응답 → 역순 view
+    elif len(ns) > 1 and not np.all(ns[:-1] < ns[1:]):
+        order = np.argsort(ns, kind='stable')
+    else:
+        order = slice(None)
+
+    columns = {'datetime': ns[order].view('datetime64[ns]')}
+    for col in COLUMNS[1:]:
+        values = np.asarray(output2[SOURCE[col]])
+        if values.dtype == object:
+            values = values.astype(str)
+        try:
+            values = values.astype(np.float64)
+        except ValueError:  # 빈 문자열 등은 NaN
+            values = pd.to_numeric(values, errors='coerce').astype(np.float64)
+        columns[col] = values[order]
+    for col, value in (extra or {}).items():
+        columns[col] = value
+    return pd.DataFrame(columns)
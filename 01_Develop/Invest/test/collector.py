@@ -0,0 +1,130 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+import bulk_ingest
+import chart_decoder
+import kis_scheduler
+import main_api
+import page_buffer
+
+
+# 🔹 여러 종목 동시 수집기
+# - watchlist: [(거래소코드, 종목코드), ...]  ex) [("AMS", "SOXL"), ("NAS", "TQQQ")]
+# - 모든 종목이 kis_auth 의 호출 스케줄러(앱키별 초당 한도)를 공유하면서 스레드풀로 병렬 조회
+# - 페이지는 page_buffer.PageAccumulator 로 누적 (페이지마다 concat / drop_duplicates / sort_values 없음)
+# - 결과는 종목 컬럼을 포함한 하나의 테이블(minute_bars)에 저장 (DuckDB: duckDB_main, MySQL: main.py)
+
+DEFAULT_WATCHLIST = [("AMS", "SOXL")]
+MINUTE_BAR_COLUMNS = ['symbol', 'excd', 'datetime', 'open', 'high', 'low', 'close', 'volume']
+
+
+def parse_watchlist(items):
+    """config 의 watchlist ("AMS:SOXL" 문자열 또는 [excd, symbol] 목록) 정리"""
+    watchlist = []
+    for item in items or DEFAULT_WATCHLIST:
+        if isinstance(item, str):
+            excd, symbol = item.split(':')
+        else:
+            excd, symbol = item
+        watchlist.append((excd.strip().upper(), symbol.strip().upper()))
+    return watchlist
+
+
+def fetch_symbol(excd, symbol, pages=1, min_interval='1', nrec='120'):
+    """한 종목의 분봉을 최근부터 pages 페이지만큼 조회 (keyb 커서로 과거 방향)"""
+    acc = page_buffer.PageAccumulator(capacity=int(nrec) * pages)
+    keyb = ""
+    for i in range(pages):
+        rt_data = main_api.get_overseas_price_quot_inquire_time_itemchartprice(
+            div="02", excd=excd, itm_no=symbol, nmin=min_interval, pinc="1",
+            next_value="1" if i > 0 else "0", nrec=nrec, keyb=keyb
+        )
+        df = chart_decoder.decode(rt_data)
+        if df.empty:
+            break
+        acc.add(df)
+        keyb = df.iloc[0]['datetime'].strftime('%Y%m%d%H%M%S')
+
+    df = acc.finish()
+    df['symbol'], df['excd'] = symbol, excd
+    return df[MINUTE_BAR_COLUMNS]
+
+
+def _fetch_symbol_backfill(excd, symbol, pages):
+    with kis_scheduler.priority(kis_scheduler.PRIORITY_BACKFILL):
+        return fetch_symbol(excd, symbol, pages)
+
+
+def collect(watchlist, pages=1, max_workers=8):
+    """watchlist 전체를 병렬로 조회해 하나의 DataFrame 으로 반환 (2페이지 이상은 백필 우선순위)"""
+    fetch = fetch_symbol if pages <= 1 else _fetch_symbol_backfill
+    frames = []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(fetch, excd, symbol, pages): (excd, symbol) for excd, symbol in watchlist}
+        for future in as_completed(futures):
+            excd, symbol = futures[future]
+            try:
+                frames.append(future.result())
+            except Exception as e:
+                print(f"❌ {excd}:{symbol} 수집 오류:", e)
+
+    frames = [f for f in frames if not f.empty]
+    if not frames:
+        return pd.DataFrame(columns=MINUTE_BAR_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+# 🔹 DuckDB 저장소 (종목별 키)
+def init_schema(con):
+    con.execute("""
+    CREATE TABLE IF NOT EXISTS minute_bars (
+        symbol VARCHAR,
+        excd VARCHAR,
+        time TIMESTAMP,
+        open DECIMAL(18,8),
+        high DECIMAL(18,8),
+        low DECIMAL(18,8),
+        close DECIMAL(18,8),
+        volume DECIMAL(18,8),
+        PRIMARY KEY (symbol, time)
+    )
+    """)
+
+
+def save_bars(con, df):
+    if df.empty:
+        return
+    stats = bulk_ingest.duckdb_upsert(con, 'minute_bars', df, key_columns=('symbol', 'excd'))
+    print(f"✅ {df['symbol'].nunique()}종목 {stats['rows']}건 minute_bars 저장 완료 ({stats['rows_per_sec']:,.0f} rows/s)")
+
+
+# 🔹 MySQL 저장소 (main.py, DuckDB 와 같은 스키마)
+def init_mysql_schema(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS minute_bars (
+            symbol VARCHAR(16),
+            excd VARCHAR(8),
+            `time` DATETIME,
+            open DECIMAL(18,8),
+            high DECIMAL(18,8),
+            low DECIMAL(18,8),
+            close DECIMAL(18,8),
+            volume DECIMAL(18,8),
+            PRIMARY KEY (symbol, `time`)
+        )
+        """)
+
+
+def save_bars_mysql(conn, df):
+    if df.empty:
+        return
+    stats = bulk_ingest.mysql_upsert(conn, 'minute_bars', df, key_columns=('symbol', 'excd'))
+    print(f"✅ {df['symbol'].nunique()}종목 {stats['rows']}건 minute_bars 저장 완료 ({stats['rows_per_sec']:,.0f} rows/s)")
+
+
+def collect_and_store(con, watchlist, pages=1, max_workers=8):
+    df = collect(watchlist, pages=pages, max_workers=max_workers)
+    save_bars(con, df)
+    return df
@@ -1,14 +1,32 @@
-import duckdb
 import yaml
-import time
 import main_api
 import main_s
 import kis_auth as ka
+import kis_scheduler
+import bulk_ingest
+import duck_conn
+import bar_store
+import archive
+import collector
+import market_calendar
+import gap_planner
+import kis_client
+import quote_cache
+import order_manager
+import chart_decoder
+import page_buffer
+import bar_scheduler
+import kis_stream
+import backtest
+import sweep
+import indicator_stream
 import pandas as pd
 import requests
-from datetime import datetime, timedelta, time as dt_time
+from datetime import datetime, timedelta
 from pytz import timezone
 import os
+import asyncio
+import threading
 import warnings
 import math
 
@@ -26,24 +44,56 @@ RESAMPLE_INTERVAL = 15  # 15분봉
 with open("config/config.yaml", "r", encoding="utf-8") as file:
     config = yaml.safe_load(file)
 
-# DB 연결
-def connect_db():
-    return duckdb.connect(DUCKDB_PATH)
+# 지난 1분봉 Parquet 보관 경로 (symbol/date 파티션)
+ARCHIVE_ROOT = config.get('archive_root', os.path.join(os.path.dirname(DUCKDB_PATH), 'archive'))
+
+# 누락 분봉 점검 범위 (최근 N 거래일)
+GAP_LOOKBACK_DAYS = config.get('gap_lookback_days', 5)
+
+# 분봉 마감 후 작업 시작까지 대기 (초, API 쪽 봉 확정 여유)
+BAR_OFFSET_SECONDS = config.get('bar_offset_seconds', 2.0)
+
+# 실시간 웹소켓 체결 수신 사용 여부 (config.yaml 의 use_stream, 체결통보는 my_htsid 가 있을 때)
+USE_STREAM = config.get('use_stream', False)
+
+# 감시 종목 목록 (config.yaml 의 watchlist, 없으면 SOXL 단일 파이프라인만 사용)
+WATCHLIST = collector.parse_watchlist(config.get('watchlist')) if config.get('watchlist') else []
+
+# 시그널 설정 (config.yaml 의 signal_config 로 main_s.SIGNAL_CONFIG 값 덮어쓰기)
+SIGNAL_CONFIG = config.get('signal_config') or {}
+
+# 실시간 지표 상태 체크포인트 (재시작 시 이어서 갱신, config.yaml 의 indicator_checkpoint)
+INDICATOR_CHECKPOINT = config.get('indicator_checkpoint', os.path.join(os.path.dirname(DUCKDB_PATH), 'indicators.json'))
+LIVE_RAW_LIMIT = 2400  # 실시간 분석 프레임 (1분봉 개수, 배치 분석의 raw_limit 과 같음)
+
+# 현재가 / 잔고 조회 캐시 TTL (config.yaml 의 quote_cache_ttl, ex. {price_detail: 1.0, present_balance: 2.0})
+quote_cache.configure(config.get('quote_cache_ttl'))
+
+# 자동 주문 설정 (config.yaml 의 order_svr: my_prod / vps, order_qty: 1회 주문 수량)
+ORDER_SVR = config.get('order_svr', 'vps')
+ORDER_QTY = config.get('order_qty', 1)
+ORDER_JOURNAL = config.get('order_journal', os.path.join(os.path.dirname(DUCKDB_PATH), 'orders.jsonl'))
+
+# DB 연결 (프로세스 내 상시 연결: 쓰기 1개 + 스레드별 읽기 cursor)
+DB = duck_conn.DuckDBManager(DUCKDB_PATH)
 
 # DuckDB 초기 테이블 생성
 def init_duckdb_schema():
-    con = connect_db()
-    con.execute("""
-    CREATE TABLE IF NOT EXISTS SOXL_minute_data (
-        time TIMESTAMP PRIMARY KEY,
-        open DECIMAL(18,8),
-        high DECIMAL(18,8),
-        low DECIMAL(18,8),
-        close DECIMAL(18,8),
-        volume DECIMAL(18,8)
-    )
-    """)
-    con.close()
+    with DB.writer() as con:
+        con.execute("""
+        CREATE TABLE IF NOT EXISTS SOXL_minute_data (
+            time TIMESTAMP PRIMARY KEY,
+            open DECIMAL(18,8),
+            high DECIMAL(18,8),
+            low DECIMAL(18,8),
+            close DECIMAL(18,8),
+            volume DECIMAL(18,8)
+        )
+        """)
+        collector.init_schema(con)
+        gap_planner.init_no_trade_duckdb(con)
+        bar_store.init_duckdb(con)
+        archive.create_history_view(con, ARCHIVE_ROOT, watch_table='minute_bars')
 
 # 1분 데이터 수집
 def get_minute_data(cnt, to=None):
@@ -52,186 +102,249 @@ def get_minute_data(cnt, to=None):
     )
     if df.empty:
         return pd.DataFrame()
-    df = df.rename(columns={"xymd": "date", "xhms": "time", "last": "close", "evol": "volume"})
-    df['datetime'] = pd.to_datetime(df['date'] + df['time'].str.zfill(6), format='%Y%m%d%H%M%S')
-    return df[['datetime', 'open', 'high', 'low', 'close', 'volume']].sort_values('datetime')
+    return chart_decoder.decode(df)
 
 # 다량의 데이터를 한번에 가져오는 함수 (최대 2400개)
-def min_massdata(min_interval='1', cnt=20):
+def min_massdata(min_interval='1', cnt=20, sink=None):
     formatted_time = ""
-    df_combined = pd.DataFrame()
-
-    for i in range(cnt):
-        if i == 0:
-            rt_data = main_api.get_overseas_price_quot_inquire_time_itemchartprice(
-                div="02", excd="AMS", itm_no="SOXL", nmin=min_interval, pinc="1"
-            )
-        else:
-            rt_data = main_api.get_overseas_price_quot_inquire_time_itemchartprice(
-                div="02", excd="AMS", itm_no="SOXL", nmin=min_interval, 
-                pinc="1", next_value="1", keyb=formatted_time
-            )
+    # sink(ex. save_to_db) 를 주면 2400건마다 바로 저장하고 저장 건수 반환 (여러 날 백필도 메모리 일정)
+    acc = page_buffer.PageAccumulator(capacity=120 * cnt, sink=sink)
+
+    # 백필 호출은 스케줄러에서 주문/실시간 시세보다 후순위로 처리 (호출 간 sleep 불필요)
+    with kis_scheduler.priority(kis_scheduler.PRIORITY_BACKFILL):
+        for i in range(cnt):
+            if i == 0:
+                rt_data = main_api.get_overseas_price_quot_inquire_time_itemchartprice(
+                    div="02", excd="AMS", itm_no="SOXL", nmin=min_interval, pinc="1"
+                )
+            else:
+                rt_data = main_api.get_overseas_price_quot_inquire_time_itemchartprice(
+                    div="02", excd="AMS", itm_no="SOXL", nmin=min_interval, 
+                    pinc="1", next_value="1", keyb=formatted_time
+                )
 
-        df = rt_data.rename(columns={"xymd":"date", "xhms":"time", "last":"close", "evol":"volume"})
-        df['datetime'] = pd.to_datetime(df['date'] + df['time'].str.zfill(6), format='%Y%m%d%H%M%S')
-        df = df[['datetime', 'open', 'high', 'low', 'close', 'volume']].sort_values('datetime')
+            df = chart_decoder.decode(rt_data)
 
-        if df.empty:
-            print("❌ 더 이상 가져올 데이터가 없습니다.")
-            break
+            if df.empty:
+                print("❌ 더 이상 가져올 데이터가 없습니다.")
+                break
 
-        formatted_time = df.iloc[0]['datetime'].strftime('%Y%m%d%H%M%S')
+            formatted_time = df.iloc[0]['datetime'].strftime('%Y%m%d%H%M%S')
 
-        df_combined = pd.concat([df_combined, df]).drop_duplicates(subset='datetime').sort_values('datetime')
-        time.sleep(0.5)
+            acc.add(df)
 
-    return df_combined
+    return acc.finish()
 
-def fetch_missing_data(missing_minutes, min_interval='1'):
+def fetch_missing_data(missing_minutes, min_interval='1', sink=None):
     formatted_time = ""
-    df_combined = pd.DataFrame()
     max_per_call = 120  # ✅ API가 한 번에 가져올 수 있는 최대 분량
     required_calls = math.ceil(missing_minutes / max_per_call)
+    acc = page_buffer.PageAccumulator(capacity=max(missing_minutes, max_per_call), sink=sink)
+
+    # 백필 호출은 스케줄러에서 주문/실시간 시세보다 후순위로 처리 (호출 간 sleep 불필요)
+    with kis_scheduler.priority(kis_scheduler.PRIORITY_BACKFILL):
+        for i in range(required_calls):
+            if acc.total == 0:
+                rt_data = main_api.get_overseas_price_quot_inquire_time_itemchartprice(
+                    div="02", excd="AMS", itm_no="SOXL", nmin=min_interval, pinc="1"
+                )
+            else:
+                rt_data = main_api.get_overseas_price_quot_inquire_time_itemchartprice(
+                    div="02", excd="AMS", itm_no="SOXL", nmin=min_interval, 
+                    pinc="1", next_value="1", keyb=formatted_time
+                )
 
-    for i in range(required_calls):
-        if df_combined.empty:
-            rt_data = main_api.get_overseas_price_quot_inquire_time_itemchartprice(
-                div="02", excd="AMS", itm_no="SOXL", nmin=min_interval, pinc="1"
-            )
-        else:
-            rt_data = main_api.get_overseas_price_quot_inquire_time_itemchartprice(
-                div="02", excd="AMS", itm_no="SOXL", nmin=min_interval, 
-                pinc="1", next_value="1", keyb=formatted_time
-            )
-
-        df = rt_data.rename(columns={"xymd": "date", "xhms": "time", "last": "close", "evol": "volume"})
-        df['datetime'] = pd.to_datetime(df['date'] + df['time'].str.zfill(6), format='%Y%m%d%H%M%S')
-        df = df[['datetime', 'open', 'high', 'low', 'close', 'volume']].sort_values('datetime')
+            df = chart_decoder.decode(rt_data)
 
-        if df.empty:
-            print("❌ 더 이상 가져올 데이터가 없습니다.")
-            break
+            if df.empty:
+                print("❌ 더 이상 가져올 데이터가 없습니다.")
+                break
 
-        formatted_time = df.iloc[0]['datetime'].strftime('%Y%m%d%H%M%S')
+            formatted_time = df.iloc[0]['datetime'].strftime('%Y%m%d%H%M%S')
 
-        before_count = len(df_combined)
-        df_combined = pd.concat([df_combined, df]).drop_duplicates(subset='datetime').sort_values('datetime')
-        collected = len(df_combined)
-        newly_added = collected - before_count
+            newly_added = acc.add(df)
 
-        print(f"📥 {newly_added}건 수집 (누적 {collected}/{missing_minutes})")
-        time.sleep(0.5)
+            print(f"📥 {newly_added}건 수집 (누적 {acc.total}/{missing_minutes})")
 
-    return df_combined
+    return acc.finish()
 
-# DuckDB 저장
+# DuckDB 저장 (DataFrame 등록 후 INSERT OR REPLACE ... SELECT 한 번)
 def save_to_db(df):
     if df.empty:
         return
-    con = connect_db()
     try:
-        con.executemany("""
-            INSERT OR REPLACE INTO SOXL_minute_data (time, open, high, low, close, volume)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, [
-            (
-                row['datetime'].to_pydatetime(),
-                row['open'], row['high'], row['low'], row['close'], row['volume']
-            ) for _, row in df.iterrows()
-        ])
-        print(f"✅ {len(df)}건 DuckDB 저장 완료")
+        with DB.writer() as con:
+            stats = bulk_ingest.duckdb_upsert(con, 'SOXL_minute_data', df)
+            last = archive.last_archived_day(ARCHIVE_ROOT)  # 보관된 날짜의 봉은 다시 집계하지 않음
+            bar_store.refresh_duckdb(con, df['datetime'].min(),
+                                     not_before=last + timedelta(days=1) if last else None)
+        print(f"✅ {stats['rows']}건 DuckDB 저장 완료 ({stats['rows_per_sec']:,.0f} rows/s)")
     except Exception as e:
         print("❌ DuckDB 저장 오류:", e)
-    finally:
-        con.close()
 
 # 마지막 저장 시간 조회
 def get_last_time():
-    con = connect_db()
     try:
-        result = con.execute("SELECT MAX(time) FROM SOXL_minute_data").fetchone()
+        result = DB.reader().execute("SELECT MAX(time) FROM SOXL_minute_data").fetchone()
         return result[0] if result else None
     except Exception as e:
         print("❌ DuckDB 조회 오류:", e)
-    finally:
-        con.close()
-
-def fill_missing_data():
-    while True:
-        last_time = get_last_time()
-        now = datetime.now(NYT).replace(second=0, microsecond=0)
-        print(f"📌 [디버그] DB 기준 마지막 저장 시각: {last_time}")
-
-        if last_time is None:
-            print("📌 DB 비어있음, 데이터 로딩 시작")
-            df = fetch_missing_data(2400)
-        else:
-            last_time = pd.to_datetime(last_time)
-            missing_minutes = int((now - NYT.localize(last_time)).total_seconds() // 60)
 
-            if missing_minutes <= 0:
-                print("📌 누락 데이터 없음")
-                break
-            else:
-                print(f"📌 {missing_minutes}분 필요 → 보완 시작")
-                df = fetch_missing_data(missing_minutes)
-                print(f"📌 [디버그] fetch_missing_data() 수집된 총 데이터 수: {len(df)}")
-
-                df = df[df['datetime'] > last_time]
-                print(f"📌 [디버그] last_time 이후 데이터 수: {len(df)}")
-
-        if df.empty:
-            print("📌 추가 데이터 없음")
-            break
+# 체결 없던 분 기록 (다음 누락 탐지에서 제외)
+def record_no_trade(symbol, times):
+    with DB.writer() as con:
+        gap_planner.record_no_trade_duckdb(con, symbol, times)
+
+# 누락 분봉 보완: 저장된 분봉을 거래소 달력과 비교해 비어 있는 구간만 keyb 로 조회
+def fill_missing_data(lookback_days=GAP_LOOKBACK_DAYS):
+    now = datetime.now(NYT).replace(tzinfo=None, second=0, microsecond=0)
+    start = gap_planner.scan_start(now, lookback_days)
+    end = now - timedelta(minutes=1)  # 진행 중인 분봉 제외
+
+    stored = gap_planner.stored_times_duckdb(DB.reader(), start, end)
+    stored += gap_planner.no_trade_times_duckdb(DB.reader(), start, end, "SOXL")
+    gaps, pages = gap_planner.plan(stored, start, end)
+    if not gaps:
+        print("📌 누락 데이터 없음")
+    else:
+        rows = gap_planner.fetch_pages("AMS", "SOXL", pages, sink=save_to_db,  # 2400건 단위로 바로 저장
+                                       empty_sink=lambda times: record_no_trade("SOXL", times))
+        print(f"📌 [디버그] 누락 구간 수집 데이터 수: {rows}")
+
+    # 감시 종목도 같은 방식으로 보완 (minute_bars)
+    for excd, symbol in WATCHLIST:
+        stored = gap_planner.stored_times_duckdb(DB.reader(), start, end, table='minute_bars', symbol=symbol)
+        stored += gap_planner.no_trade_times_duckdb(DB.reader(), start, end, symbol)
+        gaps, pages = gap_planner.plan(stored, start, end)
+        if gaps:
+            df = gap_planner.fetch_pages(excd, symbol, pages,
+                                         empty_sink=lambda times, symbol=symbol: record_no_trade(symbol, times))
+            df['symbol'], df['excd'] = symbol, excd
+            with DB.writer() as con:
+                collector.save_bars(con, df)
+
+
+# 분석용 N분봉 조회: 집계 테이블(bar_store)이 있으면 그대로 읽고, 없으면 1분봉을 읽어 resample
+def load_bars(con, resample_interval, raw_limit):
+    if bar_store.table_for(resample_interval):
+        return bar_store.read_duckdb(con, resample_interval, math.ceil(raw_limit / resample_interval))
+
+    df = con.execute(f"""
+        SELECT time AS time, open, high, low, close, volume FROM (
+            SELECT * FROM SOXL_minute_data
+            ORDER BY time DESC
+            LIMIT {raw_limit}
+        )
+        ORDER BY time ASC
+    """).df()
+    if df.empty:
+        return df
 
-        save_to_db(df)
-        time.sleep(1)
+    df['time'] = pd.to_datetime(df['time'])
+    return df.resample(f'{resample_interval}min', on='time').agg({
+        'open': 'first',
+        'high': 'max',
+        'low': 'min',
+        'close': 'last',
+        'volume': 'sum'
+    }).dropna().reset_index()
 
 
-# 개선된 데이터 분석 로직
+# 개선된 데이터 분석 로직 (배치 재계산, 모드 3 차트 / 점검용 · 실시간 매매는 live_analysis)
 def data_analysis_improved(mode, resample_interval=15, limit=2400, raw_limit=2400):
-    con = connect_db()
+    con = DB.analytics()
     try:
-        df = con.execute(f"""
-            SELECT time AS time, open, high, low, close, volume FROM (
-                SELECT * FROM SOXL_minute_data
-                ORDER BY time DESC
-                LIMIT {raw_limit}
-            )
-            ORDER BY time ASC
-        """).df()
-
-        if not df.empty:
-            df['time'] = pd.to_datetime(df['time'])
-            df = df.sort_values('time')
+        df_resampled = load_bars(con, resample_interval, raw_limit)
 
-            df_resampled = df.resample(f'{resample_interval}min', on='time').agg({
-                'open': 'first',
-                'high': 'max',
-                'low': 'min',
-                'close': 'last',
-                'volume': 'sum'
-            }).dropna().reset_index()
+        if not df_resampled.empty:
+            df_resampled['time'] = pd.to_datetime(df_resampled['time'])
 
             if mode == 3:
                 df_resampled.to_csv('data.csv')
 
-            df_resampled = main_s.plot_candlestick(
-                df_resampled.rename(columns={'interval_start':'time'}),
-                show_rsi=False, show_macd=True,
-                show_bollinger=True, show_volume=False,
-                show_hedging_band=True,
-                mode=mode
+            df_resampled = main_s.compute_signals(
+                df_resampled.rename(columns={'interval_start':'time'}), SIGNAL_CONFIG
             )
 
-            if mode in [1, 2]:
-                signal = calculate_trading_signal(df_resampled)
-                execute_trade(signal)
+            if mode == 3:
+                import main_chart  # 차트는 모드 3 에서만 (실시간 모드는 matplotlib 미로딩)
+                main_chart.plot_signals(df_resampled)
 
     except Exception as e:
         print("❌ 분석 오류:", e)
-    finally:
-        con.close()
+
+# 실시간 지표 (1분봉 → N분봉 → 증분 지표, SIGNAL_CONFIG 기준)
+_live = None
+
+def get_live_signals(resample_interval=RESAMPLE_INTERVAL):
+    global _live
+    if _live is None or _live.interval != resample_interval:
+        _live = indicator_stream.LiveSignals(resample_interval, SIGNAL_CONFIG,
+                                             frame_bars=math.ceil(LIVE_RAW_LIMIT / resample_interval),
+                                             checkpoint_path=INDICATOR_CHECKPOINT)
+    return _live
+
+# 실시간 분석: 지난번 이후 저장된 1분봉만 읽어 지표 갱신 → 방금 마감된 N분봉 시그널로 주문
+# (처음 / 체크포인트 없음: 최근 LIVE_RAW_LIMIT 개 1분봉으로 채움, 웹소켓 봉도 save_to_db 를 거쳐 같은 경로)
+def live_analysis(resample_interval=RESAMPLE_INTERVAL):
+    live = get_live_signals(resample_interval)
+    try:
+        con = DB.reader()
+        if live.last_minute is None:
+            df = con.execute(f"""
+                SELECT * FROM (
+                    SELECT time, open, high, low, close, volume FROM SOXL_minute_data
+                    ORDER BY time DESC LIMIT {LIVE_RAW_LIMIT}
+                ) ORDER BY time
+            """).df()
+        else:
+            df = con.execute("""
+                SELECT time, open, high, low, close, volume FROM SOXL_minute_data
+                WHERE time > ? ORDER BY time
+            """, [live.last_minute.to_pydatetime()]).df()
+
+        rows = live.feed(df) + live.flush(datetime.now(NYT).replace(tzinfo=None))
+        live.save_checkpoint()
+        if rows:
+            signal, bar_time = calculate_trading_signal(pd.DataFrame(rows).set_index('time'), resample_interval)
+            execute_trade(signal, bar_time=bar_time)  # 같은 마감 봉 시그널은 1번만 주문
+    except Exception as e:
+        print("❌ 실시간 분석 오류:", e)
+
+# 백테스트 (보관분 + hot 테이블 1분봉)
+def run_backtest(days=90, resample_interval=15):
+    end = datetime.now()
+    df = archive.read_history(DB.analytics(), 'SOXL', end - timedelta(days=days), end)
+    if df.empty:
+        print("⚠️ 백테스트 데이터가 없습니다.")
+        return None
+
+    result = backtest.run(df, interval=resample_interval, use_macd=True)
+    print(f"📊 백테스트 ({resample_interval}분봉, 최근 {days}일)")
+    for key, value in result['stats'].items():
+        print(f"  {key}: {value}")
+    print(result['trades'].tail(10))
+    return result
+
+# 파라미터 스윕 (결과는 sweep_results 테이블)
+def run_parameter_sweep(days=90, max_workers=None):
+    end = datetime.now()
+    df = archive.read_history(DB.analytics(), 'SOXL', end - timedelta(days=days), end)
+    if df.empty:
+        print("⚠️ 스윕 데이터가 없습니다.")
+        return None
+
+    params = sweep.grid(
+        interval=[5, 15, 60],
+        macd_fast=[8, 12, 16], macd_slow=[21, 26, 34], macd_signal=[3, 9],
+        use_rsi=[False, True], rsi_window=[14], rsi_lower=[20, 30], rsi_upper=[70, 80],
+    )
+    results = sweep.run_sweep(df, params, max_workers=max_workers)
+    with DB.writer() as con:
+        sweep_id = sweep.save_results(con, results)
+    print(f"📊 스윕 {sweep_id} 상위 결과")
+    print(sweep.top_results(DB.reader(), sweep_id))
+    return results
 
 # Discord 메시지
 def send_message(message):
@@ -247,87 +360,123 @@ def send_message(message):
         print(f"❌ 메시지 전송 오류: {e}")
 
 # 전략 시그널 예시
-def calculate_trading_signal(df):
-    if df.empty:
-        return None
-
+# N분봉이 막 마감된 시각(ex. 10:15)에 방금 마감된 봉(10:00)의 신호만 사용 → (시그널, 봉 시작 시각)
+def calculate_trading_signal(df, interval=RESAMPLE_INTERVAL, now=None):
     try:
-        now = datetime.now(NYT).replace(second=0, microsecond=0)
-        last_time = pd.to_datetime(df.index[-1]) if not isinstance(df.index, pd.RangeIndex) else df['interval_start'].iloc[-1]
-        last_row = df.iloc[-1]
-
-        if last_time == now:
-            if last_row.get('buy_signal', False):
-                return "buy"
-            elif last_row.get('sell_signal', False):
-                return "sell"
+        bar = main_s.closed_bar(df, interval, now or datetime.now(NYT))
     except Exception as e:
         print("❌ 시그널 계산 오류:", e)
-    return None
-
-# 거래 실행
-def execute_trade(signal):
+        return None, None
+    if bar is None:
+        return None, None
+    return main_s.bar_signal(bar), bar.name
+
+# 주문 관리자 (처음 주문할 때 생성, 상태 변경은 DISCORD 알림)
+_orders = None
+
+def get_order_manager():
+    global _orders
+    if _orders is None:
+        def notify(order):
+            send_message(f"📦 주문 {order.state}: {order.side} {order.symbol} {order.filled_qty or 0}/{order.qty}주 @ {order.price} ({order.message or order.odno or ''})")
+        _orders = order_manager.OrderManager(kis_client.get(ORDER_SVR), journal_path=ORDER_JOURNAL, on_update=notify).start()
+    return _orders
+
+# 거래 실행: 현재가(캐시) 기준 지정가 주문을 비동기 전송 (같은 봉 시그널은 idempotency key 로 1번만)
+def execute_trade(signal, bar_time=None):
     if signal:
-        main_api.get_overseas_inquire_present_balance(svr='vps', dv="02", dvsn="01", natn="000", mkt="00", inqr_dvsn="00")
-        last_price = main_api.get_overseas_price_quot_price_detail(excd="AMS", itm_no="SOXL")
-        print(f"🚨 {signal} 신호 발생! 실제 거래 로직을 구현해주세요.")
-        send_message(f"🚨 현재가 {last_price} 신호 발생! 실제 거래 로직을 구현해주세요.")
+        client = kis_client.get(ORDER_SVR)
+        last_price = quote_cache.price_detail(excd="AMS", itm_no="SOXL", client=client)
+        key = f"SOXL:{signal}:{bar_time}" if bar_time is not None else None
+        order = get_order_manager().submit(signal, "AMS", "SOXL", qty=ORDER_QTY, price=last_price, key=key)
+        print(f"🚨 {signal} 신호 → {order}")
+        return order
 
-        #잔고조회
-        main_api.get_overseas_inquire_present_balance(svr='vps', dv="03", dvsn="01", natn="000", mkt="00", inqr_dvsn="00")
+    print('매매 신호가 없습니다.')
 
-        #구매로직
-        main_api.get_overseas_order(svr='vps',ord_dv="buy", excg_cd="AMEX", itm_no="SOXL", qty=1, unpr=1)
+# 실시간 체결 웹소켓으로 1분봉 생성 → 분이 끝나는 즉시 저장 (REST 조회는 누락 보완만)
+def start_stream(svr):
+    def on_bar(bar):
+        df = pd.DataFrame([bar])
+        if bar['symbol'] == 'SOXL':
+            save_to_db(df)
+        else:
+            df['excd'] = {symbol: excd for excd, symbol in WATCHLIST}.get(bar['symbol'], '')
+            with DB.writer() as con:
+                collector.save_bars(con, df)
 
-    
-    print('매매 신호가 없습니다.')
+    watchlist = [("AMS", "SOXL")] + [w for w in WATCHLIST if w[1] != 'SOXL']
+    stream = kis_stream.KISStream(svr, watchlist, on_bar=on_bar, hts_id=config.get('my_htsid'))
+    threading.Thread(target=lambda: asyncio.run(stream.run()), name='kis-stream', daemon=True).start()
+    return stream
 
-# 정규장 수집 루프
+# 정규장 수집 루프: 매 분봉 마감 + BAR_OFFSET_SECONDS 초에 깨어나 구간별 작업 실행
 def data_collection_thread(mode):
     global market_open_sent, market_close_sent
     market_open_sent = False
     market_close_sent = False
-    preopen_sent = False
+    state = {'preopen_sent': False}
     svr = 'my_prod' if mode == 1 else 'vps'  # 서버 정보 기억
+    if USE_STREAM:
+        start_stream(svr)
+
+    def session(ctx):
+        # 🔁 휴장일 / 조기 폐장 / DST 는 market_calendar 기준 (방금 마감된 봉이 속한 구간)
+        return {'session': market_calendar.phase(ctx['bar_close'] - timedelta(seconds=1), preopen_minutes=10)}
+
+    def preopen(ctx):
+        if not state['preopen_sent']:
+            try:
+                send_message("🟢 정규장이 시작 10분 전입니다. 모니터링을 시작합니다.")
+                ka.auth(svr)
+            except:
+                send_message("토큰 갱신에 실패 했습니다. 확인 바랍니다.")
+            state['preopen_sent'] = True
+        fill_missing_data()
 
-    while True:
-        now = datetime.now(NYT)
-        # 🔁 매 루프마다 토큰 유효성 체크
-
-        if dt_time(9, 20) <= now.time() < dt_time(9, 29):
-            if not preopen_sent:
-                try:
-                    send_message("🟢 정규장이 시작 10분 전입니다. 모니터링을 시작합니다.")
-                    ka.auth(svr)
-                except:
-                    send_message("토큰 갱신에 실패 했습니다. 확인 바랍니다.")
-                fill_missing_data()
-                preopen_sent = True
-
-            fill_missing_data()
-
-        if dt_time(9, 30) <= now.time() < dt_time(16, 0):
-            if not market_open_sent:
-                send_message("🟢 정규장이 시작되었습니다.")
-                main_api.get_overseas_inquire_present_balance(svr='vps', dv="02", dvsn="01", natn="000", mkt="00", inqr_dvsn="00")
-                market_open_sent = True
-                market_close_sent = False
-
-            if now.second == 3:
-                fill_missing_data()
-                data_analysis_improved(mode, resample_interval=RESAMPLE_INTERVAL)
-
-            time.sleep(0.5)
-
-        elif now.time() >= dt_time(16, 0):
-            if not market_close_sent:
-                send_message("🔴 정규장이 종료되었습니다.")
-                market_close_sent = True
-                market_open_sent = False
-            time.sleep(60)
-
-        else:
-            time.sleep(1)
+    def market_open(ctx):
+        global market_open_sent, market_close_sent
+        if not market_open_sent:
+            send_message("🟢 정규장이 시작되었습니다.")
+            quote_cache.present_balance(svr='vps', dv="02", dvsn="01", natn="000", mkt="00", inqr_dvsn="00", client=kis_client.get('vps'))
+            market_open_sent = True
+            market_close_sent = False
+
+    def watchlist(ctx):
+        df_watch = collector.collect(WATCHLIST)
+        with DB.writer() as con:
+            collector.save_bars(con, df_watch)
+
+    def market_close(ctx):
+        global market_open_sent, market_close_sent
+        if market_close_sent:
+            return
+        send_message("🔴 정규장이 종료되었습니다.")
+        try:
+            with DB.writer() as con:
+                # 누락 탐지 구간(GAP_LOOKBACK_DAYS 거래일)은 hot 테이블에 남김
+                archive.archive_closed_days(con, ARCHIVE_ROOT, lookback_days=GAP_LOOKBACK_DAYS)
+                archive.archive_closed_days(con, ARCHIVE_ROOT, table='minute_bars', symbol=None,
+                                            lookback_days=GAP_LOOKBACK_DAYS)
+                archive.create_history_view(con, ARCHIVE_ROOT, watch_table='minute_bars')
+        except Exception as e:
+            print("❌ Parquet 보관 오류:", e)
+        DB.checkpoint()
+        market_close_sent = True
+        market_open_sent = False
+        state['preopen_sent'] = False
+
+    is_open = lambda ctx: ctx['session'] == 'open'
+    pipeline = bar_scheduler.Pipeline()
+    pipeline.add('preopen', preopen, when=lambda ctx: ctx['session'] == 'preopen')
+    pipeline.add('notify', market_open, when=is_open)
+    # 분석은 수집 직후 바로 (감시 종목 수집은 매매 판단 이후)
+    pipeline.add('ingest', lambda ctx: fill_missing_data(), when=is_open)
+    pipeline.add('analysis', lambda ctx: live_analysis(resample_interval=RESAMPLE_INTERVAL), deps=['ingest'])
+    pipeline.add('watchlist', watchlist, when=lambda ctx: is_open(ctx) and bool(WATCHLIST))
+    pipeline.add('close', market_close, when=lambda ctx: ctx['session'] == 'closed')
+
+    bar_scheduler.BarScheduler(pipeline, interval=60, offset=BAR_OFFSET_SECONDS, tz=NYT, context=session).run_forever()
 
 # 모드 실행
 def run_mode(mode):
@@ -341,8 +490,17 @@ def run_mode(mode):
         fill_missing_data()
         print("🧪 모드 3: 전략 개발 및 테스트 모드 실행")
         data_analysis_improved(mode, resample_interval=RESAMPLE_INTERVAL)
-        
-        
+        DB.close()
+    elif mode == 4:
+        print("🧪 모드 4: 백테스트")
+        run_backtest(resample_interval=RESAMPLE_INTERVAL)
+        DB.close()
+    elif mode == 5:
+        print("🧪 모드 5: 파라미터 스윕")
+        run_parameter_sweep()
+        DB.close()
+
+
 
 if __name__ == "__main__":
     mode = 3
@@ -0,0 +1,80 @@
+import threading
+from contextlib import contextmanager
+
+import duckdb
+
+
+# 🔹 DuckDB 연결 관리자 (프로세스당 1개)
+# - 쓰기 연결 1개를 계속 열어두고 쓰기는 잠금으로 직렬화 (매 호출 open/close 제거)
+# - 읽기는 스레드별 cursor (같은 DB 인스턴스, MVCC 스냅샷이라 수집과 분석이 서로 막지 않음)
+# - 선택: 별도 파일(백업/스냅샷)에 대한 읽기 전용 분석 연결
+# - 체크포인트는 자동 대신 checkpoint() 로 원하는 시점에 (ex. 장 마감 후)
+
+
+class DuckDBManager:
+    def __init__(self, path, read_only=False, analytics_path=None, checkpoint_threshold='1GB'):
+        self.path = path
+        self.read_only = read_only
+        self.analytics_path = analytics_path
+        self.checkpoint_threshold = checkpoint_threshold
+        self._conn = None
+        self._analytics = None
+        self._write_lock = threading.RLock()
+        self._open_lock = threading.Lock()
+        self._local = threading.local()
+
+    def _connection(self):
+        if self._conn is None:
+            with self._open_lock:
+                if self._conn is None:
+                    conn = duckdb.connect(self.path, read_only=self.read_only)
+                    if not self.read_only:
+                        # WAL 이 커지기 전에는 자동 체크포인트 하지 않음 (동기화 드라이브 재기록 최소화)
+                        conn.execute(f"SET checkpoint_threshold = '{self.checkpoint_threshold}'")
+                    self._conn = conn
+        return self._conn
+
+    @contextmanager
+    def writer(self):
+        """쓰기 연결 (잠금 보유 중에만 사용)"""
+        if self.read_only:
+            raise RuntimeError("읽기 전용으로 열린 DB 입니다.")
+        with self._write_lock:
+            yield self._connection()
+
+    def reader(self):
+        """현재 스레드 전용 읽기 cursor"""
+        cur = getattr(self._local, 'cursor', None)
+        if cur is None or getattr(self._local, 'owner', None) is not self._conn:
+            cur = self._connection().cursor()
+            self._local.cursor = cur
+            self._local.owner = self._conn
+        return cur
+
+    def analytics(self):
+        """분석용 연결: analytics_path 가 있으면 그 파일을 읽기 전용으로, 없으면 reader()"""
+        if self.analytics_path is None:
+            return self.reader()
+        if self._analytics is None:
+            with self._open_lock:
+                if self._analytics is None:
+                    self._analytics = duckdb.connect(self.analytics_path, read_only=True)
+        return self._analytics.cursor()
+
+    def checkpoint(self):
+        """WAL 을 DB 파일에 반영"""
+        if self.read_only or self._conn is None:
+            return
+        with self._write_lock:
+            self._conn.execute("CHECKPOINT")
+
+    def close(self):
+        with self._write_lock:
+            if self._conn is not None:
+                if not self.read_only:
+                    self._conn.execute("CHECKPOINT")
+                self._conn.close()
+                self._conn = None
+            if self._analytics is not None:
+                self._analytics.close()
+                self._analytics = None
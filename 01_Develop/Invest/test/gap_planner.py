@@ -0,0 +1,182 @@
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+import chart_decoder
+import kis_scheduler
+import main_api
+import market_calendar
+import page_buffer
+
+
+# 🔹 분봉 누락 구간 탐지 + 필요한 페이지만 조회
+# - 저장된 1분봉 시각을 거래소 달력과 비교해 비어 있는 구간만 추림
+#   기준 구간은 기존 수집과 같은 프리마켓 ~ 애프터마켓 (04:00 ~ 20:00, market_calendar.extended_session)
+#   (야간 / 주말 / 휴장일은 누락으로 보지 않음)
+# - 구간을 nrec 개씩 페이지로 나누고 keyb = 페이지 마지막 분 + 1분 커서로 해당 페이지만 조회
+# - 조회했는데 체결이 없던 분(시간외 거래 공백)은 empty_sink 로 넘겨 기록 → 다음 실행부터 누락으로 보지 않음
+# - 재시작 후 복구 비용 = 실제 누락 분 / nrec 페이지 (현재 시각부터 거꾸로 훑지 않음)
+#
+# 시각은 모두 뉴욕 현지시각(tz 없음) 기준 = DB 에 저장된 time 컬럼과 동일
+
+COLUMNS = chart_decoder.COLUMNS
+NO_TRADE_TABLE = 'minute_no_trade'  # 체결 없음이 확인된 분 (symbol, time)
+
+
+def scan_start(now, lookback_days=5):
+    """now 기준 lookback_days 거래일 전 프리마켓 시작 시각"""
+    day = pd.Timestamp(now).date()
+    for _ in range(lookback_days):
+        day -= timedelta(days=1)
+        while not market_calendar.is_trading_day(day):
+            day -= timedelta(days=1)
+    return pd.Timestamp.combine(day, market_calendar.PREMARKET_OPEN)
+
+
+def expected_minutes(start, end):
+    """[start, end] 사이 1분봉 시작 시각 (거래일 프리마켓 시작 ~ 애프터마켓 종료 1분 전)"""
+    start, end = pd.Timestamp(start).floor('min'), pd.Timestamp(end).floor('min')
+    ranges = []
+    day = start.date()
+    while day <= end.date():
+        bounds = market_calendar.extended_session(day)
+        if bounds is not None:
+            open_ = max(bounds[0].replace(tzinfo=None), start)
+            close = min(bounds[1].replace(tzinfo=None) - pd.Timedelta(minutes=1), end)
+            if open_ <= close:
+                ranges.append(pd.date_range(open_, close, freq='1min'))
+        day += timedelta(days=1)
+    if not ranges:
+        return pd.DatetimeIndex([])
+    return ranges[0].append(ranges[1:]) if len(ranges) > 1 else ranges[0]
+
+
+def find_gaps(stored, start, end):
+    """저장된 시각(stored)에 없는 분을 연속 구간 [(시작, 끝, 분 수), ...] 으로 반환
+
+    애프터마켓 종료 → 다음 거래일 프리마켓처럼 거래 분 기준으로 이어지는 누락은 하나의 구간으로 묶는다.
+    stored 에는 체결 없음이 확인된 분(no_trade_times_*)도 함께 넘긴다.
+    """
+    expected = expected_minutes(start, end)
+    if len(expected) == 0:
+        return []
+    stored = pd.DatetimeIndex(pd.to_datetime(stored)).floor('min')
+    missing = np.flatnonzero(~expected.isin(stored))
+    if len(missing) == 0:
+        return []
+
+    breaks = np.flatnonzero(np.diff(missing) > 1)
+    starts = np.concatenate(([0], breaks + 1))
+    ends = np.concatenate((breaks, [len(missing) - 1]))
+    return [(expected[missing[s]], expected[missing[e]], int(e - s + 1)) for s, e in zip(starts, ends)]
+
+
+def plan_pages(gaps, nrec=120):
+    """누락 구간 → (페이지 시작, 페이지 끝, keyb) 목록 (페이지당 거래 분 nrec 개)"""
+    pages = []
+    for gap_start, gap_end, _ in gaps:
+        minutes = expected_minutes(gap_start, gap_end)
+        for i in range(len(minutes) - 1, -1, -nrec):
+            chunk = minutes[max(0, i - nrec + 1):i + 1]
+            keyb = (chunk[-1] + pd.Timedelta(minutes=1)).strftime('%Y%m%d%H%M%S')
+            pages.append((chunk[0], chunk[-1], keyb))
+    return pages
+
+
+def fetch_pages(excd, symbol, pages, nrec=120, max_extra_pages=3, sink=None, empty_sink=None):
+    """계획된 페이지만 조회 (백필 우선순위)
+
+    응답이 페이지 시작까지 닿지 못하면(체결 없는 분이 많은 구간) 가장 오래된 봉을 keyb 로 최대 max_extra_pages 번 더 조회.
+    sink 를 주면 모인 봉을 page_buffer.FLUSH_ROWS 건 단위로 바로 넘기고 넘긴 건수 반환.
+    empty_sink(times) 에는 응답 범위 안인데 봉이 없던(체결 없음) 분을 넘긴다.
+    """
+    acc = page_buffer.PageAccumulator(capacity=max(len(pages), 1) * nrec, sink=sink)
+    with kis_scheduler.priority(kis_scheduler.PRIORITY_BACKFILL):
+        for page_start, page_end, keyb in pages:
+            received, oldest, newest = [], None, None
+            for _ in range(1 + max_extra_pages):
+                df = chart_decoder.decode(main_api.get_overseas_price_quot_inquire_time_itemchartprice(
+                    div="02", excd=excd, itm_no=symbol, nmin="1", pinc="1", next_value="1", nrec=str(nrec), keyb=keyb
+                ))
+                if df.empty:
+                    break
+                acc.add(df[(df['datetime'] >= page_start) & (df['datetime'] <= page_end)])
+                received.append(df['datetime'])
+                oldest = df['datetime'].iloc[0]
+                if newest is None:
+                    newest = df['datetime'].iloc[-1]
+                if oldest <= page_start or len(df) < nrec:
+                    break
+                keyb = oldest.strftime('%Y%m%d%H%M%S')
+
+            if empty_sink is not None and received:
+                # 응답은 연속 구간 → 가장 오래된 봉 ~ 가장 최근 봉 사이에 없는 분은 체결이 없던 분
+                minutes = expected_minutes(max(oldest, page_start), min(newest, page_end))
+                empty = minutes[~minutes.isin(pd.DatetimeIndex(pd.concat(received)))]
+                if len(empty):
+                    empty_sink(list(empty))
+    return acc.finish()
+
+
+# 저장된 시각 조회 #######################################################################
+
+def stored_times_duckdb(con, start, end, table='SOXL_minute_data', symbol=None):
+    where, params = "time BETWEEN ? AND ?", [pd.Timestamp(start).to_pydatetime(), pd.Timestamp(end).to_pydatetime()]
+    if symbol is not None:
+        where, params = where + " AND symbol = ?", params + [symbol]
+    rows = con.execute(f"SELECT time FROM {table} WHERE {where}", params).fetchall()
+    return [r[0] for r in rows]
+
+
+def no_trade_times_duckdb(con, start, end, symbol):
+    return stored_times_duckdb(con, start, end, table=NO_TRADE_TABLE, symbol=symbol)
+
+
+def init_no_trade_duckdb(con):
+    con.execute(f"CREATE TABLE IF NOT EXISTS {NO_TRADE_TABLE} (symbol VARCHAR, time TIMESTAMP, PRIMARY KEY (symbol, time))")
+
+
+def record_no_trade_duckdb(con, symbol, times):
+    con.executemany(f"INSERT OR IGNORE INTO {NO_TRADE_TABLE} VALUES (?, ?)",
+                    [(symbol, pd.Timestamp(t).to_pydatetime()) for t in times])
+
+
+def stored_times_mysql(conn, start, end, table='SOXL_minute_data'):
+    with conn.cursor() as cursor:
+        cursor.execute(
+            f"SELECT `time` FROM {table} WHERE `time` BETWEEN %s AND %s",
+            [pd.Timestamp(start).strftime('%Y-%m-%d %H:%M:%S'), pd.Timestamp(end).strftime('%Y-%m-%d %H:%M:%S')]
+        )
+        return [r[0] for r in cursor.fetchall()]
+
+
+def plan(stored, start, end, nrec=120):
+    """누락 구간 + 페이지 계획 + 요약 출력"""
+    gaps = find_gaps(stored, start, end)
+    pages = plan_pages(gaps, nrec)
+    if gaps:
+        print(f"📌 누락 {sum(g[2] for g in gaps)}분 / {len(gaps)}구간 → {len(pages)}페이지 조회 예정")
+    return gaps, pages
+
+
+def no_trade_times_mysql(conn, start, end, symbol):
+    init_no_trade_mysql(conn)
+    with conn.cursor() as cursor:
+        cursor.execute(
+            f"SELECT `time` FROM {NO_TRADE_TABLE} WHERE `symbol` = %s AND `time` BETWEEN %s AND %s",
+            [symbol, pd.Timestamp(start).strftime('%Y-%m-%d %H:%M:%S'), pd.Timestamp(end).strftime('%Y-%m-%d %H:%M:%S')]
+        )
+        return [r[0] for r in cursor.fetchall()]
+
+
+def init_no_trade_mysql(conn):
+    with conn.cursor() as cursor:
+        cursor.execute(f"CREATE TABLE IF NOT EXISTS {NO_TRADE_TABLE} "
+                       "(`symbol` VARCHAR(16), `time` DATETIME, PRIMARY KEY (`symbol`, `time`))")
+
+
+def record_no_trade_mysql(conn, symbol, times):
+    with conn.cursor() as cursor:
+        cursor.executemany(f"INSERT IGNORE INTO {NO_TRADE_TABLE} (`symbol`, `time`) VALUES (%s, %s)",
+                           [(symbol, pd.Timestamp(t).strftime('%Y-%m-%d %H:%M:%S')) for t in times])
@@ -0,0 +1,551 @@
+import json
+import math
+import os
+from collections import deque
+
+import pandas as pd
+
+import main_s
+
+
+# 🔹 실시간(증분) 지표 계산
+# - main_s 의 apply_macd / apply_rsi / apply_bollinger / apply_hedging_band 와 같은 값을
+#   봉 하나가 들어올 때마다 O(1) 로 갱신한다. (매 분 DB 전체 조회 + 재계산 불필요)
+# - 모든 지표는 state_dict() / load_state() 로 체크포인트 저장/복원이 가능하다.
+# - bar 는 'time', 'open', 'high', 'low', 'close' 키를 갖는 dict 또는 Series
+# - 실시간 경로(main.py / duckDB_main.py 모드 1·2)는 LiveSignals 로 새 1분봉만 반영해 마감 봉 시그널을 얻는다.
+#   파라미터는 main_s.SIGNAL_CONFIG (+ config.yaml 의 signal_config), 차트 / 백테스트는 배치(main_s) 그대로.
+
+
+def _nan():
+    return float('nan')
+
+
+def _to_float(v):
+    return _nan() if v is None else float(v)
+
+
+class StreamEMA:
+    """ewm(span, adjust=False).mean() 증분 버전"""
+
+    def __init__(self, span):
+        self.span = span
+        self.alpha = 2.0 / (span + 1.0)
+        self.value = None
+
+    def update(self, x):
+        if self.value is None or math.isnan(self.value):
+            self.value = x
+        elif not math.isnan(x):
+            self.value = (1.0 - self.alpha) * self.value + self.alpha * x
+        return self.value
+
+    def state_dict(self):
+        return {'span': self.span, 'value': self.value}
+
+    def load_state(self, state):
+        self.__init__(state['span'])
+        self.value = state['value']
+
+
+class RollingWindow:
+    """고정 길이 rolling 창 (평균 / 분산은 추가 · 제거 Welford 누적값으로 봉당 O(1))
+
+    누적 오차가 쌓이지 않도록 window 번 갱신마다 창 값으로 누적값을 다시 계산한다 (분할상환 O(1)).
+    NaN 이 창 안에 있으면 rolling(window) 처럼 NaN.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self._resync()
+
+    def _resync(self):
+        finite = [v for v in self.values if not math.isnan(v)]
+        self.nans = len(self.values) - len(finite)
+        self.n = len(finite)
+        self.m = sum(finite) / self.n if self.n else 0.0
+        self.m2 = sum((v - self.m) ** 2 for v in finite)
+        self.updates = 0
+
+    def _add(self, x):
+        if math.isnan(x):
+            self.nans += 1
+            return
+        self.n += 1
+        d = x - self.m
+        self.m += d / self.n
+        self.m2 += d * (x - self.m)
+
+    def _remove(self, x):
+        if math.isnan(x):
+            self.nans -= 1
+            return
+        self.n -= 1
+        if self.n == 0:
+            self.m = self.m2 = 0.0
+            return
+        d = x - self.m
+        self.m -= d / self.n
+        self.m2 -= d * (x - self.m)
+
+    def push(self, x):
+        if self.full():
+            self._remove(self.values[0])  # deque(maxlen) 이 밀어낼 값
+        self.values.append(x)
+        self._add(x)
+        self.updates += 1
+        if self.updates >= self.window:
+            self._resync()
+
+    def full(self):
+        return len(self.values) == self.window
+
+    def mean(self):
+        if not self.full() or self.nans:
+            return _nan()
+        return self.m
+
+    def std(self):
+        """rolling(window).std() 와 동일한 표본 표준편차 (ddof=1)"""
+        if not self.full() or self.nans or self.window < 2:
+            return _nan()
+        return math.sqrt(max(self.m2, 0.0) / (self.window - 1))
+
+    def state_dict(self):
+        return {'window': self.window, 'values': list(self.values)}
+
+    def load_state(self, state):
+        self.__init__(state['window'])
+        self.values.extend(state['values'])
+        self._resync()
+
+
+class RollingExtreme:
+    """rolling(window).max() / .min() 증분 버전 (단조 deque, 분할상환 O(1))"""
+
+    def __init__(self, window, mode='max'):
+        self.window = window
+        self.mode = mode
+        self.count = 0
+        self.items = deque()  # (순번, 값)
+
+    def update(self, x):
+        better = (lambda a, b: a >= b) if self.mode == 'max' else (lambda a, b: a <= b)
+        while self.items and better(x, self.items[-1][1]):
+            self.items.pop()
+        self.items.append((self.count, x))
+        while self.items[0][0] <= self.count - self.window:
+            self.items.popleft()
+        self.count += 1
+        return self.items[0][1] if self.count >= self.window else _nan()
+
+    def state_dict(self):
+        return {'window': self.window, 'mode': self.mode, 'count': self.count, 'items': [list(i) for i in self.items]}
+
+    def load_state(self, state):
+        self.__init__(state['window'], state['mode'])
+        self.count = state['count']
+        self.items.extend(tuple(i) for i in state['items'])
+
+
+class StreamMACD:
+    """apply_macd 증분 버전 (MACD / Signal 및 매수·매도 신호)
+
+    강제 청산(폐장 10분 전) 은 배치와 같이 '최근 frame_bars 봉' 프레임 기준으로 판단한다.
+    (프레임 안에서 매수 이후 매도가 없고, 첫 매수 이후 처음 맞는 청산 구간 봉에서 1회)
+    frame_bars 는 실시간 분석 프레임 크기 (ex. 1분봉 2400개 → 15분봉 160개).
+    """
+
+    def __init__(self, fast=12, slow=26, signal=3, frame_bars=160):
+        self.fast = StreamEMA(fast)
+        self.slow = StreamEMA(slow)
+        self.signal = StreamEMA(signal)
+        self.frame_bars = frame_bars
+        self.prev = None  # (MACD, Signal)
+        self.count = 0
+        self.events = deque()  # 프레임 안의 (순번, 'buy' / 'sell' / 'late'), 교차 / 청산 구간 봉만
+
+    def _forced(self):
+        bought = False
+        for _, kind in self.events:
+            if kind == 'sell':
+                return False
+            if kind == 'buy':
+                bought = True
+            elif bought:
+                return False  # 매수 이후 앞선 청산 구간 봉이 있었음 → 배치에서는 그 봉이 강제 청산
+        return bought
+
+    def update(self, bar):
+        close = _to_float(bar['close'])
+        macd = self.fast.update(close) - self.slow.update(close)
+        signal = self.signal.update(macd)
+
+        # 프레임 첫 봉은 배치에서도 신호 없음 → 프레임 두 번째 봉부터 유지
+        while self.events and self.events[0][0] < self.count - self.frame_bars + 2:
+            self.events.popleft()
+
+        buy = sell = late = False
+        ts = pd.Timestamp(bar['time'])
+        if self.prev is not None and ts.tzinfo is not None and main_s.is_regular_trading_hours(ts):
+            prev_macd, prev_signal = self.prev
+            if prev_macd < prev_signal and macd > signal:
+                buy = True
+            elif prev_macd > prev_signal and macd < signal:
+                sell = True
+            else:
+                late = main_s.is_last_trading_window(ts)
+
+        forced = late and self._forced()
+        if buy or sell or late:
+            self.events.append((self.count, 'buy' if buy else 'sell' if sell else 'late'))
+        sell = sell or forced
+
+        self.prev = (macd, signal)
+        self.count += 1
+        return {'MACD': macd, 'Signal': signal, 'buy_signal': buy, 'sell_signal': sell}
+
+    def state_dict(self):
+        return {
+            'fast': self.fast.state_dict(), 'slow': self.slow.state_dict(), 'signal': self.signal.state_dict(),
+            'frame_bars': self.frame_bars, 'prev': list(self.prev) if self.prev is not None else None,
+            'count': self.count, 'events': [list(e) for e in self.events],
+        }
+
+    def load_state(self, state):
+        self.fast.load_state(state['fast'])
+        self.slow.load_state(state['slow'])
+        self.signal.load_state(state['signal'])
+        self.frame_bars = state['frame_bars']
+        self.prev = tuple(state['prev']) if state['prev'] is not None else None
+        self.count = state['count']
+        self.events = deque(tuple(e) for e in state['events'])
+
+
+class StreamRSI:
+    """apply_rsi 증분 버전 (단순 이동평균 RSI 및 20/80 신호)"""
+
+    def __init__(self, window=14, lower=20, upper=80):
+        self.lower = lower
+        self.upper = upper
+        self.gain = RollingWindow(window)
+        self.loss = RollingWindow(window)
+        self.last_close = None
+
+    def update(self, bar):
+        close = _to_float(bar['close'])
+        delta = _nan() if self.last_close is None else close - self.last_close
+        self.last_close = close
+        # delta.where(delta > 0, 0) 와 동일: NaN 은 0 으로 취급
+        self.gain.push(delta if delta > 0 else 0.0)
+        self.loss.push(-delta if delta < 0 else 0.0)
+
+        gain, loss = self.gain.mean(), self.loss.mean()
+        if math.isnan(gain) or math.isnan(loss):
+            rsi = _nan()
+        elif loss == 0:
+            rsi = 100.0 if gain > 0 else _nan()
+        else:
+            rsi = 100 - (100 / (1 + gain / loss))
+
+        ts = pd.Timestamp(bar['time'])
+        rth = ts.tzinfo is not None and main_s.is_regular_trading_hours(ts)
+        return {
+            'RSI': rsi,
+            'buy_signal': bool(rth and rsi <= self.lower),
+            'sell_signal': bool(rth and rsi >= self.upper),
+        }
+
+    def state_dict(self):
+        return {'lower': self.lower, 'upper': self.upper, 'gain': self.gain.state_dict(),
+                'loss': self.loss.state_dict(), 'last_close': self.last_close}
+
+    def load_state(self, state):
+        self.lower, self.upper = state['lower'], state['upper']
+        self.gain.load_state(state['gain'])
+        self.loss.load_state(state['loss'])
+        self.last_close = state['last_close']
+
+
+class StreamBollinger:
+    """apply_bollinger 증분 버전"""
+
+    def __init__(self, window=20, k=2):
+        self.k = k
+        self.closes = RollingWindow(window)
+
+    def update(self, bar):
+        self.closes.push(_to_float(bar['close']))
+        ma, sd = self.closes.mean(), self.closes.std()
+        return {'MA20': ma, 'UpperBB': ma + sd * self.k, 'lowerBB': ma - sd * self.k}
+
+    def state_dict(self):
+        return {'k': self.k, 'closes': self.closes.state_dict()}
+
+    def load_state(self, state):
+        self.k = state['k']
+        self.closes.load_state(state['closes'])
+
+
+class StreamHedgingBand:
+    """apply_hedging_band 증분 버전 (Keltner + Bollinger + Donchian)"""
+
+    def __init__(self, window=21, atr_window=14, k=2):
+        self.k = k
+        self.kc_ema = StreamEMA(window)
+        self.kc_range = RollingWindow(atr_window)
+        self.closes = RollingWindow(window)
+        self.dc_high = RollingExtreme(window, 'max')
+        self.dc_low = RollingExtreme(window, 'min')
+
+    def update(self, bar):
+        close, high, low = _to_float(bar['close']), _to_float(bar['high']), _to_float(bar['low'])
+        ema = self.kc_ema.update(close)
+        self.kc_range.push(high - low)
+        self.closes.push(close)
+        atr = self.kc_range.mean()
+        sma, sd = self.closes.mean(), self.closes.std()
+        dc_upper, dc_lower = self.dc_high.update(high), self.dc_low.update(low)
+
+        # pd.concat(...).max(axis=1) 처럼 NaN 은 건너뛴다
+        uppers = [v for v in (ema + self.k * atr, sma + self.k * sd, dc_upper) if not math.isnan(v)]
+        lowers = [v for v in (ema - self.k * atr, sma - self.k * sd, dc_lower) if not math.isnan(v)]
+        return {
+            'Hedging_Upper': max(uppers) if uppers else _nan(),
+            'Hedging_Lower': min(lowers) if lowers else _nan(),
+            'Hedging_Center': (ema + sma + (dc_upper + dc_lower) / 2) / 3,
+        }
+
+    def state_dict(self):
+        return {
+            'k': self.k, 'kc_ema': self.kc_ema.state_dict(), 'kc_range': self.kc_range.state_dict(),
+            'closes': self.closes.state_dict(),
+            'dc_high': self.dc_high.state_dict(), 'dc_low': self.dc_low.state_dict(),
+        }
+
+    def load_state(self, state):
+        self.k = state['k']
+        self.kc_ema.load_state(state['kc_ema'])
+        self.kc_range.load_state(state['kc_range'])
+        self.closes.load_state(state['closes'])
+        self.dc_high.load_state(state['dc_high'])
+        self.dc_low.load_state(state['dc_low'])
+
+
+class BarResampler:
+    """1분봉을 N분봉으로 묶는다. 구간의 마지막 분 봉이 들어오거나(update) 구간 끝 시각이 지나면(flush) 완성된 봉을 반환한다.
+
+    구간 경계는 pandas resample(f'{N}min') 과 같다 (자정 기준 정렬, 왼쪽 라벨).
+    이미 닫은 구간의 늦은 1분봉은 무시한다.
+    """
+
+    def __init__(self, interval=15):
+        self.interval = interval
+        self.freq = f'{interval}min'
+        self.current = None
+        self.last_closed = None
+
+    def update(self, bar):
+        """1분봉 하나 반영 → 이번에 완성된 N분봉 목록"""
+        ts = pd.Timestamp(bar['time'])
+        start = ts.floor(self.freq)
+        if self.last_closed is not None and start <= self.last_closed:
+            return []
+        closed = []
+        if self.current is not None and start != self.current['time']:
+            closed.append(self._close())  # 마지막 분에 체결이 없던 구간
+        if self.current is None:
+            self.current = {
+                'time': start, 'open': float(bar['open']), 'high': float(bar['high']),
+                'low': float(bar['low']), 'close': float(bar['close']), 'volume': float(bar['volume']),
+            }
+        else:
+            c = self.current
+            c['high'] = max(c['high'], float(bar['high']))
+            c['low'] = min(c['low'], float(bar['low']))
+            c['close'] = float(bar['close'])
+            c['volume'] += float(bar['volume'])
+        if ts >= start + pd.Timedelta(minutes=self.interval - 1):
+            closed.append(self._close())  # 구간 마지막 분 → 다음 봉을 기다리지 않고 바로 마감
+        return closed
+
+    def flush(self, now):
+        """now(봉과 같은 기준 시각) 가 진행 중인 구간 끝을 지났으면 마감 → 완성된 봉 목록"""
+        if self.current is not None and pd.Timestamp(now) >= self.current['time'] + pd.Timedelta(minutes=self.interval):
+            return [self._close()]
+        return []
+
+    def _close(self):
+        bar, self.current = self.current, None
+        self.last_closed = bar['time']
+        return bar
+
+    def partial(self):
+        """아직 닫히지 않은(형성 중인) 봉"""
+        return dict(self.current) if self.current is not None else None
+
+    def state_dict(self):
+        current = None if self.current is None else {**self.current, 'time': self.current['time'].isoformat()}
+        last_closed = None if self.last_closed is None else self.last_closed.isoformat()
+        return {'interval': self.interval, 'current': current, 'last_closed': last_closed}
+
+    def load_state(self, state):
+        self.__init__(state['interval'])
+        cur = state['current']
+        self.current = None if cur is None else {**cur, 'time': pd.Timestamp(cur['time'])}
+        self.last_closed = None if state['last_closed'] is None else pd.Timestamp(state['last_closed'])
+
+
+class IndicatorEngine:
+    """여러 증분 지표를 묶어서 봉 단위로 갱신
+
+    config: main_s.SIGNAL_CONFIG 와 같은 키 (지표 on/off + 파라미터, 빠진 키는 기본값)
+    frame_bars: MACD 강제 청산 판단 프레임 (StreamMACD 참고)
+    """
+
+    def __init__(self, config=None, frame_bars=160):
+        c = {**main_s.SIGNAL_CONFIG, **(config or {})}
+        self.indicators = {}
+        if c['macd']:
+            self.indicators['macd'] = StreamMACD(c['macd_fast'], c['macd_slow'], c['macd_signal'], frame_bars)
+        if c['rsi']:
+            self.indicators['rsi'] = StreamRSI(c['rsi_window'], c['rsi_lower'], c['rsi_upper'])
+        if c['bollinger']:
+            self.indicators['bollinger'] = StreamBollinger(c['bb_window'], c['bb_k'])
+        if c['hedging_band']:
+            self.indicators['hedging_band'] = StreamHedgingBand(c['hb_window'], c['hb_atr_window'], c['hb_k'])
+
+    def update(self, bar):
+        """닫힌 봉 하나 반영, 배치 계산의 한 행과 같은 dict 반환"""
+        row = {'time': bar['time'], 'buy_signal': False, 'sell_signal': False}
+        for ind in self.indicators.values():
+            out = ind.update(bar)
+            buy, sell = out.pop('buy_signal', False), out.pop('sell_signal', False)
+            row['buy_signal'] = row['buy_signal'] or buy
+            row['sell_signal'] = row['sell_signal'] or sell
+            row.update(out)
+        return row
+
+    def peek(self, bar):
+        """형성 중인 봉으로 지표를 미리 계산 (상태는 변경하지 않음)"""
+        state = self.state_dict()
+        row = self.update(bar)
+        self.load_state(state)
+        return row
+
+    def warmup(self, df):
+        """과거 봉(DataFrame, DatetimeIndex 또는 time 컬럼)으로 상태를 채운다"""
+        frame = df if 'time' in df.columns else df.rename_axis('time').reset_index()
+        row = None
+        for bar in frame[['time', 'open', 'high', 'low', 'close']].to_dict('records'):
+            row = self.update(bar)
+        return row
+
+    def state_dict(self):
+        return {name: ind.state_dict() for name, ind in self.indicators.items()}
+
+    def load_state(self, state):
+        for name, ind in self.indicators.items():
+            ind.load_state(state[name])
+
+    def save_checkpoint(self, path):
+        """체크포인트 파일 저장 (임시 파일 기록 후 교체)"""
+        _write_json(path, self.state_dict())
+
+    def load_checkpoint(self, path):
+        with open(path, encoding='utf-8') as f:
+            self.load_state(json.load(f))
+
+
+def _write_json(path, obj):
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(obj, f)
+    os.replace(tmp, path)
+
+
+def _ny(ts):
+    """DB 의 tz 없는 뉴욕 시각 → tz-aware (main_s.prepare_frame 과 같은 처리)"""
+    ts = pd.Timestamp(ts)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize('America/New_York', ambiguous='NaT', nonexistent='shift_forward')
+    return ts
+
+
+class LiveSignals:
+    """실시간 수집 루프용: 새 1분봉 → N분봉(BarResampler) → IndicatorEngine
+
+    feed() 로 DB 에 새로 저장된 1분봉만 넘기면 마감된 N분봉의 지표 / 시그널 행을 바로 돌려준다.
+    상태(엔진 + 리샘플러 + 마지막 1분봉 시각)는 checkpoint_path 에 저장 → 재시작해도 이어서 갱신.
+    interval / config / frame_bars 가 다른 체크포인트는 버리고 처음부터 다시 채운다.
+
+        live = indicator_stream.LiveSignals(15, SIGNAL_CONFIG, checkpoint_path='indicators.json')
+        rows = live.feed(new_minutes) + live.flush(now)
+        live.save_checkpoint()
+    """
+
+    def __init__(self, interval=15, config=None, frame_bars=160, checkpoint_path=None):
+        self.interval = interval
+        self.config = {**main_s.SIGNAL_CONFIG, **(config or {})}
+        self.frame_bars = frame_bars
+        self.checkpoint_path = checkpoint_path
+        self.reset()
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            self.load_checkpoint()
+
+    def reset(self):
+        self.engine = IndicatorEngine(self.config, self.frame_bars)
+        self.resampler = BarResampler(self.interval)
+        self.last_minute = None  # 마지막으로 반영한 1분봉 시각 (tz 없는 뉴욕 시각)
+
+    def _settings(self):
+        return {'interval': self.interval, 'config': self.config, 'frame_bars': self.frame_bars}
+
+    def _emit(self, bars):
+        return [self.engine.update({**bar, 'time': _ny(bar['time'])}) for bar in bars]
+
+    def feed(self, df):
+        """시간순 1분봉(time 또는 datetime 컬럼) 반영 → 마감된 N분봉 행 목록 (이미 반영한 시각은 건너뜀)"""
+        col = 'time' if 'time' in df.columns else 'datetime'
+        rows = []
+        for bar in df[[col, 'open', 'high', 'low', 'close', 'volume']].to_dict('records'):
+            ts = pd.Timestamp(bar.pop(col))
+            if self.last_minute is not None and ts <= self.last_minute:
+                continue
+            self.last_minute = ts
+            rows += self._emit(self.resampler.update({**bar, 'time': ts}))
+        return rows
+
+    def flush(self, now):
+        """now(tz 없는 뉴욕 시각) 기준으로 끝난 구간 마감 (마지막 분에 체결이 없던 봉)"""
+        return self._emit(self.resampler.flush(now))
+
+    def state_dict(self):
+        return {
+            'settings': self._settings(), 'engine': self.engine.state_dict(),
+            'resampler': self.resampler.state_dict(),
+            'last_minute': None if self.last_minute is None else self.last_minute.isoformat(),
+        }
+
+    def load_state(self, state):
+        if state.get('settings') != self._settings():
+            self.reset()  # 설정 변경 → 처음부터
+            return False
+        self.engine.load_state(state['engine'])
+        self.resampler.load_state(state['resampler'])
+        self.last_minute = None if state['last_minute'] is None else pd.Timestamp(state['last_minute'])
+        return True
+
+    def save_checkpoint(self):
+        if self.checkpoint_path:
+            _write_json(self.checkpoint_path, self.state_dict())
+
+    def load_checkpoint(self):
+        try:
+            with open(self.checkpoint_path, encoding='utf-8') as f:
+                return self.load_state(json.load(f))
+        except (ValueError, KeyError) as e:
+            print("⚠️ 지표 체크포인트 무시:", e)
+            self.reset()
+            return False
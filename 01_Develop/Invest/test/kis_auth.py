@@ -10,7 +10,7 @@ Created on Wed Feb 15 16:57:19 2023
 #====|  API 호출 공통 함수 포함                                  |=====================
 
 
-import time, copy
+import time
 import yaml
 import requests
 import json
@@ -25,6 +25,10 @@ import pandas as pd
 from collections import namedtuple
 from datetime import datetime
 
+import kis_scheduler
+import kis_token
+import kis_transport
+
 from Crypto.Cipher import AES
 from Crypto.Util.Padding import unpad
 from base64 import b64decode
@@ -49,87 +53,119 @@ with open(config_root + 'config.yaml', encoding='UTF-8') as f:
 
 _TRENV = tuple()
 _last_auth_time = datetime.now()
-_autoReAuth = False
+_active_svr = None  # auth() 로 선택된 환경 (my_prod / vps)
 _DEBUG = False
 _isPaper = False
 
-# 기본 헤더값 정의
-_base_headers = {
+# API 호출 스케줄러 (앱키별 초당 호출 한도, 주문 우선)
+# 한국투자 Open API 초당 거래건수: 실전 20건, 모의 2건 (config.yaml 에서 변경 가능)
+_scheduler = kis_scheduler.RequestScheduler()
+_rate_limits = {
+    'my_prod': _cfg.get('rate_limit_prod', 20),
+    'vps': _cfg.get('rate_limit_vps', 2),
+}
+
+# HTTP 전송 계층 (환경별 keep-alive 세션 풀, 재시도, 지연시간 통계)
+_transport = kis_transport.Transport(
+    pool_size=_cfg.get('http_pool_size', 10),
+    timeout=(_cfg.get('http_connect_timeout', 3.05), _cfg.get('http_read_timeout', 10)),
+    retries=_cfg.get('http_retries', 3),
+    backoff=_cfg.get('http_backoff', 0.3),
+)
+
+# 기본 헤더값 정의 (BASE_HEADERS 는 인증 정보 없는 공통값, _base_headers 는 전역 환경용)
+BASE_HEADERS = {
     "Content-Type": "application/json",
     "Accept": "text/plain",
     "charset": "UTF-8",
     'User-Agent': _cfg['my_agent']
 }
+_base_headers = dict(BASE_HEADERS)
+
+KISEnv = namedtuple('KISEnv', ['my_app', 'my_sec', 'my_acct', 'my_prod', 'my_token', 'my_url'])
+
+
+# 환경별 config.yaml 키 (앱키, 앱시크리트, 도메인)
+_SVR_KEYS = {
+    'my_prod': ('my_app', 'my_sec', 'my_url'),        # 실전투자
+    'vps': ('paper_app', 'paper_sec', 'paper_url'),   # 모의투자
+}
+
+# (환경, 계좌상품코드) → config.yaml 계좌번호 키
+_ACCOUNT_KEYS = {
+    ('my_prod', '01'): 'my_acct',           # 실전투자 주식투자, 위탁계좌, 투자계좌
+    ('my_prod', '30'): 'my_acct_stock',     # 실전투자 증권저축계좌
+    ('my_prod', '03'): 'my_acct_future',    # 실전투자 선물옵션(파생)
+    ('my_prod', '08'): 'my_acct_future',    # 실전투자 해외선물옵션(파생)
+    ('vps', '01'): 'my_paper_stock',        # 모의투자 주식투자, 위탁계좌, 투자계좌
+    ('vps', '03'): 'my_paper_future',       # 모의투자 선물옵션(파생)
+}
+
+
+def _account(svr, product):
+    return _cfg[_ACCOUNT_KEYS[(svr, product)]]
+
+
+# 토큰 발급 (/oauth2/tokenP) → (토큰값, 만료일시), 유효기간 1일 / 6시간 이내 재발급시 기존 토큰값과 동일
+def _issue_token(svr='my_prod'):
+    ak1, ak2, url = _SVR_KEYS[svr]
+    p = {
+        "grant_type": "client_credentials",
+        "appkey": _cfg[ak1],
+        "appsecret": _cfg[ak2],
+    }
+    res = _transport.post(f'{_cfg[url]}/oauth2/tokenP', data=json.dumps(p), headers=dict(BASE_HEADERS))
+    if res.status_code != 200:
+        raise RuntimeError(f"{res.status_code} | {res.text}")
+    result = _getResultObject(res.json())
+    return result.access_token, datetime.strptime(result.access_token_token_expired, '%Y-%m-%d %H:%M:%S')
+
+
+# 백그라운드 갱신으로 토큰이 바뀌면 현재 환경의 헤더 / TR 환경값에 반영
+def _on_token_refresh(svr, token):
+    global _TRENV, _last_auth_time
+    if svr != _active_svr:
+        return
+    _base_headers["authorization"] = f"Bearer {token}"
+    if _TRENV:
+        _TRENV = _TRENV._replace(my_token=f"Bearer {token}")
+    _last_auth_time = datetime.now()
+    if (_DEBUG):
+        print(f'[{_last_auth_time}] => AUTH Key refreshed!')
+
+
+# 환경별 토큰을 메모리에 보관하고 만료 전(기본 1시간 전) 백그라운드에서 재발급, 파일은 원자적으로 저장
+_tokens = kis_token.TokenManager(
+    _issue_token,
+    {'my_prod': token_tmp, 'vps': token_tmp_vps},
+    refresh_margin=_cfg.get('token_refresh_margin', 3600),
+    on_refresh=_on_token_refresh,
+)
 
 
 # 토큰 발급 받아 저장 (토큰값, 토큰 유효시간,1일, 6시간 이내 발급신청시는 기존 토큰값과 동일, 발급시 알림톡 발송)
 def save_token(my_token, my_expired, svr = 'my_prod'):
-    valid_date = datetime.strptime(my_expired, '%Y-%m-%d %H:%M:%S')
-    # print('Save token date: ', valid_date)
-    if svr == 'my_prod':
-        with open(token_tmp, 'w', encoding='utf-8') as f:
-            f.write(f'token: {my_token}\n')
-            f.write(f'valid-date: {valid_date}\n')
-    elif svr == 'vps':
-        with open(token_tmp_vps, 'w', encoding='utf-8') as f:
-            f.write(f'token: {my_token}\n')
-            f.write(f'valid-date: {valid_date}\n')
-
-
-# 토큰 확인 (토큰값, 토큰 유효시간_1일, 6시간 이내 발급신청시는 기존 토큰값과 동일, 발급시 알림톡 발송)
+    _tokens.save(svr, my_token, datetime.strptime(my_expired, '%Y-%m-%d %H:%M:%S'))
+
+
+# 토큰 확인 (저장된 토큰 만료일시 > 현재일시 인경우 보관 토큰 리턴)
 def read_token(svr='my_prod'):
-    if svr == 'my_prod':
-        try:
-            # 토큰이 저장된 파일 읽기
-            with open(token_tmp, encoding='UTF-8') as f:
-                tkg_tmp = yaml.load(f, Loader=yaml.FullLoader)
-
-            # 토큰 만료 일,시간
-            exp_dt = datetime.strftime(tkg_tmp['valid-date'], '%Y-%m-%d %H:%M:%S')
-            # 현재일자,시간
-            now_dt = datetime.today().strftime("%Y-%m-%d %H:%M:%S")
-
-            # print('expire dt: ', exp_dt, ' vs now dt:', now_dt)
-            # 저장된 토큰 만료일자 체크 (만료일시 > 현재일시 인경우 보관 토큰 리턴)
-            if exp_dt > now_dt:
-                return tkg_tmp['token']
-            else:
-                # print('Need new token: ', tkg_tmp['valid-date'])
-                return None
-        except Exception as e:
-            # print('read token error: ', e)
-            return None
-    elif svr == 'vps':
-        try:
-            # 토큰이 저장된 파일 읽기
-            with open(token_tmp_vps, encoding='UTF-8') as f:
-                tkg_tmp = yaml.load(f, Loader=yaml.FullLoader)
-
-            # 토큰 만료 일,시간
-            exp_dt = datetime.strftime(tkg_tmp['valid-date'], '%Y-%m-%d %H:%M:%S')
-            # 현재일자,시간
-            now_dt = datetime.today().strftime("%Y-%m-%d %H:%M:%S")
-
-            # print('expire dt: ', exp_dt, ' vs now dt:', now_dt)
-            # 저장된 토큰 만료일자 체크 (만료일시 > 현재일시 인경우 보관 토큰 리턴)
-            if exp_dt > now_dt:
-                return tkg_tmp['token']
-            else:
-                # print('Need new token: ', tkg_tmp['valid-date'])
-                return None
-        except Exception as e:
-            # print('read token error: ', e)
-            return None
-
-# 토큰 유효시간 체크해서 만료된 토큰이면 재발급처리
+    saved = _tokens.load(svr)
+    if saved is None or saved[1] <= datetime.now():
+        return None
+    return saved[0]
+
+
+# 기본 header 값 (요청마다 얕은 복사 + 현재 토큰, 만료 임박 토큰은 백그라운드에서 갱신됨)
 def _getBaseHeader():
-    if _autoReAuth: reAuth()
-    return copy.deepcopy(_base_headers)
+    headers = {**_base_headers}
+    if _active_svr is not None:
+        headers["authorization"] = f"Bearer {_tokens.get(_active_svr)}"
+    return headers
 
 
 # 가져오기 : 앱키, 앱시크리트, 종합계좌번호(계좌번호 중 숫자8자리), 계좌상품코드(계좌번호 중 숫자2자리), 토큰, 도메인
 def _setTRENV(cfg):
-    nt1 = namedtuple('KISEnv', ['my_app', 'my_sec', 'my_acct', 'my_prod', 'my_token', 'my_url'])
     d = {
         'my_app': cfg['my_app'],  # 앱키
         'my_sec': cfg['my_sec'],  # 앱시크리트
@@ -141,7 +177,7 @@ def _setTRENV(cfg):
 
     # print(cfg['my_app'])
     global _TRENV
-    _TRENV = nt1(**d)
+    _TRENV = KISEnv(**d)
 
 
 def isPaperTrading():  # 모의투자 매매
@@ -150,87 +186,36 @@ def isPaperTrading():  # 모의투자 매매
 
 # 실전투자면 'prod', 모의투자면 'vps'를 셋팅 하시기 바랍니다.
 def changeTREnv(token_key, svr='my_prod', product=_cfg['my_prod']):
-    cfg = dict()
-
     global _isPaper
-    if svr == 'my_prod':  # 실전투자
-        ak1 = 'my_app'  # 실전투자용 앱키
-        ak2 = 'my_sec'  # 실전투자용 앱시크리트
-        url = 'my_url'
-        _isPaper = False
-    elif svr == 'vps':  # 모의투자
-        ak1 = 'paper_app'  # 모의투자용 앱키
-        ak2 = 'paper_sec'  # 모의투자용 앱시크리트
-        url = 'paper_url'
-        _isPaper = True
-
-    cfg['my_app'] = _cfg[ak1]
-    cfg['my_sec'] = _cfg[ak2]
-
-    if svr == 'my_prod' and product == '01':  # 실전투자 주식투자, 위탁계좌, 투자계좌
-        cfg['my_acct'] = _cfg['my_acct']
-    elif svr == 'my_prod' and product == '30':  # 실전투자 증권저축계좌
-        cfg['my_acct'] = _cfg['my_acct_stock']
-    elif svr == 'my_prod' and product == '03':  # 실전투자 선물옵션(파생)
-        cfg['my_acct'] = _cfg['my_acct_future']
-    elif svr == 'my_prod' and product == '08':  # 실전투자 해외선물옵션(파생)
-        cfg['my_acct'] = _cfg['my_acct_future']
-    elif svr == 'vps' and product == '01':  # 모의투자 주식투자, 위탁계좌, 투자계좌
-        cfg['my_acct'] = _cfg['my_paper_stock']
-    elif svr == 'vps' and product == '03':  # 모의투자 선물옵션(파생)
-        cfg['my_acct'] = _cfg['my_paper_future']
-
-    cfg['my_prod'] = product
-    cfg['my_token'] = token_key
-    cfg['my_url'] = _cfg[url]
+    _isPaper = svr == 'vps'  # 모의투자
+    ak1, ak2, url = _SVR_KEYS[svr]
+
+    cfg = {
+        'my_app': _cfg[ak1],
+        'my_sec': _cfg[ak2],
+        'my_acct': _account(svr, product),
+        'my_prod': product,
+        'my_token': token_key,
+        'my_url': _cfg[url],
+    }
 
     # print(cfg)
     _setTRENV(cfg)
 
 
 def _getResultObject(json_data):
-    _tc_ = namedtuple('res', json_data.keys())
-
-    return _tc_(**json_data)
+    return Record(json_data)
 
 
 # Token 발급, 유효기간 1일, 6시간 이내 발급시 기존 token값 유지, 발급시 알림톡 무조건 발송
 # 모의투자인 경우  svr='vps', 투자계좌(01)이 아닌경우 product='XX' 변경하세요 (계좌번호 뒤 2자리)
 def auth(svr='my_prod', product=_cfg['my_prod'], url=None):
-    p = {
-        "grant_type": "client_credentials",
-    }
-    # 개인 환경파일 "kis_devlp.yaml" 파일을 참조하여 앱키, 앱시크리트 정보 가져오기
-    # 개인 환경파일명과 위치는 고객님만 아는 위치로 설정 바랍니다.
-    if svr == 'my_prod':  # 실전투자
-        ak1 = 'my_app'  # 앱키 (실전투자용)
-        ak2 = 'my_sec'  # 앱시크리트 (실전투자용)
-        url = 'my_url'
-    elif svr == 'vps':  # 모의투자
-        ak1 = 'paper_app'  # 앱키 (모의투자용)
-        ak2 = 'paper_sec'  # 앱시크리트 (모의투자용)
-        url = 'paper_url'
-
-    # 앱키, 앱시크리트 가져오기
-    p["appkey"] = _cfg[ak1]
-    p["appsecret"] = _cfg[ak2]
-
-    # 기존 발급된 토큰이 있는지 확인
-    saved_token = read_token(svr)  # 기존 발급 토큰 확인
-    # print("saved_token: ", saved_token)
-    if saved_token is None:  # 기존 발급 토큰 확인이 안되면 발급처리
-        url = f'{_cfg[url]}/oauth2/tokenP'
-        res = requests.post(url, data=json.dumps(p), headers=_getBaseHeader())  # 토큰 발급
-        rescode = res.status_code
-        if rescode == 200:  # 토큰 정상 발급
-            my_token = _getResultObject(res.json()).access_token  # 토큰값 가져오기
-            my_expired= _getResultObject(res.json()).access_token_token_expired  # 토큰값 만료일시 가져오기
-            save_token(my_token, my_expired, svr)  # 새로 발급 받은 토큰 저장
-        else:
-            print('Get Authentification token fail!\nYou have to restart your app!!!')
-            return
-    else:
-        my_token = saved_token  # 기존 발급 토큰 확인되어 기존 토큰 사용
+    # 메모리 → 토큰 파일 → 신규 발급 순으로 확인 (동시 호출해도 발급은 1번)
+    try:
+        my_token = _tokens.get(svr)
+    except Exception as e:
+        print(f'Get Authentification token fail!\nYou have to restart your app!!! ({e})')
+        return
 
     # 발급토큰 정보 포함해서 헤더값 저장 관리, API 호출시 필요
     changeTREnv(f"Bearer {my_token}", svr, product)
@@ -239,19 +224,39 @@ def auth(svr='my_prod', product=_cfg['my_prod'], url=None):
     _base_headers["appkey"] = _TRENV.my_app
     _base_headers["appsecret"] = _TRENV.my_sec
 
-    global _last_auth_time
+    global _last_auth_time, _active_svr
     _last_auth_time = datetime.now()
+    _active_svr = svr
+    _tokens.start()  # 만료 전 백그라운드 재발급
 
     if (_DEBUG):
         print(f'[{_last_auth_time}] => get AUTH Key completed!')
 
 
 # end of initialize, 토큰 재발급, 토큰 발급시 유효시간 1일
-# 프로그램 실행시 _last_auth_time에 저장하여 유효시간 체크, 유효시간 만료시 토큰 발급 처리
-def reAuth(svr='prod', product=_cfg['my_prod']):
-    n2 = datetime.now()
-    if (n2 - _last_auth_time).seconds >= 86400:  # 유효시간 1일
+# 토큰 갱신은 백그라운드에서 처리되므로 환경이 바뀐 경우에만 auth 다시 호출
+def reAuth(svr='my_prod', product=_cfg['my_prod']):
+    if svr != _active_svr:
         auth(svr, product)
+    else:
+        _tokens.get(svr)
+
+
+# 웹소켓 접속키 발급 (실시간 시세 / 체결통보 구독용, 접근토큰과 별개)
+def getApprovalKey(svr='my_prod'):
+    ak1, ak2, url = _SVR_KEYS['my_prod' if svr == 'my_prod' else 'vps']
+
+    p = {
+        "grant_type": "client_credentials",
+        "appkey": _cfg[ak1],
+        "secretkey": _cfg[ak2],
+    }
+    res = _transport.post(f'{_cfg[url]}/oauth2/Approval', data=json.dumps(p),
+                          headers={"content-type": "application/json; utf-8"})
+    if res.status_code == 200:
+        return res.json().get('approval_key')
+    print(f"Get approval key fail! ({res.status_code} | {res.text})")
+    return None
 
 
 def getEnv():
@@ -261,6 +266,29 @@ def getEnv():
 def getTREnv():
     return _TRENV
 
+
+# 호출 스케줄러 대기열 / 대기시간 통계
+def getSchedulerStats():
+    return _scheduler.stats()
+
+
+# API 경로별 호출 지연시간 통계
+def getLatencyStats():
+    return _transport.latency_stats()
+
+
+# key / paper 를 주면 해당 앱키 기준 (KISClient), 없으면 현재 전역 환경 기준
+def _throttle(tr_id, level=None, key=None, paper=None):
+    if key is None:
+        key, paper = getTREnv().my_app, isPaperTrading()
+    if not _scheduler.is_configured(key):
+        _scheduler.configure(key, _rate_limits['vps' if paper else 'my_prod'])
+    if level is None or kis_scheduler.classify(tr_id) == kis_scheduler.PRIORITY_ORDER:
+        level = kis_scheduler.current_priority(tr_id)
+    waited = _scheduler.acquire(key, level)
+    if (_DEBUG and waited > 0):
+        print(f"[scheduler] {tr_id} waited {waited:.3f}s, queue={_scheduler.queue_depth(key)}")
+
 # 주문 API에서 사용할 hash key값을 받아 header에 설정해 주는 함수
 # 현재는 hash key 필수 사항아님, 생략가능, API 호출과정에서 변조 우려를 하는 경우 사용
 # Input: HTTP Header, HTTP post param
@@ -268,7 +296,7 @@ def getTREnv():
 def set_order_hash_key(h, p):
     url = f"{getTREnv().my_url}/uapi/hashkey"  # hashkey 발급 API URL
 
-    res = requests.post(url, data=json.dumps(p), headers=h)
+    res = _transport.post(url, data=json.dumps(p), headers=h)
     rescode = res.status_code
     if rescode == 200:
         h['hashkey'] = _getResultObject(res.json()).HASH
@@ -277,55 +305,97 @@ def set_order_hash_key(h, p):
 
 
 # API 호출 응답에 필요한 처리 공통 함수
+class Record:
+    """JSON dict 를 속성으로 읽는 가벼운 래퍼
+
+    namedtuple 처럼 .필드 / _fields / _asdict() 를 지원하지만 응답마다 새 클래스를 만들지 않는다.
+    """
+    __slots__ = ('_data',)
+
+    def __init__(self, data):
+        self._data = data
+
+    def __getattr__(self, name):
+        if name == '_data':
+            raise AttributeError(name)
+        try:
+            return self._data[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def get(self, key, default=None):
+        return self._data.get(key, default)
+
+    @property
+    def _fields(self):
+        return tuple(self._data)
+
+    def _asdict(self):
+        return dict(self._data)
+
+    def __repr__(self):
+        return f"Record({self._data!r})"
+
+
+def _columns(rows):
+    """output(dict) / output2(list of dict) → {컬럼: 값 목록} (DataFrame 생성용)"""
+    if rows is None:
+        return {}
+    if isinstance(rows, dict):
+        return {k: [v] for k, v in rows.items()}
+    if not rows:
+        return {}
+    keys = rows[0].keys()
+    return {k: [row.get(k) for row in rows] for k in keys}
+
+
 class APIResp:
+    __slots__ = ('_rescode', '_resp', '_json', '_header', '_body')
+
     def __init__(self, resp):
         self._rescode = resp.status_code
         self._resp = resp
-        self._header = self._setHeader()
-        self._body = self._setBody()
-        self._err_code = self._body.msg_cd
-        self._err_message = self._body.msg1
+        self._json = resp.json()  # JSON 파싱은 1회
+        self._header = None       # 헤더는 필요할 때만 정리
+        self._body = Record(self._json)
 
     def getResCode(self):
         return self._rescode
 
-    def _setHeader(self):
-        fld = dict()
-        for x in self._resp.headers.keys():
-            if x.islower():
-                fld[x] = self._resp.headers.get(x)
-        _th_ = namedtuple('header', fld.keys())
-
-        return _th_(**fld)
-
-    def _setBody(self):
-        _tb_ = namedtuple('body', self._resp.json().keys())
-
-        return _tb_(**self._resp.json())
-
     def getHeader(self):
+        if self._header is None:
+            headers = self._resp.headers
+            self._header = Record({x: headers.get(x) for x in headers.keys() if x.islower()})
         return self._header
 
     def getBody(self):
         return self._body
 
+    def getJson(self):
+        return self._json
+
     def getResponse(self):
         return self._resp
 
+    def columns(self, key='output'):
+        """body[key] 를 {컬럼: 값 목록} 으로 (없으면 빈 dict)"""
+        return _columns(self._json.get(key))
+
+    def frame(self, key='output'):
+        """body[key] → DataFrame (dict 는 1행, list 는 행 목록)"""
+        return pd.DataFrame(self.columns(key))
+
     def isOK(self):
-        try:
-            if (self.getBody().rt_cd == '0'):
-                return True
-            else:
-                return False
-        except:
-            return False
+        return self._json.get('rt_cd') == '0'
 
     def getErrorCode(self):
-        return self._err_code
+        return self._json.get('msg_cd')
 
     def getErrorMessage(self):
-        return self._err_message
+        return self._json.get('msg1')
 
     def printAll(self):
         print("<Header>")
@@ -337,45 +407,32 @@ class APIResp:
 
     def printError(self, url):
         print('-------------------------------\nError in response: ', self.getResCode(), ' url=', url)
-        print('rt_cd : ', self.getBody().rt_cd, '/ msg_cd : ',self.getErrorCode(), '/ msg1 : ',self.getErrorMessage())
+        print('rt_cd : ', self._json.get('rt_cd'), '/ msg_cd : ',self.getErrorCode(), '/ msg1 : ',self.getErrorMessage())
         print('-------------------------------')
 
     # end of class APIResp
 
 ########### API call wrapping : API 호출 공통
 
-def _url_fetch(api_url, ptr_id, tr_cont, params, appendHeaders=None, postFlag=False, hashFlag=True):
-    url = f"{getTREnv().my_url}{api_url}"
-
-    headers = _getBaseHeader()  # 기본 header 값 정리
-
-    # 추가 Header 설정
-    tr_id = ptr_id
-    if ptr_id[0] in ('T', 'J', 'C'):  # 실전투자용 TR id 체크
-        if isPaperTrading():  # 모의투자용 TR id 식별
-            tr_id = 'V' + ptr_id[1:]
-
-    headers["tr_id"] = tr_id  # 트랜젝션 TR id
-    headers["custtype"] = "P"  # 일반(개인고객,법인고객) "P", 제휴사 "B"
-    headers["tr_cont"] = tr_cont  # 트랜젝션 TR id
+def _tr_id(ptr_id, paper):
+    if ptr_id[0] in ('T', 'J', 'C') and paper:  # 실전투자용 TR id → 모의투자용 TR id
+        return 'V' + ptr_id[1:]
+    return ptr_id
 
 
-    if appendHeaders is not None:
-        if len(appendHeaders) > 0:
-            for x in appendHeaders.keys():
-                headers[x] = appendHeaders.get(x)
-
+# throttle: 재전송(EGW00201 / 5xx) 전에 호출 → 재시도도 스케줄러 한도 안에서 보냄
+def _send(transport, url, headers, params, postFlag=False, throttle=None):
     if (_DEBUG):
         print("< Sending Info >")
-        print(f"URL: {url}, TR: {tr_id}")
+        print(f"URL: {url}, TR: {headers.get('tr_id')}")
         print(f"<header>\n{headers}")
         print(f"<body>\n{params}")
 
     if (postFlag):
         #if (hashFlag): set_order_hash_key(headers, params)
-        res = requests.post(url, headers=headers, data=json.dumps(params))
+        res = transport.post(url, headers=headers, data=json.dumps(params), throttle=throttle)
     else:
-        res = requests.get(url, headers=headers, params=params)
+        res = transport.get(url, headers=headers, params=params, throttle=throttle)
 
     if res.status_code == 200:
         ar = APIResp(res)
@@ -384,3 +441,22 @@ def _url_fetch(api_url, ptr_id, tr_cont, params, appendHeaders=None, postFlag=Fa
     else:
         print("Error Code : " + str(res.status_code) + " | " + res.text)
         return None
+
+
+def _url_fetch(api_url, ptr_id, tr_cont, params, appendHeaders=None, postFlag=False, hashFlag=True):
+    url = f"{getTREnv().my_url}{api_url}"
+
+    headers = _getBaseHeader()  # 기본 header 값 정리
+
+    # 추가 Header 설정
+    tr_id = _tr_id(ptr_id, isPaperTrading())  # 모의투자용 TR id 식별
+
+    headers["tr_id"] = tr_id  # 트랜젝션 TR id
+    headers["custtype"] = "P"  # 일반(개인고객,법인고객) "P", 제휴사 "B"
+    headers["tr_cont"] = tr_cont  # 트랜젝션 TR id
+
+    if appendHeaders:
+        headers.update(appendHeaders)
+
+    _throttle(tr_id)
+    return _send(_transport, url, headers, params, postFlag, throttle=lambda: _throttle(tr_id))
@@ -0,0 +1,93 @@
+import threading
+
+import kis_auth as kis
+import kis_transport
+
+
+# 🔹 (환경, 계좌, 상품) 단위 API 클라이언트
+# - kis_auth 의 전역 상태(_TRENV / _isPaper / _base_headers) 대신 객체마다 환경 · 계좌 · 헤더 · 세션 풀을 보관
+#   → 한 프로세스에서 실전(my_prod)과 모의(vps)를 동시에, 여러 스레드에서 사용 가능
+# - 토큰은 kis_auth 의 TokenManager 를 공유 (토큰은 앱키 단위라 같은 환경 클라이언트끼리 같은 토큰)
+# - 호출 한도도 앱키 단위 → kis_auth 스케줄러를 앱키 키로 사용 (실전 / 모의 예산이 서로 독립)
+# - main_api 함수에 client= 로 넘기면 해당 클라이언트로 호출 (없으면 기존처럼 kis_auth 전역 환경)
+#
+#   live = kis_client.get('my_prod')
+#   paper = kis_client.get('vps')
+#   main_api.get_overseas_inquire_present_balance(svr='vps', dv="02", client=paper)
+
+
+class KISClient:
+    def __init__(self, svr='my_prod', product=None, account=None, pool_size=None):
+        """account 를 주지 않으면 config.yaml 의 (svr, product) 계좌번호 사용"""
+        cfg = kis.getEnv()
+        ak1, ak2, url = kis._SVR_KEYS[svr]
+        self.svr = svr
+        self.is_paper = svr == 'vps'
+        product = product or cfg['my_prod']
+        self.env = kis.KISEnv(
+            my_app=cfg[ak1],
+            my_sec=cfg[ak2],
+            my_acct=account or kis._account(svr, product),
+            my_prod=product,
+            my_token=None,  # 토큰은 호출 시점에 TokenManager 에서 (만료 전 백그라운드 갱신)
+            my_url=cfg[url],
+        )
+        self._headers = {
+            **kis.BASE_HEADERS,
+            "appkey": self.env.my_app,
+            "appsecret": self.env.my_sec,
+        }
+        self.transport = kis_transport.Transport(
+            pool_size=pool_size or cfg.get('http_pool_size', 10),
+            timeout=kis._transport.timeout,
+            retries=kis._transport.retries,
+            backoff=kis._transport.backoff,
+        )
+        kis._tokens.start()  # 만료 전 백그라운드 재발급
+
+    def __repr__(self):
+        return f"KISClient({self.svr}, {self.env.my_acct}-{self.env.my_prod})"
+
+    def token(self):
+        return kis._tokens.get(self.svr)
+
+    def base_header(self):
+        """요청마다 얕은 복사 + 현재 토큰"""
+        return {**self._headers, "authorization": f"Bearer {self.token()}"}
+
+    def throttle(self, tr_id, level=None):
+        kis._throttle(tr_id, level, key=self.env.my_app, paper=self.is_paper)
+
+    def fetch(self, api_url, ptr_id, tr_cont, params, appendHeaders=None, postFlag=False, hashFlag=True):
+        """kis_auth._url_fetch 와 동일 (APIResp 또는 None)"""
+        headers = self.base_header()
+        tr_id = kis._tr_id(ptr_id, self.is_paper)
+        headers["tr_id"] = tr_id
+        headers["custtype"] = "P"
+        headers["tr_cont"] = tr_cont
+        if appendHeaders:
+            headers.update(appendHeaders)
+
+        self.throttle(tr_id)
+        return kis._send(self.transport, f"{self.env.my_url}{api_url}", headers, params, postFlag,
+                         throttle=lambda: self.throttle(tr_id))
+
+    def latency_stats(self):
+        return self.transport.latency_stats()
+
+    def close(self):
+        self.transport.close()
+
+
+# 클라이언트 캐시 (같은 (환경, 상품, 계좌) 는 같은 객체 → 세션 풀 공유)
+_clients = {}
+_lock = threading.Lock()
+
+
+def get(svr='my_prod', product=None, account=None):
+    key = (svr, product, account)
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = KISClient(svr, product, account)
+        return client
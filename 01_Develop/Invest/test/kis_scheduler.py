@@ -0,0 +1,126 @@
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+
+
+# 🔹 KIS API 호출 스케줄러
+# - 앱키별 토큰 버킷으로 초당 호출 한도를 지킨다 (실전 20건/초, 모의 2건/초 기본)
+#   버킷 크기 기본값은 1 → 1/rate 초 간격으로 고르게 보내 어느 1초 구간에서도 한도를 넘지 않는다
+#   (버킷 크기 = rate 면 처음 1초에 버스트 + 충전분이 함께 나가 한도의 약 2배가 된다)
+# - 대기 중인 호출은 우선순위 순서로 토큰을 받는다: 주문 > 시세 > 과거데이터 백필
+#   → 백필은 한도 내 최대 속도로 돌고, 주문은 항상 대기열 맨 앞에 선다
+# - 대기열 길이 / 대기 시간 통계 제공 (stats())
+
+PRIORITY_ORDER = 0
+PRIORITY_QUOTE = 1
+PRIORITY_BACKFILL = 2
+
+PRIORITY_NAMES = {PRIORITY_ORDER: 'order', PRIORITY_QUOTE: 'quote', PRIORITY_BACKFILL: 'backfill'}
+
+_local = threading.local()
+
+
+def classify(tr_id):
+    """TR ID 로 기본 우선순위 결정 (끝자리 U: 주문/정정/취소, 그 외: 조회)"""
+    if tr_id and tr_id[-1] == 'U':
+        return PRIORITY_ORDER
+    return PRIORITY_QUOTE
+
+
+@contextmanager
+def priority(level):
+    """with 블록 안의 현재 스레드 호출을 지정 우선순위로 보낸다 (ex. 백필 루프)"""
+    prev = getattr(_local, 'priority', None)
+    _local.priority = level
+    try:
+        yield
+    finally:
+        _local.priority = prev
+
+
+def current_priority(tr_id):
+    """주문 TR 은 항상 최우선, 그 외에는 priority() 로 지정된 값 (없으면 시세)"""
+    level = getattr(_local, 'priority', None)
+    if level is None or classify(tr_id) == PRIORITY_ORDER:
+        return classify(tr_id)
+    return level
+
+
+class _Bucket:
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.capacity = float(burst)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.waiters = []  # heap of (우선순위, 순번)
+
+    def refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+class RequestScheduler:
+    def __init__(self, default_rate=20, default_burst=1):
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        self._buckets = {}
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        self._stats = {name: {'count': 0, 'wait_total': 0.0, 'wait_max': 0.0} for name in PRIORITY_NAMES.values()}
+
+    def configure(self, key, rate, burst=None):
+        """앱키별 초당 한도 설정 (burst: 연속 전송 허용 건수, 없으면 default_burst)"""
+        with self._cond:
+            self._buckets[key] = _Bucket(rate, burst if burst is not None else self.default_burst)
+
+    def is_configured(self, key):
+        with self._cond:
+            return key in self._buckets
+
+    def _bucket(self, key):
+        if key not in self._buckets:
+            self._buckets[key] = _Bucket(self.default_rate, self.default_burst)
+        return self._buckets[key]
+
+    def acquire(self, key, level=PRIORITY_QUOTE):
+        """토큰 하나를 받을 때까지 대기, 대기한 시간(초) 반환"""
+        start = time.monotonic()
+        with self._cond:
+            bucket = self._bucket(key)
+            ticket = (level, next(self._seq))
+            heapq.heappush(bucket.waiters, ticket)
+            while True:
+                now = time.monotonic()
+                bucket.refill(now)
+                if bucket.waiters[0] == ticket and bucket.tokens >= 1:
+                    heapq.heappop(bucket.waiters)
+                    bucket.tokens -= 1
+                    self._cond.notify_all()
+                    break
+                timeout = (1 - bucket.tokens) / bucket.rate if bucket.waiters[0] == ticket else None
+                self._cond.wait(timeout)
+
+            waited = time.monotonic() - start
+            st = self._stats[PRIORITY_NAMES[level]]
+            st['count'] += 1
+            st['wait_total'] += waited
+            st['wait_max'] = max(st['wait_max'], waited)
+        return waited
+
+    def queue_depth(self, key=None):
+        with self._cond:
+            if key is not None:
+                return len(self._buckets[key].waiters) if key in self._buckets else 0
+            return sum(len(b.waiters) for b in self._buckets.values())
+
+    def stats(self):
+        """우선순위별 호출 수 / 평균·최대 대기 시간, 현재 대기열 길이"""
+        with self._cond:
+            out = {}
+            for name, st in self._stats.items():
+                avg = st['wait_total'] / st['count'] if st['count'] else 0.0
+                out[name] = {'count': st['count'], 'wait_avg': avg, 'wait_max': st['wait_max']}
+            out['queue_depth'] = sum(len(b.waiters) for b in self._buckets.values())
+            return out
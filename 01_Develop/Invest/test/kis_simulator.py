@@ -0,0 +1,606 @@
+import argparse
+import json
+import random
+import threading
+import time
+import zlib
+from collections import deque
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+import chart_decoder
+import market_calendar
+
+
+# 🔹 로컬 KIS Open API 시뮬레이터 (오프라인 부하 테스트 / 거래일 재현용)
+# - main_api 가 쓰는 REST 경로를 같은 요청 · 응답 형식으로 제공
+#   /oauth2/tokenP, /oauth2/Approval, 분봉(keyb / NEXT 페이징, NMIN), 현재가상세, 기간별시세,
+#   잔고 · 체결기준현재잔고 · 매수가능금액, 주문 · 정정취소
+# - 시세: 종목 · 날짜별 seed 로 만든 합성 1분봉(같은 seed 면 항상 같은 데이터) 또는 기록된 분봉(csv / DuckDB minute_bars)
+# - 시계: 지정한 시각부터 speed 배속으로 흐르는 뉴욕 시각 → 그 시각까지의 봉만 응답 (거래일 재현)
+# - 지연시간(latency + jitter), 앱키별 초당 호출 한도 초과 시 HTTP 500 + EGW00201, 임의 HTTP 500(error_rate) 주입
+# - 주문: 지정가가 현재가 이상(매수) / 이하(매도)면 즉시 체결, 아니면 미체결로 두고 이후 조회 시 현재가로 체결 확인
+#
+#   sim = kis_simulator.KISSimulator(latency=0.02, rate_limit=20).start()
+#   kis.getEnv()['my_url'] = sim.url   # 또는 config.yaml 의 my_url / paper_url 을 시뮬레이터 주소로
+#
+#   python kis_simulator.py --port 8900 --latency 0.03 --rate-limit 20 --start "2025-03-10 09:30" --speed 60
+
+THROTTLE_BODY = {"rt_cd": "1", "msg_cd": "EGW00201", "msg1": "초당 거래건수를 초과하였습니다."}
+TOKEN_BODY = {"rt_cd": "1", "msg_cd": "EGW00123", "msg1": "기간이 만료된 token 입니다."}
+UNLIMITED_PATHS = ('/oauth2/tokenP', '/oauth2/Approval')
+
+BUY_TR_CODES = ('1002',)   # TTTT1002U / VTTT1002U
+SELL_TR_CODES = ('1006',)  # TTTT1006U / VTTT1006U
+
+_NS_PER_MINUTE = 60 * 1_000_000_000
+
+
+def _ok(msg1="정상처리 되었습니다.", **outputs):
+    return {"rt_cd": "0", "msg_cd": "SIM00000", "msg1": msg1, **outputs}
+
+
+def _reject(msg1):
+    return {"rt_cd": "1", "msg_cd": "SIM00001", "msg1": msg1}
+
+
+def _num(value, default=0.0):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _fmt(value, digits=4):
+    return f"{value:.{digits}f}"
+
+
+class Clock:
+    def __init__(self, start=None, speed=1.0):
+        """start: 재현 시작 뉴욕 시각 (None 이면 현재 시각), speed: 배속"""
+        self.start = None if start is None else pd.Timestamp(start).to_pydatetime()
+        self.speed = speed
+        self._origin = time.monotonic()
+
+    def now(self):
+        """현재 뉴욕 시각 (tz 없음, 응답 · DB 와 같은 기준)"""
+        if self.start is None:
+            return datetime.now(market_calendar.NYT).replace(tzinfo=None)
+        return self.start + timedelta(seconds=(time.monotonic() - self._origin) * self.speed)
+
+
+class MarketData:
+    def __init__(self, seed=0, bars=None, base_price=30.0, lookback_days=30):
+        """bars: {종목: DataFrame(datetime, open, high, low, close, volume)} 기록된 분봉 (없는 종목은 합성)"""
+        self.seed = seed
+        self.base_price = base_price
+        self.lookback_days = lookback_days
+        self._recorded = {}
+        self._days = {}
+        self._lock = threading.Lock()
+        for symbol, df in (bars or {}).items():
+            self.add_bars(symbol, df)
+
+    def add_bars(self, symbol, df):
+        df = df.rename(columns={'time': 'datetime'}).sort_values('datetime')
+        df['datetime'] = pd.to_datetime(df['datetime'])
+        days = {d: g.reset_index(drop=True) for d, g in df.groupby(df['datetime'].dt.date)}
+        self._recorded[symbol.upper()] = days
+
+    def _synthetic(self, symbol, d):
+        bounds = market_calendar.session(d)
+        if bounds is None:
+            return None
+        open_, close = (t.replace(tzinfo=None) for t in bounds)
+        n = int((close - open_).total_seconds() // 60)
+        rng = np.random.default_rng([self.seed, zlib.crc32(symbol.encode()), d.toordinal()])
+        level = self.base_price * np.exp(rng.normal(0, 0.03))  # 날짜별 독립 시작가
+        closes = np.round(level * np.exp(np.cumsum(rng.normal(0, 0.0015, n))), 2)  # 호가단위 $0.01
+        opens = np.concatenate([[round(level, 2)], closes[:-1]])
+        spread = np.round(np.abs(rng.normal(0, 0.001, n)) * closes, 2)
+        times = np.datetime64(open_, 'ns') + np.arange(n) * np.timedelta64(1, 'm')
+        return pd.DataFrame({
+            'datetime': times,
+            'open': opens,
+            'high': np.maximum(opens, closes) + spread,
+            'low': np.minimum(opens, closes) - spread,
+            'close': closes,
+            'volume': rng.integers(1_000, 50_000, n).astype(np.float64),
+        })
+
+    def day(self, symbol, d):
+        """종목의 d 일 1분봉 (휴장일 / 기록 없음은 None)"""
+        symbol = symbol.upper()
+        if symbol in self._recorded:
+            return self._recorded[symbol].get(d)
+        key = (symbol, d)
+        with self._lock:
+            if key not in self._days:
+                if len(self._days) > 512:
+                    self._days.clear()
+                self._days[key] = self._synthetic(symbol, d)
+            return self._days[key]
+
+    def bars_before(self, symbol, end, limit, nmin=1, first_day=None):
+        """end 이전(미포함) 봉을 최신순으로 최대 limit 개 (nmin 분 단위로 묶음) → (DataFrame, 더 있는지)"""
+        end_ns = np.datetime64(end, 'ns').astype(np.int64)
+        pages, total, d = [], 0, end.date()
+        for _ in range(self.lookback_days):
+            if first_day is not None and d < first_day:
+                break
+            df = self.day(symbol, d)
+            if df is not None and not df.empty:
+                times = df['datetime'].to_numpy('datetime64[ns]').view(np.int64)
+                df = df.iloc[:int(np.searchsorted(times, end_ns))]
+                if not df.empty:
+                    if nmin > 1:
+                        df = _resample(df, nmin)
+                    pages.append(df)
+                    total += len(df)
+                    if total > limit:
+                        break
+            d -= timedelta(days=1)
+        if not pages:
+            return chart_decoder.empty(), False
+        bars = pd.concat(pages[::-1], ignore_index=True)
+        more = len(bars) > limit
+        return bars.iloc[::-1].iloc[:limit], more
+
+    def last(self, symbol, now):
+        """now 까지 나온 마지막 봉 (진행 중인 분 포함)"""
+        bars, _ = self.bars_before(symbol, now.replace(second=0, microsecond=0) + timedelta(minutes=1), 1)
+        return None if bars.empty else bars.iloc[0]
+
+
+def _resample(df, nmin):
+    times = df['datetime'].to_numpy('datetime64[ns]').view(np.int64)
+    key = times - (times - times[0]) % (nmin * _NS_PER_MINUTE)
+    g = df.groupby(key, sort=True)
+    return pd.DataFrame({
+        'datetime': np.unique(key).view('datetime64[ns]'),
+        'open': g['open'].first().to_numpy(),
+        'high': g['high'].max().to_numpy(),
+        'low': g['low'].min().to_numpy(),
+        'close': g['close'].last().to_numpy(),
+        'volume': g['volume'].sum().to_numpy(),
+    })
+
+
+class Account:
+    def __init__(self, cash):
+        self.cash = cash
+        self.holdings = {}  # 종목 → [수량, 평균단가, 거래소]
+        self.orders = {}    # 주문번호 → 주문 dict
+        self.lock = threading.Lock()
+
+
+class KISSimulator:
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, jitter=0.0, rate_limit=None, error_rate=0.0,
+                 seed=0, market=None, clock=None, cash=100_000.0):
+        """rate_limit: 앱키별 초당 호출 한도 (None 이면 무제한), error_rate: 임의 HTTP 500 비율"""
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.error_rate = error_rate
+        self.market = market or MarketData(seed)
+        self.clock = clock or Clock()
+        self.cash = cash
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._calls = {}      # 앱키 → 최근 1초 호출 시각
+        self._tokens = {}     # 앱키 → 토큰
+        self._accounts = {}   # (계좌번호, 상품코드) → Account
+        self._odno = 0
+        self._stats = {}
+        self._server = None
+        self._thread = None
+        self._routes = {
+            '/oauth2/tokenP': self.token,
+            '/oauth2/Approval': self.approval,
+            '/uapi/overseas-price/v1/quotations/inquire-time-itemchartprice': self.minute_chart,
+            '/uapi/overseas-price/v1/quotations/price-detail': self.price_detail,
+            '/uapi/overseas-price/v1/quotations/inquire-daily-chartprice': self.daily_chart,
+            '/uapi/overseas-stock/v1/trading/inquire-balance': self.balance,
+            '/uapi/overseas-stock/v1/trading/inquire-present-balance': self.present_balance,
+            '/uapi/overseas-stock/v1/trading/inquire-psamount': self.psamount,
+            '/uapi/overseas-stock/v1/trading/order': self.order,
+            '/uapi/overseas-stock/v1/trading/order-rvsecncl': self.cancel,
+        }
+
+    # 서버 ##############################################################################
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        self._server = ThreadingHTTPServer((self.host, self.port), _handler(self))
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name='kis-simulator', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def stats(self):
+        """경로별 {calls, throttled, errors}"""
+        with self._lock:
+            return {path: dict(s) for path, s in self._stats.items()}
+
+    def _stat(self, path, name):
+        with self._lock:
+            stat = self._stats.setdefault(path, {'calls': 0, 'throttled': 0, 'errors': 0})
+            stat[name] += 1
+
+    def _throttled(self, appkey):
+        if self.rate_limit is None:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            calls = self._calls.setdefault(appkey, deque())
+            while calls and now - calls[0] >= 1.0:
+                calls.popleft()
+            if len(calls) >= self.rate_limit:
+                return True
+            calls.append(now)
+            return False
+
+    def _delay(self):
+        with self._lock:
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+            fail = self.error_rate and self._rng.random() < self.error_rate
+        if delay > 0:
+            time.sleep(delay)
+        return fail
+
+    def handle(self, method, path, headers, params):
+        """요청 1건 처리 → (HTTP 상태, 응답 body(dict 또는 str), 추가 헤더)"""
+        route = self._routes.get(path)
+        if route is None:
+            return 404, _reject(f"없는 경로: {path}"), {}
+        self._stat(path, 'calls')
+        if self._delay():
+            self._stat(path, 'errors')
+            return 500, "Internal Server Error", {}
+        if path in UNLIMITED_PATHS:
+            return 200, route(params, headers), {}
+
+        appkey = headers.get('appkey', '')
+        if self._throttled(appkey):
+            self._stat(path, 'throttled')
+            return 500, THROTTLE_BODY, {}
+        if headers.get('authorization') != f"Bearer {self._tokens.get(appkey)}":
+            return 500, TOKEN_BODY, {}
+        body = route(params, headers)
+        return 200, body, {'tr_id': headers.get('tr_id', ''), 'tr_cont': body.pop('_tr_cont', 'D')}
+
+    # 인증 ##############################################################################
+    def token(self, params, headers):
+        # 실제 서버처럼 같은 앱키는 유효기간 동안 같은 토큰
+        appkey = params.get('appkey', '')
+        with self._lock:
+            token = self._tokens.get(appkey)
+            if token is None:
+                token = self._tokens[appkey] = f"SIM{zlib.crc32(appkey.encode()):08x}{len(self._tokens):04d}"
+        expires = datetime.now() + timedelta(days=1)
+        return {
+            "access_token": token,
+            "access_token_token_expired": f"{expires:%Y-%m-%d %H:%M:%S}",
+            "token_type": "Bearer",
+            "expires_in": 86400,
+        }
+
+    def approval(self, params, headers):
+        return {"approval_key": f"sim-approval-{zlib.crc32(params.get('appkey', '').encode()):08x}"}
+
+    # 시세 ##############################################################################
+    def minute_chart(self, params, headers):
+        symbol = params.get('SYMB', '')
+        now = self.clock.now()
+        nmin = max(1, int(_num(params.get('NMIN'), 1)))
+        limit = min(120, max(1, int(_num(params.get('NREC'), 120))))
+        end = now.replace(second=0, microsecond=0) + timedelta(minutes=1)  # 진행 중인 분까지
+        keyb = params.get('KEYB', '')
+        if keyb:
+            end = min(end, datetime.strptime(keyb, '%Y%m%d%H%M%S'))
+        first_day = now.date() if params.get('PINC', '0') == '0' else None
+
+        bars, more = self.market.bars_before(symbol, end, limit, nmin, first_day)
+        ymd = bars['datetime'].dt.strftime('%Y%m%d').tolist()
+        hms = bars['datetime'].dt.strftime('%H%M%S').tolist()
+        kst = (bars['datetime'] + pd.Timedelta(hours=13)).dt  # 한국시각 (DST 무시한 근사값)
+        rows = [{
+            "tymd": y, "xymd": y, "xhms": h, "kymd": k_ymd, "khms": k_hms,
+            "open": _fmt(o), "high": _fmt(hi), "low": _fmt(lo), "last": _fmt(c),
+            "evol": str(int(v)), "eamt": str(int(v * c)),
+        } for y, h, k_ymd, k_hms, o, hi, lo, c, v in zip(
+            ymd, hms, kst.strftime('%Y%m%d').tolist(), kst.strftime('%H%M%S').tolist(),
+            bars['open'].tolist(), bars['high'].tolist(), bars['low'].tolist(),
+            bars['close'].tolist(), bars['volume'].tolist())]
+        output1 = {"rsym": f"D{params.get('EXCD', '')}{symbol}", "zdiv": "4", "stim": "093000", "etim": "160000",
+                   "sktm": "223000", "ektm": "050000", "next": "1" if more else "0", "more": "1" if more else "0",
+                   "nrec": str(len(rows))}
+        return _ok(output1=output1, output2=rows, _tr_cont='M' if more else 'D')
+
+    def last_price(self, symbol):
+        row = self.market.last(symbol, self.clock.now())
+        return None if row is None else float(row['close'])
+
+    def price_detail(self, params, headers):
+        symbol = params.get('SYMB', '')
+        now = self.clock.now()
+        row = self.market.last(symbol, now)
+        if row is None:
+            return _reject(f"시세 없음: {symbol}")
+        end = now.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        today, _ = self.market.bars_before(symbol, end, 390, first_day=row['datetime'].date())
+        previous = self.market.bars_before(symbol, pd.Timestamp(row['datetime'].date()).to_pydatetime(), 1)[0]
+        base = float(previous['close'].iloc[0]) if not previous.empty else float(today['open'].iloc[-1])
+        last = float(row['close'])
+        return _ok(output={
+            "rsym": f"D{params.get('EXCD', '')}{symbol}", "zdiv": "4", "curr": "USD",
+            "last": _fmt(last), "open": _fmt(float(today['open'].iloc[-1])),
+            "high": _fmt(float(today['high'].max())), "low": _fmt(float(today['low'].min())),
+            "base": _fmt(base), "pvol": "0", "tvol": str(int(today['volume'].sum())),
+            "tamt": str(int((today['volume'] * today['close']).sum())),
+            "t_xdif": _fmt(last - base), "t_xrat": _fmt((last / base - 1) * 100, 2), "e_ordyn": "매매 가능",
+        })
+
+    def daily_chart(self, params, headers):
+        symbol = params.get('FID_INPUT_ISCD', '')
+        start = datetime.strptime(params.get('FID_INPUT_DATE_1') or '19700101', '%Y%m%d').date()
+        end = datetime.strptime(params.get('FID_INPUT_DATE_2') or f"{self.clock.now():%Y%m%d}", '%Y%m%d').date()
+        end = min(end, self.clock.now().date())
+        rows, d = [], end
+        while d >= start and len(rows) < 100:
+            df = self.market.day(symbol, d)
+            if df is not None and not df.empty:
+                rows.append({
+                    "stck_bsop_date": f"{d:%Y%m%d}", "ovrs_nmix_prpr": _fmt(df['close'].iloc[-1]),
+                    "ovrs_nmix_oprc": _fmt(df['open'].iloc[0]), "ovrs_nmix_hgpr": _fmt(df['high'].max()),
+                    "ovrs_nmix_lwpr": _fmt(df['low'].min()), "acml_vol": str(int(df['volume'].sum())),
+                    "mod_yn": "N",
+                })
+            d -= timedelta(days=1)
+        output1 = {"ovrs_nmix_prpr": rows[0]["ovrs_nmix_prpr"] if rows else "", "hts_kor_isnm": symbol,
+                   "stck_shrn_iscd": symbol}
+        return _ok(output1=output1, output2=rows)
+
+    # 계좌 ##############################################################################
+    def _account(self, params):
+        key = (params.get('CANO', ''), params.get('ACNT_PRDT_CD', ''))
+        with self._lock:
+            account = self._accounts.get(key)
+            if account is None:
+                account = self._accounts[key] = Account(self.cash)
+        self._match(account)
+        return account
+
+    def _fill(self, account, order, price):
+        qty, symbol = order['qty'], order['symbol']
+        held = account.holdings.setdefault(symbol, [0, 0.0, order['excg']])
+        if order['side'] == 'buy':
+            held[1] = (held[0] * held[1] + qty * price) / (held[0] + qty)
+            held[0] += qty
+            account.cash -= qty * price
+        else:
+            held[0] -= qty
+            account.cash += qty * price
+            if held[0] == 0:
+                del account.holdings[symbol]
+        order.update(state='filled', fill_price=price)
+
+    def _match(self, account):
+        """미체결 지정가 주문 중 현재가가 닿은 주문 체결"""
+        with account.lock:
+            for order in account.orders.values():
+                if order['state'] != 'open':
+                    continue
+                last = self.last_price(order['symbol'])
+                if last is not None and (last <= order['price'] if order['side'] == 'buy' else last >= order['price']):
+                    self._fill(account, order, last)
+
+    def _holding_rows(self, account, excg_cd=""):
+        """excg_cd: 해외거래소코드 (모의투자처럼 해당 거래소 종목만, 공란이면 전체)"""
+        rows = []
+        for symbol, (qty, avg, excg) in account.holdings.items():
+            if excg_cd and excg != excg_cd:
+                continue
+            now_price = self.last_price(symbol) or avg
+            rows.append({
+                "ovrs_pdno": symbol, "ovrs_item_name": symbol, "ovrs_excg_cd": excg, "tr_crcy_cd": "USD",
+                "ovrs_cblc_qty": str(qty), "ord_psbl_qty": str(qty), "pchs_avg_pric": _fmt(avg),
+                "frcr_pchs_amt1": _fmt(qty * avg, 2), "now_pric2": _fmt(now_price),
+                "ovrs_stck_evlu_amt": _fmt(qty * now_price, 2),
+                "frcr_evlu_pfls_amt": _fmt(qty * (now_price - avg), 2),
+                "evlu_pfls_rt": _fmt((now_price / avg - 1) * 100 if avg else 0.0, 2),
+            })
+        return rows
+
+    def balance(self, params, headers):
+        account = self._account(params)
+        with account.lock:
+            rows = self._holding_rows(account, params.get('OVRS_EXCG_CD', ''))
+        purchase = sum(float(r["frcr_pchs_amt1"]) for r in rows)
+        pnl = sum(float(r["frcr_evlu_pfls_amt"]) for r in rows)
+        return _ok(output1=rows, output2={
+            "frcr_pchs_amt1": _fmt(purchase, 2), "ovrs_rlzt_pfls_amt": "0.00", "ovrs_tot_pfls": _fmt(pnl, 2),
+            "rlzt_erng_rt": "0.00", "tot_evlu_pfls_amt": _fmt(pnl, 2),
+            "tot_pftrt": _fmt(pnl / purchase * 100 if purchase else 0.0, 2),
+        })
+
+    def present_balance(self, params, headers):
+        account = self._account(params)
+        with account.lock:
+            rows = self._holding_rows(account)
+            cash = account.cash
+        evaluation = sum(float(r["ovrs_stck_evlu_amt"]) for r in rows)
+        output1 = [{
+            "pdno": r["ovrs_pdno"], "prdt_name": r["ovrs_item_name"], "cblc_qty13": r["ovrs_cblc_qty"],
+            "ord_psbl_qty1": r["ord_psbl_qty"], "avg_unpr3": r["pchs_avg_pric"], "ovrs_now_pric1": r["now_pric2"],
+            "frcr_evlu_amt2": r["ovrs_stck_evlu_amt"], "evlu_pfls_amt2": r["frcr_evlu_pfls_amt"],
+            "ovrs_excg_cd": r["ovrs_excg_cd"], "buy_crcy_cd": "USD",
+        } for r in rows]
+        output2 = [{"crcy_cd": "USD", "frcr_dncl_amt_2": _fmt(cash, 2), "frcr_drwg_psbl_amt_1": _fmt(cash, 2),
+                    "frcr_evlu_amt2": _fmt(evaluation, 2), "frst_bltn_exrt": "1300.0000"}]
+        output3 = {"tot_asst_amt": _fmt(cash + evaluation, 2), "evlu_amt_smtl_amt": _fmt(evaluation, 2),
+                   "frcr_evlu_tota": _fmt(evaluation, 2), "tot_frcr_cblc_smtl": _fmt(cash, 2)}
+        return _ok(output1=output1, output2=output2, output3=output3)
+
+    def psamount(self, params, headers):
+        account = self._account(params)
+        price = _num(params.get('OVRS_ORD_UNPR')) or self.last_price(params.get('ITEM_CD', '')) or 0.0
+        with account.lock:
+            cash = account.cash
+        return _ok(output={
+            "tr_crcy_cd": "USD", "ord_psbl_frcr_amt": _fmt(cash, 2), "ovrs_ord_psbl_amt": _fmt(cash, 2),
+            "max_ord_psbl_qty": str(int(cash // price) if price > 0 else 0), "exrt": "1300.0000",
+        })
+
+    # 주문 ##############################################################################
+    def _order_output(self, odno):
+        return {"KRX_FWDG_ORD_ORGNO": "91252", "ODNO": odno, "ORD_TMD": f"{self.clock.now():%H%M%S}"}
+
+    def order(self, params, headers):
+        tr_id = headers.get('tr_id', '')
+        side = 'buy' if tr_id[4:8] in BUY_TR_CODES else 'sell' if tr_id[4:8] in SELL_TR_CODES else None
+        symbol, qty, price = params.get('PDNO', ''), int(_num(params.get('ORD_QTY'))), _num(params.get('OVRS_ORD_UNPR'))
+        if side is None:
+            return _reject(f"주문 TR ID 확인요망: {tr_id}")
+        if not symbol or qty <= 0 or price <= 0:
+            return _reject("종목코드 / 주문수량 / 주문단가 확인요망")
+        last = self.last_price(symbol)
+        if last is None:
+            return _reject(f"시세 없음: {symbol}")
+
+        account = self._account(params)
+        with account.lock:
+            if side == 'buy' and qty * price > account.cash:
+                return _reject("주문가능금액을 초과 했습니다")
+            held = account.holdings.get(symbol, [0])[0]
+            reserved = sum(o['qty'] for o in account.orders.values()
+                           if o['state'] == 'open' and o['side'] == 'sell' and o['symbol'] == symbol)
+            if side == 'sell' and qty > held - reserved:
+                return _reject("주문가능수량을 초과 했습니다")
+            with self._lock:
+                self._odno += 1
+                odno = f"{self._odno:010d}"
+            order = account.orders[odno] = {'side': side, 'symbol': symbol, 'excg': params.get('OVRS_EXCG_CD', ''),
+                                            'qty': qty, 'price': price, 'state': 'open'}
+            if last <= price if side == 'buy' else last >= price:
+                self._fill(account, order, last)
+        return _ok("주문 전송 완료 되었습니다.", output=self._order_output(odno))
+
+    def cancel(self, params, headers):
+        account = self._account(params)
+        odno = params.get('ORGN_ODNO', '')
+        with account.lock:
+            order = account.orders.get(odno)
+            if order is None or order['state'] != 'open':
+                return _reject("정정/취소 가능한 주문이 없습니다")
+            order['state'] = 'cancelled'
+        return _ok("취소 주문 완료 되었습니다.", output=self._order_output(odno))
+
+
+def _handler(sim):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive (클라이언트 세션 풀 재사용)
+
+        def _dispatch(self, method):
+            parts = urlsplit(self.path)
+            if method == 'GET':
+                params = {k: v[0] for k, v in parse_qs(parts.query, keep_blank_values=True).items()}
+            else:
+                length = int(self.headers.get('content-length') or 0)
+                raw = self.rfile.read(length) if length else b''
+                try:
+                    params = json.loads(raw or b'{}')
+                except ValueError:
+                    params = {}
+            headers = {k.lower(): v for k, v in self.headers.items()}
+            status, body, extra = sim.handle(method, parts.path, headers, params)
+
+            if isinstance(body, dict):
+                payload, content_type = json.dumps(body, ensure_ascii=False).encode('utf-8'), 'application/json; charset=utf-8'
+            else:
+                payload, content_type = str(body).encode('utf-8'), 'text/plain; charset=utf-8'
+            self.send_response(status)
+            self.send_header('content-type', content_type)
+            self.send_header('content-length', str(len(payload)))
+            for name, value in extra.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            self._dispatch('GET')
+
+        def do_POST(self):
+            self._dispatch('POST')
+
+        def log_message(self, format, *args):
+            pass  # 요청마다 콘솔 출력하지 않음
+
+    return Handler
+
+
+def load_bars(csv=None, duckdb_path=None):
+    """기록된 분봉 → {종목: DataFrame}
+
+    csv: ["SOXL=soxl.csv", ...] (datetime 또는 time + OHLCV 컬럼)
+    duckdb_path: collector 의 minute_bars 테이블 (symbol, time, OHLCV)
+    """
+    bars = {}
+    for item in csv or []:
+        symbol, path = item.split('=', 1)
+        bars[symbol.upper()] = pd.read_csv(path)
+    if duckdb_path:
+        import duckdb
+        con = duckdb.connect(duckdb_path, read_only=True)
+        try:
+            df = con.execute("SELECT symbol, time, open, high, low, close, volume FROM minute_bars").df()
+        finally:
+            con.close()
+        for symbol, g in df.groupby('symbol'):
+            bars[symbol] = g.drop(columns='symbol').astype({c: float for c in chart_decoder.COLUMNS[1:]})
+    return bars
+
+
+def main():
+    parser = argparse.ArgumentParser(description='로컬 KIS Open API 시뮬레이터')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--latency', type=float, default=0.0, help='응답 지연(초)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='추가 무작위 지연 최대값(초)')
+    parser.add_argument('--rate-limit', type=int, default=None, help='앱키별 초당 호출 한도 (초과 시 EGW00201)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='임의 HTTP 500 비율 (0~1)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--start', default=None, help='재현 시작 뉴욕 시각 (ex. "2025-03-10 09:30")')
+    parser.add_argument('--speed', type=float, default=1.0, help='재현 배속')
+    parser.add_argument('--bars', action='append', help='기록된 분봉 csv (SYMBOL=path, 여러 번 지정 가능)')
+    parser.add_argument('--duckdb', default=None, help='minute_bars 테이블이 있는 DuckDB 파일')
+    args = parser.parse_args()
+
+    sim = KISSimulator(args.host, args.port, args.latency, args.jitter, args.rate_limit, args.error_rate, args.seed,
+                       market=MarketData(args.seed, load_bars(args.bars, args.duckdb)),
+                       clock=Clock(args.start, args.speed)).start()
+    print(f"✅ KIS 시뮬레이터 실행 중: {sim.url} (Ctrl+C 종료)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        sim.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+import asyncio
+import json
+from base64 import b64decode
+from datetime import datetime
+
+import pandas as pd
+from Crypto.Cipher import AES
+from Crypto.Util.Padding import unpad
+from pytz import timezone
+
+import kis_auth as kis
+
+try:
+    import websockets
+except ImportError:  # pip install websockets
+    websockets = None
+
+
+# 🔹 KIS 실시간 웹소켓 (해외주식 체결가 + 체결통보)
+# - 체결가 HDFSCNT0: tr_key = 'D' + 거래소(NAS/NYS/AMS) + 종목 ex) DAMSSOXL
+# - 체결통보 H0GSCNI0 (모의 H0GSCNI9): tr_key = HTS ID, 본문은 AES-256-CBC 암호화
+#   (key / iv 는 구독 응답 JSON 의 output 에 포함)
+# - 수신 틱으로 1분봉을 메모리에서 만들고, 분이 바뀌면 on_bar 콜백으로 바로 전달
+# - PINGPONG 은 받은 그대로 pong 으로 응답
+#
+#   stream = kis_stream.KISStream('my_prod', [("AMS", "SOXL")], on_bar=print)
+#   asyncio.run(stream.run())
+
+WS_URLS = {'my_prod': 'ws://ops.koreainvestment.com:21000', 'vps': 'ws://ops.koreainvestment.com:31000'}
+TR_TRADE = 'HDFSCNT0'
+TR_NOTICE = {'my_prod': 'H0GSCNI0', 'vps': 'H0GSCNI9'}
+EXCHANGE_CODES = {'NAS': 'NAS', 'NASD': 'NAS', 'NYS': 'NYS', 'NYSE': 'NYS', 'AMS': 'AMS', 'AMEX': 'AMS'}
+NYT = timezone("America/New_York")
+
+# 해외주식 실시간 체결가 필드 순서 (한 건당 26개, ^ 구분)
+TRADE_COLUMNS = [
+    'RSYM', 'SYMB', 'ZDIV', 'TYMD', 'XYMD', 'XHMS', 'KYMD', 'KHMS', 'OPEN', 'HIGH', 'LOW', 'LAST', 'SIGN',
+    'DIFF', 'RATE', 'PBID', 'PASK', 'VBID', 'VASK', 'EVOL', 'TVOL', 'TAMT', 'BIVL', 'ASVL', 'STRN', 'MTYP',
+]
+# 해외주식 체결통보 필드 순서
+NOTICE_COLUMNS = [
+    'CUST_ID', 'ACNT_NO', 'ODER_NO', 'OODER_NO', 'SELN_BYOV_CLS', 'RCTF_CLS', 'ODER_KIND2', 'STCK_SHRN_ISCD',
+    'CNTG_QTY', 'CNTG_UNPR', 'STCK_CNTG_HOUR', 'RFUS_YN', 'CNTG_YN', 'ACPT_YN', 'BRNC_NO', 'ODER_QTY',
+    'ACNT_NAME', 'CNTG_ISNM', 'ODER_COND', 'DEBT_GB', 'DEBT_DATE', 'START_TM', 'END_TM', 'TM_DIV_TP', 'CNTG_UNPR12',
+]
+
+
+# 메시지 해석 ###########################################################################
+
+def tr_key_for(excd, symbol, prefix='D'):
+    return f"{prefix}{EXCHANGE_CODES.get(excd.upper(), excd.upper())}{symbol.upper()}"
+
+
+def subscribe_message(approval_key, tr_id, tr_key, subscribe=True):
+    return json.dumps({
+        "header": {"approval_key": approval_key, "custtype": "P", "tr_type": "1" if subscribe else "2", "content-type": "utf-8"},
+        "body": {"input": {"tr_id": tr_id, "tr_key": tr_key}},
+    })
+
+
+def aes_decrypt(key, iv, data):
+    """체결통보 본문 복호화 (AES-256-CBC, base64)"""
+    cipher = AES.new(key.encode('utf-8'), AES.MODE_CBC, iv.encode('utf-8'))
+    return unpad(cipher.decrypt(b64decode(data)), AES.block_size).decode('utf-8')
+
+
+def split_records(payload, columns, count):
+    """'a^b^c^...' → count 건의 dict 목록"""
+    values = payload.split('^')
+    width = len(columns)
+    return [dict(zip(columns, values[i * width:(i + 1) * width])) for i in range(count)]
+
+
+def parse_frame(raw, keys=None):
+    """수신 메시지 → ('data', tr_id, [레코드, ...]) 또는 ('json', tr_id, dict)
+
+    데이터 프레임: '암호화여부|TR_ID|건수|본문'  (암호화여부 '1' 이면 keys[tr_id] 의 key / iv 로 복호화)
+    """
+    if raw and raw[0] in ('0', '1'):
+        encrypted, tr_id, count, payload = raw.split('|', 3)
+        if encrypted == '1':
+            key, iv = (keys or {})[tr_id]
+            payload = aes_decrypt(key, iv, payload)
+        columns = NOTICE_COLUMNS if tr_id.startswith('H0GSCNI') else TRADE_COLUMNS
+        return 'data', tr_id, split_records(payload, columns, int(count))
+
+    msg = json.loads(raw)
+    return 'json', msg.get('header', {}).get('tr_id'), msg
+
+
+def tick_from_record(rec):
+    """체결가 레코드 → (현지시각, 가격, 체결량)"""
+    ts = datetime.strptime(rec['XYMD'] + rec['XHMS'].zfill(6), '%Y%m%d%H%M%S')
+    return ts, float(rec['LAST']), float(rec['EVOL'] or 0)
+
+
+# 1분봉 생성 ############################################################################
+
+class MinuteBarBuilder:
+    """틱 → 1분봉 (분이 바뀌거나 flush 시점이 분 경계 + grace 초를 지나면 완성된 봉을 on_bar 로 전달)"""
+
+    def __init__(self, symbol, on_bar=None, grace=1.0):
+        self.symbol = symbol
+        self.on_bar = on_bar
+        self.grace = pd.Timedelta(seconds=grace)
+        self.bar = None
+        self.last_closed = None
+        self.ticks = 0
+        self.late_ticks = 0
+
+    def update(self, ts, price, volume):
+        minute = pd.Timestamp(ts).floor('min')
+        if (self.bar is not None and minute < self.bar['datetime']) or \
+                (self.last_closed is not None and minute <= self.last_closed):
+            self.late_ticks += 1  # 이미 마감한 분의 늦은 틱은 무시
+            return None
+        closed = None
+        if self.bar is not None and minute > self.bar['datetime']:
+            closed = self._close()
+        if self.bar is None:
+            self.bar = {'symbol': self.symbol, 'datetime': minute, 'open': price, 'high': price,
+                        'low': price, 'close': price, 'volume': volume}
+        else:
+            self.bar['high'] = max(self.bar['high'], price)
+            self.bar['low'] = min(self.bar['low'], price)
+            self.bar['close'] = price
+            self.bar['volume'] += volume
+        self.ticks += 1
+        return closed
+
+    def flush(self, now):
+        """now(현지시각) 가 진행 중인 봉의 분 + grace 를 지났으면 틱이 없어도 봉 마감"""
+        if self.bar is not None and pd.Timestamp(now) >= self.bar['datetime'] + pd.Timedelta(minutes=1) + self.grace:
+            return self._close()
+        return None
+
+    def _close(self):
+        bar, self.bar = self.bar, None
+        self.last_closed = bar['datetime']
+        if self.on_bar is not None:
+            self.on_bar(bar)
+        return bar
+
+
+# 웹소켓 클라이언트 ######################################################################
+
+class KISStream:
+    def __init__(self, svr='my_prod', watchlist=(("AMS", "SOXL"),), on_bar=None, on_tick=None, on_notice=None,
+                 hts_id=None, url=None, approval_key=None, tr_prefix='D', reconnect_delay=5):
+        if websockets is None:
+            raise ImportError("kis_stream 사용을 위해 websockets 설치가 필요합니다. (pip install websockets)")
+        self.svr = svr
+        self.url = url or WS_URLS[svr]
+        self.approval_key = approval_key
+        self.hts_id = hts_id
+        self.tr_prefix = tr_prefix
+        self.reconnect_delay = reconnect_delay
+        self.on_tick = on_tick
+        self.on_notice = on_notice
+        self.builders = {}
+        for excd, symbol in watchlist:
+            self.builders[tr_key_for(excd, symbol, tr_prefix)] = MinuteBarBuilder(symbol, on_bar)
+        self.keys = {}  # tr_id → (AES key, iv)
+        self._stop = asyncio.Event()
+
+    def _subscriptions(self):
+        subs = [(TR_TRADE, tr_key) for tr_key in self.builders]
+        if self.hts_id:
+            subs.append((TR_NOTICE[self.svr], self.hts_id))
+        return subs
+
+    async def run(self):
+        """접속 → 구독 → 수신 루프 (끊기면 reconnect_delay 초 후 재접속)"""
+        if self.approval_key is None:
+            self.approval_key = await asyncio.to_thread(kis.getApprovalKey, self.svr)
+
+        flusher = asyncio.create_task(self._flush_loop())
+        try:
+            while not self._stop.is_set():
+                try:
+                    async with websockets.connect(self.url, ping_interval=None) as ws:
+                        for tr_id, tr_key in self._subscriptions():
+                            await ws.send(subscribe_message(self.approval_key, tr_id, tr_key))
+                        await self._receive(ws)
+                except (OSError, websockets.ConnectionClosed) as e:
+                    if self._stop.is_set():
+                        break
+                    print(f"⚠️ 실시간 접속 끊김 ({e}), {self.reconnect_delay}초 후 재접속")
+                    await asyncio.sleep(self.reconnect_delay)
+        finally:
+            flusher.cancel()
+
+    async def _receive(self, ws):
+        while not self._stop.is_set():
+            try:
+                raw = await asyncio.wait_for(ws.recv(), timeout=1.0)
+            except asyncio.TimeoutError:
+                continue  # stop() 확인용
+            kind, tr_id, body = parse_frame(raw, self.keys)
+            if kind == 'data':
+                self._handle_data(tr_id, body)
+            elif tr_id == 'PINGPONG':
+                await ws.pong(raw.encode('utf-8') if isinstance(raw, str) else raw)
+            else:
+                self._handle_reply(tr_id, body)
+
+    def _handle_reply(self, tr_id, msg):
+        """구독 응답: 실패 메시지 출력, 암호화 TR 이면 key / iv 저장"""
+        body = msg.get('body', {})
+        if body.get('rt_cd') not in (None, '0'):
+            print(f"❌ [{tr_id}] 구독 실패: {body.get('msg1')}")
+            return
+        output = body.get('output') or {}
+        if output.get('key') and output.get('iv'):
+            self.keys[tr_id] = (output['key'], output['iv'])
+
+    def _handle_data(self, tr_id, records):
+        if tr_id == TR_TRADE:
+            for rec in records:
+                builder = self.builders.get(rec['RSYM'])
+                if builder is None:
+                    continue
+                ts, price, volume = tick_from_record(rec)
+                builder.update(ts, price, volume)
+                if self.on_tick is not None:
+                    self.on_tick(builder.symbol, ts, price, volume)
+        elif self.on_notice is not None:
+            for rec in records:
+                self.on_notice(rec)
+
+    async def _flush_loop(self):
+        # 틱이 끊겨도 분이 바뀌면 봉을 내보냄 (거래소 현지시각 기준)
+        while True:
+            await asyncio.sleep(0.2)
+            now = datetime.now(NYT).replace(tzinfo=None)
+            for builder in self.builders.values():
+                builder.flush(now)
+
+    def stop(self):
+        self._stop.set()
+
+
+# 로컬 테스트용 모의 서버 #################################################################
+
+async def mock_server(host='127.0.0.1', port=21000, ticks=(), aes_key=None, aes_iv=None, notices=(), interval=0.01):
+    """구독 요청에 응답하고 ticks [(tr_key, 현지시각, 가격, 체결량), ...] 를 체결가 프레임으로 보내는 서버
+
+    aes_key / aes_iv 를 주면 notices (NOTICE_COLUMNS 값 목록) 를 암호화된 체결통보로 보낸다.
+    반환값은 websockets 서버 객체 (async with 또는 close() 로 종료).
+    """
+    from Crypto.Util.Padding import pad
+    from base64 import b64encode
+
+    async def handler(ws, *args):
+        async for raw in ws:
+            req = json.loads(raw)
+            tr_id = req['body']['input']['tr_id']
+            output = {'key': aes_key, 'iv': aes_iv} if tr_id.startswith('H0GSCNI') and aes_key else {}
+            await ws.send(json.dumps({
+                'header': {'tr_id': tr_id, 'tr_key': req['body']['input']['tr_key'], 'encrypt': 'Y' if output else 'N'},
+                'body': {'rt_cd': '0', 'msg_cd': 'OPSP0000', 'msg1': 'SUBSCRIBE SUCCESS', 'output': output},
+            }))
+            if tr_id == TR_TRADE:
+                await ws.send(json.dumps({'header': {'tr_id': 'PINGPONG', 'datetime': datetime.now().strftime('%Y%m%d%H%M%S')}}))
+                for tr_key, ts, price, volume in ticks:
+                    if tr_key != req['body']['input']['tr_key']:
+                        continue
+                    ts = pd.Timestamp(ts)
+                    values = [''] * len(TRADE_COLUMNS)
+                    values[0], values[1] = tr_key, tr_key[4:]
+                    values[4], values[5] = ts.strftime('%Y%m%d'), ts.strftime('%H%M%S')
+                    values[11], values[19] = f"{price}", f"{volume}"
+                    await ws.send(f"0|{TR_TRADE}|001|{'^'.join(values)}")
+                    await asyncio.sleep(interval)
+            elif output:
+                for values in notices:
+                    cipher = AES.new(aes_key.encode('utf-8'), AES.MODE_CBC, aes_iv.encode('utf-8'))
+                    body = b64encode(cipher.encrypt(pad('^'.join(values).encode('utf-8'), AES.block_size))).decode()
+                    await ws.send(f"1|{tr_id}|001|{body}")
+
+    return await websockets.serve(handler, host, port)
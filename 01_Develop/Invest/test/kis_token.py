@@ -0,0 +1,141 @@
+import os
+import threading
+from datetime import datetime, timedelta
+
+import yaml
+
+
+# 🔹 접근토큰 관리 (실전 my_prod / 모의 vps)
+# - 환경별 토큰 + 만료시각을 메모리에 보관 → 호출마다 토큰 파일을 다시 읽지 않음
+# - 만료 refresh_margin 전부터는 백그라운드 스레드가 미리 재발급 (주문 경로에서 동기 재인증 없음)
+# - 환경별 single-flight 잠금: 여러 스레드가 동시에 만료를 봐도 /oauth2/tokenP 호출은 1번
+# - 파일 저장은 임시 파일에 쓴 뒤 os.replace (중간에 끊겨도 깨진 토큰 파일이 남지 않음)
+#   파일 형식은 기존과 동일 (token: ... / valid-date: YYYY-MM-DD HH:MM:SS)
+#
+#   tokens = kis_token.TokenManager(issue, {'my_prod': path, 'vps': path_vps})
+#   tokens.get('my_prod')  # 유효한 토큰 (필요하면 발급)
+#   tokens.start()         # 백그라운드 갱신 시작
+
+
+class TokenManager:
+    def __init__(self, issue, paths, refresh_margin=3600, retry_delay=60, on_refresh=None):
+        """issue(svr) → (토큰, 만료 datetime), 실패 시 예외 / on_refresh(svr, 토큰): 갱신 후 호출"""
+        self.issue = issue
+        self.paths = paths
+        self.refresh_margin = timedelta(seconds=refresh_margin)
+        self.retry_delay = retry_delay
+        self.on_refresh = on_refresh
+        self._tokens = {}   # svr → (토큰, 만료시각)
+        self._locks = {svr: threading.Lock() for svr in paths}
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.issued = 0     # 실제 발급 요청 횟수
+
+    # 파일 ##############################################################################
+    def load(self, svr):
+        """저장된 토큰 파일 → (토큰, 만료시각), 없거나 형식이 다르면 None"""
+        try:
+            with open(self.paths[svr], encoding='UTF-8') as f:
+                saved = yaml.load(f, Loader=yaml.FullLoader)
+            expires = saved['valid-date']
+            if isinstance(expires, str):
+                expires = datetime.strptime(expires, '%Y-%m-%d %H:%M:%S')
+            return saved['token'], expires
+        except Exception:
+            return None
+
+    def save(self, svr, token, expires):
+        path = self.paths[svr]
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(f'token: {token}\n')
+            f.write(f'valid-date: {expires:%Y-%m-%d %H:%M:%S}\n')
+        os.replace(tmp, path)
+
+    # 조회 / 발급 #######################################################################
+    def _usable(self, entry, now):
+        return entry is not None and entry[1] > now
+
+    def _fresh(self, entry, now):
+        return entry is not None and entry[1] - self.refresh_margin > now
+
+    def get(self, svr='my_prod'):
+        """유효한 토큰 반환 (메모리 → 파일 → 발급 순, 만료 전이면 잠금 없이 바로 반환)"""
+        entry = self._tokens.get(svr)
+        now = datetime.now()
+        if self._fresh(entry, now):
+            return entry[0]
+        if self._usable(entry, now):
+            self._wakeup.set()  # 만료 임박 → 백그라운드 갱신 요청, 지금은 기존 토큰 사용
+            return entry[0]
+        return self.refresh(svr, force=False)
+
+    def expires(self, svr='my_prod'):
+        entry = self._tokens.get(svr)
+        return None if entry is None else entry[1]
+
+    def refresh(self, svr='my_prod', force=True):
+        """토큰 재발급 (동시에 여러 스레드가 호출해도 발급은 1번)
+
+        force=False 면 메모리 / 파일의 토큰이 아직 갱신 시점 전이면 그대로 사용.
+        """
+        seen = self._tokens.get(svr)
+        with self._locks[svr]:
+            entry = self._tokens.get(svr)
+            now = datetime.now()
+            if entry is not seen and self._fresh(entry, now):
+                return entry[0]  # 잠금 대기 중 다른 스레드가 이미 갱신
+            if not force:
+                if self._fresh(entry, now):
+                    return entry[0]
+                saved = self.load(svr)
+                if self._fresh(saved, now):
+                    self._set(svr, saved)
+                    return saved[0]
+
+            token, expires = self.issue(svr)
+            self.issued += 1
+            self.save(svr, token, expires)
+            self._set(svr, (token, expires))
+            return token
+
+    def _set(self, svr, entry):
+        previous = self._tokens.get(svr)
+        self._tokens[svr] = entry
+        self._wakeup.set()
+        if self.on_refresh is not None and (previous is None or previous[0] != entry[0]):
+            self.on_refresh(svr, entry[0])
+
+    # 백그라운드 갱신 ###################################################################
+    def _next_due(self):
+        dues = [(entry[1] - self.refresh_margin, svr) for svr, entry in self._tokens.items()]
+        return min(dues) if dues else (None, None)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wakeup.clear()
+            due, svr = self._next_due()
+            wait = None if due is None else max(0.0, (due - datetime.now()).total_seconds())
+            if wait is None or wait > 0:
+                # 새 토큰이 등록되거나 갱신 요청이 오면 다시 계산
+                self._wakeup.wait(wait)
+                continue
+            try:
+                self.refresh(svr, force=False)  # 다른 프로세스가 이미 갱신한 파일이 있으면 그대로 사용
+            except Exception as e:
+                print(f"❌ [{svr}] 토큰 백그라운드 갱신 실패: {e} ({self.retry_delay}초 후 재시도)")
+            if not self._fresh(self._tokens.get(svr), datetime.now()):
+                # 실패 / 발급 서버가 만료 임박 토큰을 그대로 돌려준 경우 → 잠시 후 재시도
+                self._stop.wait(self.retry_delay)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='kis-token-refresh', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
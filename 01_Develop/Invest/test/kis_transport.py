@@ -0,0 +1,115 @@
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+# 🔹 KIS REST 호출용 HTTP 전송 계층
+# - 환경(실전/모의 도메인)별 keep-alive 세션 재사용 → 매 호출 TCP+TLS 핸드셰이크 제거
+# - 연결 오류는 urllib3 에서 재시도, 5xx(GET) / 초당 거래건수 초과(EGW00201) 응답은 여기서 백오프 후 재시도
+#   재전송도 호출 한도에 포함되므로 throttle 을 주면 재전송 전마다 스케줄러 토큰을 다시 받는다
+# - 경로별 호출 지연시간 통계 (latency_stats())
+
+# 초당 거래건수 초과 등 재시도해도 안전한 브로커 응답 코드
+THROTTLE_CODES = ('EGW00201',)
+RETRY_STATUS = (500, 502, 503, 504)
+
+
+class Transport:
+    def __init__(self, pool_size=10, timeout=(3.05, 10), retries=3, backoff=0.3, sample_size=500):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.sample_size = sample_size
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._latency = {}
+
+    def _session(self, url):
+        parts = urlsplit(url)
+        base = f"{parts.scheme}://{parts.netloc}"
+        with self._lock:
+            session = self._sessions.get(base)
+            if session is None:
+                # 연결 / 읽기 오류만 재시도 (POST 는 연결 단계만 → 중복 주문 방지), 5xx 응답 재시도는 request() 에서
+                retry = Retry(
+                    total=self.retries, connect=self.retries, read=self.retries, status=0,
+                    backoff_factor=self.backoff, allowed_methods=frozenset(['GET']), raise_on_status=False,
+                )
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=retry)
+                session = requests.Session()
+                session.mount(base, adapter)
+                self._sessions[base] = session
+            return session
+
+    def _is_throttled(self, res):
+        if res.status_code < 500:
+            return False
+        try:
+            return res.json().get('msg_cd') in THROTTLE_CODES
+        except ValueError:
+            return False
+
+    def _should_retry(self, method, res):
+        """호출 한도 초과는 모든 메서드, 그 외 5xx 는 GET 만 (주문 POST 는 재전송하지 않음)"""
+        if self._is_throttled(res):
+            return True
+        return method == 'GET' and res.status_code in RETRY_STATUS
+
+    def request(self, method, url, throttle=None, **kwargs):
+        """throttle: 재전송 전에 호출할 함수 (ex. 스케줄러 토큰 받기), 첫 전송은 호출자가 이미 받은 상태"""
+        kwargs.setdefault('timeout', self.timeout)
+        session = self._session(url)
+        path = urlsplit(url).path
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(self.backoff * (2 ** (attempt - 1)))
+                if throttle is not None:
+                    throttle()
+            start = time.perf_counter()
+            res = session.request(method, url, **kwargs)
+            self._record(path, time.perf_counter() - start)
+            if not self._should_retry(method, res):
+                return res
+        return res
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def _record(self, path, elapsed):
+        with self._lock:
+            samples = self._latency.get(path)
+            if samples is None:
+                samples = self._latency[path] = {'count': 0, 'total': 0.0, 'recent': deque(maxlen=self.sample_size)}
+            samples['count'] += 1
+            samples['total'] += elapsed
+            samples['recent'].append(elapsed)
+
+    def latency_stats(self):
+        """경로별 호출 수, 평균 / p50 / p95 / 최대 지연시간(ms, 최근 sample_size 건 기준)"""
+        with self._lock:
+            out = {}
+            for path, s in self._latency.items():
+                recent = sorted(s['recent'])
+                out[path] = {
+                    'count': s['count'],
+                    'avg_ms': s['total'] / s['count'] * 1000,
+                    'p50_ms': recent[len(recent) // 2] * 1000,
+                    'p95_ms': recent[min(len(recent) - 1, int(len(recent) * 0.95))] * 1000,
+                    'max_ms': recent[-1] * 1000,
+                }
+            return out
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
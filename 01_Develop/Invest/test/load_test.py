@@ -0,0 +1,155 @@
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import collector
+import kis_auth as kis
+import kis_client
+import kis_simulator
+import main_api
+import order_manager
+import quote_cache
+
+
+# 🔹 시뮬레이터 대상 end-to-end 부하 테스트
+# - kis_simulator 를 같은 프로세스에서 띄우거나(--url 없을 때) 이미 떠 있는 시뮬레이터 주소로
+#   kis_auth 의 실전 / 모의 URL 과 토큰 파일 경로를 바꿔치기 (실제 토큰 파일 · 계좌는 건드리지 않음)
+# - 수집: collector.collect (watchlist × pages, 스케줄러 · 세션 풀 · 재시도 포함)
+# - 시세: 현재가상세 동시 호출 (호출 한도 / EGW00201 재시도 확인)
+# - 주문: OrderManager 로 현재가 지정가 주문 → 접수 지연(ack_ms), 잔고 대사 후 체결 건수
+# - 결과: 단계별 처리량 / 지연시간, 전송 계층 경로별 통계, 시뮬레이터 경로별 호출 · 제한 · 오류 건수
+#
+#   python load_test.py --latency 0.02 --jitter 0.01 --rate-limit 20 --pages 5 --orders 20
+#   python load_test.py --url http://127.0.0.1:8900 --watchlist AMS:SOXL NAS:TQQQ
+
+
+def use_simulator(url, token_dir):
+    """kis_auth 의 접속 주소와 토큰 저장 위치를 시뮬레이터용으로 변경 (이후 만든 클라이언트부터 적용)"""
+    cfg = kis.getEnv()
+    cfg['my_url'] = cfg['paper_url'] = url
+    kis._tokens.paths = {svr: os.path.join(token_dir, f'KIS_{svr}') for svr in kis._tokens.paths}
+    kis._tokens._tokens.clear()
+
+
+def _percentiles(samples):
+    if not samples:
+        return {'count': 0}
+    samples = sorted(samples)
+    return {
+        'count': len(samples),
+        'p50_ms': samples[len(samples) // 2],
+        'p95_ms': samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        'max_ms': samples[-1],
+    }
+
+
+def run_collect(watchlist, pages, workers):
+    started = time.perf_counter()
+    df = collector.collect(watchlist, pages=pages, max_workers=workers)
+    elapsed = time.perf_counter() - started
+    return {'rows': len(df), 'seconds': elapsed, 'rows_per_sec': len(df) / elapsed if elapsed else 0.0}
+
+
+def run_quotes(client, watchlist, calls, workers):
+    def one(i):
+        excd, symbol = watchlist[i % len(watchlist)]
+        started = time.perf_counter()
+        try:
+            main_api.get_overseas_price_quot_price_detail(excd=excd, itm_no=symbol, client=client)
+        except Exception:
+            return None  # 재시도 후에도 실패 (응답 None)
+        return (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(workers) as pool:
+        results = list(pool.map(one, range(calls)))
+    elapsed = time.perf_counter() - started
+    samples = [ms for ms in results if ms is not None]
+    return {**_percentiles(samples), 'failed': calls - len(samples), 'seconds': elapsed,
+            'calls_per_sec': calls / elapsed if elapsed else 0.0}
+
+
+def run_orders(client, watchlist, count, journal_path):
+    orders = order_manager.OrderManager(client, journal_path=journal_path)
+    orders.reconcile()  # 주문 전 잔고 기준점
+    keys = []
+    started = time.perf_counter()
+    for i in range(count):
+        excd, symbol = watchlist[i % len(watchlist)]
+        try:
+            price = quote_cache.price_detail(excd=excd, itm_no=symbol, client=client)
+        except Exception:
+            continue  # 시세 조회 실패 → 주문 생략
+        keys.append(orders.submit('buy', excd, symbol, qty=1, price=price, key=f"load-{i}").key)
+    for key in keys:
+        orders.wait(key)
+    elapsed = time.perf_counter() - started
+    orders.reconcile()
+    orders.stop()
+
+    states = {}
+    for key in keys:
+        state = orders.orders[key].state
+        states[state] = states.get(state, 0) + 1
+    ack = [orders.orders[key].ack_ms for key in keys if orders.orders[key].ack_ms is not None]
+    return {**_percentiles(ack), 'seconds': elapsed, 'orders_per_sec': len(keys) / elapsed if elapsed else 0.0,
+            'states': states}
+
+
+def _print(title, result):
+    print(f"\n[{title}]")
+    for key, value in result.items():
+        print(f"  {key}: {value:,.2f}" if isinstance(value, float) else f"  {key}: {value}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='KIS 시뮬레이터 대상 수집 / 주문 경로 부하 테스트')
+    parser.add_argument('--url', default=None, help='실행 중인 시뮬레이터 주소 (없으면 같은 프로세스에서 실행)')
+    parser.add_argument('--latency', type=float, default=0.02)
+    parser.add_argument('--jitter', type=float, default=0.01)
+    parser.add_argument('--rate-limit', type=int, default=20, help='시뮬레이터 앱키별 초당 호출 한도')
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--start', default=None, help='시뮬레이터 재현 시작 뉴욕 시각')
+    parser.add_argument('--svr', default='my_prod', choices=['my_prod', 'vps'])
+    parser.add_argument('--watchlist', nargs='+', default=['AMS:SOXL', 'NAS:TQQQ', 'NAS:SQQQ', 'AMS:TECL'])
+    parser.add_argument('--pages', type=int, default=3, help='종목별 분봉 페이지 수')
+    parser.add_argument('--quotes', type=int, default=100, help='현재가상세 호출 수')
+    parser.add_argument('--orders', type=int, default=20, help='주문 수')
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args()
+
+    sim = None
+    url = args.url
+    if url is None:
+        sim = kis_simulator.KISSimulator(latency=args.latency, jitter=args.jitter, rate_limit=args.rate_limit,
+                                         error_rate=args.error_rate, seed=args.seed,
+                                         clock=kis_simulator.Clock(args.start)).start()
+        url = sim.url
+
+    with tempfile.TemporaryDirectory() as work:
+        use_simulator(url, work)
+        kis.auth(args.svr)
+        client = kis_client.get(args.svr)
+        watchlist = collector.parse_watchlist(args.watchlist)
+        print(f"✅ 부하 테스트 대상: {url} ({args.svr}, 종목 {len(watchlist)}개)")
+
+        _print('수집', run_collect(watchlist, args.pages, args.workers))
+        _print('시세', run_quotes(client, watchlist, args.quotes, args.workers))
+        _print('주문', run_orders(client, watchlist, args.orders, os.path.join(work, 'orders.jsonl')))
+
+        print("\n[전송 계층 (전역 / 클라이언트)]")
+        for path, stat in {**kis.getLatencyStats(), **client.latency_stats()}.items():
+            print(f"  {path}: {stat['count']}건 avg {stat['avg_ms']:.1f}ms p95 {stat['p95_ms']:.1f}ms")
+        print("\n[스케줄러]", kis.getSchedulerStats())
+        if sim is not None:
+            print("\n[시뮬레이터]")
+            for path, stat in sim.stats().items():
+                print(f"  {path}: {stat}")
+            sim.stop()
+
+
+if __name__ == "__main__":
+    main()
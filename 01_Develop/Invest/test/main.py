@@ -1,12 +1,24 @@
 import pymysql
 import yaml
-import time
 import main_api
 import main_s
 import kis_auth as ka
+import kis_scheduler
+import bulk_ingest
+import bar_store
+import market_calendar
+import gap_planner
+import kis_client
+import quote_cache
+import chart_decoder
+import page_buffer
+import bar_scheduler
+import collector
+import indicator_stream
+import math
 import pandas as pd
 import requests
-from datetime import datetime, timedelta, time as dt_time
+from datetime import datetime, timedelta
 from pytz import timezone
 import warnings
 
@@ -34,6 +46,19 @@ NYT = timezone("America/New_York")
 # 🔹 데이터 리샘플링 간격 설정 (e.g. '15min', '5min', '1min')
 RESAMPLE_INTERVAL = 15
 
+# 🔹 시그널 설정 (config.yaml 의 signal_config 로 main_s.SIGNAL_CONFIG 값 덮어쓰기)
+SIGNAL_CONFIG = config.get('signal_config') or {}
+
+# 🔹 현재가 / 잔고 조회 캐시 TTL (config.yaml 의 quote_cache_ttl, ex. {price_detail: 1.0, present_balance: 2.0})
+quote_cache.configure(config.get('quote_cache_ttl'))
+
+# 🔹 실시간 지표 상태 체크포인트 (config.yaml 의 indicator_checkpoint, 재시작 시 이어서 갱신)
+INDICATOR_CHECKPOINT = config.get('indicator_checkpoint', 'indicators.json')
+LIVE_RAW_LIMIT = 2400  # 실시간 분석 프레임 (1분봉 개수)
+
+# 🔹 감시 종목 목록 (config.yaml 의 watchlist, 없으면 SOXL 단일 파이프라인만 사용) → minute_bars 테이블
+WATCHLIST = collector.parse_watchlist(config.get('watchlist')) if config.get('watchlist') else []
+
 # 🔹 API로부터 1분 데이터 가져오기
 def get_minute_data(cnt, to=None):
     df = main_api.get_overseas_price_quot_inquire_time_itemchartprice(
@@ -41,64 +66,48 @@ def get_minute_data(cnt, to=None):
     )
     if df.empty:
         return pd.DataFrame()
-    df = df.rename(columns={"xymd":"date", "xhms":"time", "last":"close", "evol":"volume"})
-    df['datetime'] = pd.to_datetime(df['date'] + df['time'].str.zfill(6), format='%Y%m%d%H%M%S')
-    return df[['datetime', 'open', 'high', 'low', 'close', 'volume']].sort_values('datetime')
+    return chart_decoder.decode(df)
 
 
 # 🔹 다량의 데이터를 한번에 가져오는 함수 (최대 2400개)
-def min_massdata(min_interval='1', cnt=20):
+def min_massdata(min_interval='1', cnt=20, sink=None):
     formatted_time = ""
-    df_combined = pd.DataFrame()
-
-    for i in range(cnt):
-        if i == 0:
-            rt_data = main_api.get_overseas_price_quot_inquire_time_itemchartprice(
-                div="02", excd="AMS", itm_no="SOXL", nmin=min_interval, pinc="1"
-            )
-        else:
-            rt_data = main_api.get_overseas_price_quot_inquire_time_itemchartprice(
-                div="02", excd="AMS", itm_no="SOXL", nmin=min_interval, 
-                pinc="1", next_value="1", keyb=formatted_time
-            )
+    # sink(ex. save_to_db) 를 주면 2400건마다 바로 저장하고 저장 건수 반환 (여러 날 백필도 메모리 일정)
+    acc = page_buffer.PageAccumulator(capacity=120 * cnt, sink=sink)
+
+    # 백필 호출은 스케줄러에서 주문/실시간 시세보다 후순위로 처리 (호출 간 sleep 불필요)
+    with kis_scheduler.priority(kis_scheduler.PRIORITY_BACKFILL):
+        for i in range(cnt):
+            if i == 0:
+                rt_data = main_api.get_overseas_price_quot_inquire_time_itemchartprice(
+                    div="02", excd="AMS", itm_no="SOXL", nmin=min_interval, pinc="1"
+                )
+            else:
+                rt_data = main_api.get_overseas_price_quot_inquire_time_itemchartprice(
+                    div="02", excd="AMS", itm_no="SOXL", nmin=min_interval, 
+                    pinc="1", next_value="1", keyb=formatted_time
+                )
 
-        df = rt_data.rename(columns={"xymd":"date", "xhms":"time", "last":"close", "evol":"volume"})
-        df['datetime'] = pd.to_datetime(df['date'] + df['time'].str.zfill(6), format='%Y%m%d%H%M%S')
-        df = df[['datetime', 'open', 'high', 'low', 'close', 'volume']].sort_values('datetime')
+            df = chart_decoder.decode(rt_data)
 
-        if df.empty:
-            print("❌ 더 이상 가져올 데이터가 없습니다.")
-            break
+            if df.empty:
+                print("❌ 더 이상 가져올 데이터가 없습니다.")
+                break
 
-        formatted_time = df.iloc[0]['datetime'].strftime('%Y%m%d%H%M%S')
+            formatted_time = df.iloc[0]['datetime'].strftime('%Y%m%d%H%M%S')
 
-        # 기존 데이터와 새로운 데이터 합치기 (시간 순 정렬)
-        df_combined = pd.concat([df_combined, df]).drop_duplicates(subset='datetime').sort_values('datetime')
-        time.sleep(0.5)
+            acc.add(df)
 
-    return df_combined
+    return acc.finish()
 
 
-# 🔹 데이터 저장 (Bulk Insert 방식으로 성능 향상)
+# 🔹 데이터 저장 (multi-row VALUES 배치 upsert, bulk_ingest 참고)
 def save_to_db(df):
     conn = connect_db()
     try:
-        with conn.cursor() as cursor:
-            sql = """
-                INSERT INTO SOXL_minute_data (time, open, high, low, close, volume)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                ON DUPLICATE KEY UPDATE 
-                    open=VALUES(open), high=VALUES(high), low=VALUES(low), close=VALUES(close), volume=VALUES(volume);
-            """
-            data_tuples = [
-                (
-                    row['datetime'].strftime('%Y-%m-%d %H:%M:%S'),
-                    row['open'], row['high'], row['low'], row['close'], row['volume']
-                )
-                for _, row in df.iterrows()
-            ]
-            cursor.executemany(sql, data_tuples)
-        print(f"✅ {len(df)}건 데이터 DB 저장 완료")
+        stats = bulk_ingest.mysql_upsert(conn, 'SOXL_minute_data', df)
+        bar_store.refresh_mysql(conn, df['datetime'].min())
+        print(f"✅ {stats['rows']}건 데이터 DB 저장 완료 ({stats['rows_per_sec']:,.0f} rows/s)")
     except Exception as e:
         print("❌ DB 저장 오류:", e)
     finally:
@@ -127,72 +136,72 @@ def data_analysis():
                 'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'
             }).dropna().reset_index()
 
-            main_s.plot_candlestick(aggregated_data, show_rsi=False, show_macd=True, show_bollinger=False, show_volume=False, show_hedging_band=True)
+            import main_chart
+            main_chart.plot_signals(main_s.compute_signals(aggregated_data, {'bollinger': False}))
 
     except Exception as e:
         print("❌ 분석 오류:", e)
     finally:
         conn.close()
 
-# 🔹 개선된 데이터 분석 로직 (1분 단위 수 제한 추가)
-# - resample_interval: 리샘플링 간격 (ex. 15분봉)
+# 🔹 개선된 데이터 분석 로직 (bar_store 에서 미리 집계된 N분봉 조회)
+# - resample_interval: 리샘플링 간격 (ex. 15분봉, bar_store.TIMEFRAMES 중 하나)
 # - limit: 리샘플링된 봉의 최대 개수 (ex. 1200개 15분봉)
-# - raw_limit: 원본 1분봉 데이터의 최대 개수 (ex. 최근 30000개 1분봉)
+# - raw_limit: 원본 1분봉 데이터 기준 조회 범위 (ex. 최근 2400개 1분봉 → 160개 15분봉)
 def data_analysis_improved(mode, resample_interval=15, limit=2400, raw_limit=2400):
-    interval = resample_interval * 60
-
-    sql = f"""
-    SELECT
-        interval_start,
-        MIN(actual_time) AS actual_start_time,
-        MAX(actual_time) AS actual_end_time,
-        SUBSTRING_INDEX(GROUP_CONCAT(open ORDER BY actual_time ASC), ',', 1) AS open,
-        MAX(high) AS high,
-        MIN(low) AS low,
-        SUBSTRING_INDEX(GROUP_CONCAT(close ORDER BY actual_time DESC), ',', 1) AS close,
-        SUM(volume) AS volume
-    FROM (
-        SELECT
-            FROM_UNIXTIME(UNIX_TIMESTAMP(`time`) - MOD(UNIX_TIMESTAMP(`time`), {interval})) AS interval_start,
-            `time` AS actual_time,
-            open, high, low, close, volume
-        FROM (
-            SELECT * FROM SOXL_minute_data
-            ORDER BY time DESC
-            LIMIT {raw_limit}
-        ) AS recent_data
-    ) AS sub
-    GROUP BY interval_start
-    ORDER BY interval_start DESC
-    LIMIT {limit};
-    """
-
     conn = connect_db()
     try:
-        df = pd.read_sql(sql, conn)
+        df = bar_store.read_mysql(conn, resample_interval, min(limit, math.ceil(raw_limit / resample_interval)))
         if not df.empty:
-            df['interval_start'] = pd.to_datetime(df['interval_start'])
-            df = df.sort_values('interval_start')
+            df['time'] = pd.to_datetime(df['time'])
             df[['open', 'high', 'low', 'close', 'volume']] = df[['open', 'high', 'low', 'close', 'volume']].astype(float)
 
-            df = main_s.plot_candlestick(
-                df.rename(columns={'interval_start':'time'}),
-                show_rsi=False, show_macd=True,
-                show_bollinger=True, show_volume=False,
-                show_hedging_band=True,
-                mode = mode
-            )
-        if mode == 1 or mode == 2:
-            signal = calculate_trading_signal(df)
-            execute_trade(signal)
-        else:
-            None
-
+            df = main_s.compute_signals(df, SIGNAL_CONFIG)
+            if mode == 3:
+                import main_chart  # 차트는 모드 3 에서만
+                main_chart.plot_signals(df)
     except Exception as e:
         print("❌ 분석 오류:", e)
     finally:
         conn.close()
 
+# 🔹 실시간 지표 (1분봉 → N분봉 → 증분 지표, SIGNAL_CONFIG 기준)
+_live = None
+
+def get_live_signals(resample_interval=RESAMPLE_INTERVAL):
+    global _live
+    if _live is None or _live.interval != resample_interval:
+        _live = indicator_stream.LiveSignals(resample_interval, SIGNAL_CONFIG,
+                                             frame_bars=math.ceil(LIVE_RAW_LIMIT / resample_interval),
+                                             checkpoint_path=INDICATOR_CHECKPOINT)
+    return _live
+
+# 🔹 실시간 분석: 지난번 이후 저장된 1분봉만 읽어 지표 갱신 → 방금 마감된 N분봉 시그널로 거래
+def live_analysis(resample_interval=RESAMPLE_INTERVAL):
+    live = get_live_signals(resample_interval)
+    conn = connect_db()
+    try:
+        if live.last_minute is None:
+            df = pd.read_sql(f"""
+                SELECT * FROM (
+                    SELECT time, open, high, low, close, volume FROM SOXL_minute_data
+                    ORDER BY time DESC LIMIT {LIVE_RAW_LIMIT}
+                ) t ORDER BY time
+            """, conn)
+        else:
+            df = pd.read_sql("SELECT time, open, high, low, close, volume FROM SOXL_minute_data WHERE time > %s ORDER BY time",
+                             conn, params=[live.last_minute.to_pydatetime()])
+
+        rows = live.feed(df) + live.flush(datetime.now(NYT).replace(tzinfo=None))
+        live.save_checkpoint()
+        if rows:
+            signal, bar_time = calculate_trading_signal(pd.DataFrame(rows).set_index('time'), resample_interval)
+            execute_trade(signal, bar_time)
+    except Exception as e:
+        print("❌ 실시간 분석 오류:", e)
+    finally:
+        conn.close()
+
 # 🔹 마지막 저장 시간 조회
 def get_last_time():
     conn = connect_db()
@@ -208,117 +217,124 @@ def get_last_time():
         conn.close()
     return None
 
-def fill_missing_data():
-    while True:
-        last_time = get_last_time()
-        now = datetime.now(NYT).replace(second=0, microsecond=0)
-
-        if last_time is None:
-            print("📌 DB 비어있음, 2400개 데이터 로딩 시작")
-            df = min_massdata('1', cnt=20)
-        else:
-            last_time = pd.to_datetime(last_time)
-            missing_minutes = int((now - NYT.localize(last_time)).total_seconds() // 60)
-
-            if missing_minutes <= 0:
-                print("📌 더 이상 누락된 데이터가 없습니다.")
-                break
-            else:
-                print(f"📌 {missing_minutes}분 데이터 누락, 보완 로딩 시작")
-                df = get_minute_data(min(missing_minutes, 200), to=None)
+# 🔹 체결 없던 분 기록 (다음 누락 탐지에서 제외)
+def record_no_trade(times):
+    conn = connect_db()
+    try:
+        gap_planner.record_no_trade_mysql(conn, "SOXL", times)
+    finally:
+        conn.close()
 
-                if df.empty:
-                    print("❌ 조회된 추가 데이터가 없습니다.")
-                    break
+# 🔹 누락 분봉 보완: 저장된 분봉을 거래소 달력과 비교해 비어 있는 구간만 keyb 로 조회
+def fill_missing_data(lookback_days=5):
+    now = datetime.now(NYT).replace(tzinfo=None, second=0, microsecond=0)
+    start = gap_planner.scan_start(now, lookback_days)
+    end = now - timedelta(minutes=1)  # 진행 중인 분봉 제외
 
-                # last_time이 None이 아닌 경우만 필터링 처리
-                df = df[df['datetime'] > last_time]
+    conn = connect_db()
+    try:
+        stored = gap_planner.stored_times_mysql(conn, start, end)
+        stored += gap_planner.no_trade_times_mysql(conn, start, end, "SOXL")  # 체결 없던 분은 다시 조회하지 않음
+    finally:
+        conn.close()
 
-        if df.empty:
-            print("📌 추가로 저장할 신규 데이터가 없습니다.")
-            break
+    gaps, pages = gap_planner.plan(stored, start, end)
+    if not gaps:
+        print("📌 더 이상 누락된 데이터가 없습니다.")
+        return
 
-        save_to_db(df)
-        time.sleep(1)  # API 호출 제한 방지
+    rows = gap_planner.fetch_pages("AMS", "SOXL", pages, sink=save_to_db,  # 2400건 단위로 바로 저장
+                                   empty_sink=record_no_trade)
+    if not rows:
+        print("❌ 조회된 추가 데이터가 없습니다.")
+        return
 
     print("✅ 모든 누락 데이터가 성공적으로 채워졌습니다.")
 
     
 # 🔹 실시간 전략 시그널 계산 깡통
-def calculate_trading_signal(df):
+# - N분봉이 막 마감된 시각(ex. 10:15)에 방금 마감된 봉(10:00)의 신호만 사용 → (시그널, 봉 시작 시각)
+def calculate_trading_signal(df, interval=RESAMPLE_INTERVAL, now=None):
     if df.empty:
         print("❌ DataFrame이 비어있습니다.")
-        return None
+        return None, None
 
     try:
-        # 현재 뉴욕 시간 (초, 마이크로초 제거)
-        now = datetime.now(NYT).replace(second=0, microsecond=0)
-
-        # 인덱스 기준으로 마지막 시간
-        last_time = pd.to_datetime(df.index[-1])
-
-        # 마지막 행
-        last_row = df.iloc[-1]
-
-        if last_time == now:
-            if last_row.get('buy_signal', False):
-                return "buy"
-            elif last_row.get('sell_signal', False):
-                return "sell"
+        bar = main_s.closed_bar(df, interval, now or datetime.now(NYT))
     except Exception as e:
         print("❌ 시그널 계산 오류:", e)
-
-    return None
+        return None, None
+    if bar is None:
+        return None, None
+    return main_s.bar_signal(bar), bar.name
 
 # 🔹 정규장 시작/종료 감지 및 알림
 market_open_sent = False
 market_close_sent = False
 
 def data_collection_thread(mode):
-    global market_open_sent, market_close_sent
-    while True:
-        now = datetime.now(NYT)
-
-        if dt_time(9, 30) <= now.time() < dt_time(16, 0):
-            if not market_open_sent:
-                send_message("🟢 정규장이 시작되었습니다.")
-                market_open_sent = True
-                market_close_sent = False
-
-            if now.second == 3:
-                df = get_minute_data(1)
-                if not df.empty:
-                    save_to_db(df)
-
-                ####    데이터 분석     ####
-                data_analysis_improved(mode, resample_interval=RESAMPLE_INTERVAL)
-
-                
-            time.sleep(0.5)
-
-        elif now.time() >= dt_time(16, 0):
-            if not market_close_sent:
-                send_message("🔴 정규장이 종료되었습니다.")
-                market_close_sent = True
-                market_open_sent = False
-            time.sleep(60)
-
-        else:
-            time.sleep(1)
+    # 매 분봉 마감 + 2초에 깨어나 수집 → 분석 순서로 실행 (bar_scheduler 참고)
+    def session(ctx):
+        return {'session': market_calendar.phase(ctx['bar_close'] - timedelta(seconds=1))}  # 휴장일 / 조기 폐장 / DST 반영
+
+    def market_open(ctx):
+        global market_open_sent, market_close_sent
+        if not market_open_sent:
+            send_message("🟢 정규장이 시작되었습니다.")
+            market_open_sent = True
+            market_close_sent = False
+
+    def ingest(ctx):
+        # 놓친 봉이 있으면 그만큼 더 조회
+        df = get_minute_data(1 + ctx['missed'])
+        if not df.empty:
+            save_to_db(df)
+
+    def watchlist(ctx):
+        df_watch = collector.collect(WATCHLIST)
+        conn = connect_db()
+        try:
+            collector.save_bars_mysql(conn, df_watch)
+        finally:
+            conn.close()
+
+    def market_close(ctx):
+        global market_open_sent, market_close_sent
+        if not market_close_sent:
+            send_message("🔴 정규장이 종료되었습니다.")
+            market_close_sent = True
+            market_open_sent = False
+
+    is_open = lambda ctx: ctx['session'] == 'open'
+    pipeline = bar_scheduler.Pipeline()
+    pipeline.add('notify', market_open, when=is_open)
+    # 분석은 수집 직후 바로 (감시 종목 수집은 매매 판단 이후)
+    pipeline.add('ingest', ingest, when=is_open)
+    pipeline.add('analysis', lambda ctx: live_analysis(resample_interval=RESAMPLE_INTERVAL), deps=['ingest'])
+    pipeline.add('watchlist', watchlist, when=lambda ctx: is_open(ctx) and bool(WATCHLIST))
+    pipeline.add('close', market_close, when=lambda ctx: ctx['session'] == 'closed')
+
+    bar_scheduler.BarScheduler(pipeline, interval=60, offset=2.0, tz=NYT, context=session).run_forever()
 
 
 # 🔹 자동 거래 주문 기능 깡통
-def execute_trade(signal):
+def execute_trade(signal, bar_time=None):
     if signal:
-        main_api.get_overseas_inquire_present_balance(svr='vps',dv="02", dvsn="01", natn="000", mkt="00", inqr_dvsn="00")
-        print(f"🚨 {signal} 신호 발생! 실제 거래 로직을 구현해주세요.")
-    main_api.get_overseas_inquire_present_balance(svr='vps',dv="02", dvsn="01", natn="000", mkt="00", inqr_dvsn="00")
+        quote_cache.present_balance(svr='vps',dv="02", dvsn="01", natn="000", mkt="00", inqr_dvsn="00", client=kis_client.get('vps'))
+        print(f"🚨 {signal} 신호 발생 ({bar_time} 봉)! 실제 거래 로직을 구현해주세요.")
+    quote_cache.present_balance(svr='vps',dv="02", dvsn="01", natn="000", mkt="00", inqr_dvsn="00", client=kis_client.get('vps'))
     print('A')
 
 # 🔹 모드별 실행
 def run_mode(mode):
     svr = 'my_prod' if mode == 1 else 'vps'
     ka.auth(svr)
+    conn = connect_db()
+    try:
+        bar_store.init_mysql(conn)
+        collector.init_mysql_schema(conn)
+    finally:
+        conn.close()
 
     if mode in [1, 2]:
         fill_missing_data()
@@ -1,10 +1,37 @@
 import kis_auth as kis
 import pandas as pd
-from collections import namedtuple
 from datetime import datetime, timedelta
 from pandas import DataFrame
 import mojito
 
+# 🔹 모든 함수는 client=kis_client.KISClient 를 받으면 해당 (환경, 계좌, 상품) 으로 호출
+#    없으면 기존처럼 kis_auth 전역 환경 (ka.auth() 이후)
+def _env(client):
+    return kis.getTREnv() if client is None else client.env
+
+
+def _fetch(client, url, tr_id, tr_cont, params, **kwargs):
+    if client is None:
+        return kis._url_fetch(url, tr_id, tr_cont, params, **kwargs)
+    return client.fetch(url, tr_id, tr_cont, params, **kwargs)
+
+
+# 🔹 해외주식(미국) 주문 TR ID: (매수/매도, 환경) → TR ID
+US_ORDER_EXCHANGES = ("NASD", "NYSE", "AMEX")
+ORDER_TR_IDS = {
+    ("buy", "my_prod"): "TTTT1002U",    # 미국 매수 주문
+    ("buy", "vps"): "VTTT1002U",        # 미국 매수 주문 [모의투자]
+    ("sell", "my_prod"): "TTTT1006U",   # 미국 매도 주문
+    ("sell", "vps"): "VTTT1006U",       # 미국 매도 주문 [모의투자]
+}
+ORDER_SLL_TYPE = {"buy": "", "sell": "00"}  # 판매유형 (매도 00)
+
+
+def format_price(unpr):
+    """해외주문단가 문자열 (1달러 이상 소수점 2자리, 미만 4자리)"""
+    unpr = float(unpr)
+    return f"{unpr:.2f}" if unpr >= 1 else f"{unpr:.4f}"
+
 ##############################################################################################
 # [해외주식] 주문/계좌 > 해외주식 주문[v1_해외주식-001]
 #
@@ -28,32 +55,19 @@ import mojito
 ##############################################################################################
 # Input: None (Option) 상세 Input값 변경이 필요한 경우 API문서 참조
 # Output: DataFrame (Option) output API 문서 참조 등
-def get_overseas_order(svr, ord_dv="", excg_cd="", itm_no="", qty=0, unpr=0, tr_cont="", FK100="", NK100="", dataframe=None):  # 국내주식주문 > 주식주문(현금)
+def get_overseas_order(svr, ord_dv="", excg_cd="", itm_no="", qty=0, unpr=0, tr_cont="", FK100="", NK100="", dataframe=None, client=None):  # 국내주식주문 > 주식주문(현금)
+    svr = client.svr if client is not None else svr
     url = '/uapi/overseas-stock/v1/trading/order'
 
-    if ord_dv == "buy":
-        if excg_cd in ("NASD","NYSE","AMEX"):
-            if svr == 'vps':
-                tr_id = "VTTT1002U"
-            elif svr == 'my_prod':
-                tr_id = "TTTT1002U"  # 미국 매수 주문 [모의투자] VTTT1002U
-        else:
-            print("해외거래소코드 확인요망!!!")
-            return None
-        
-    elif ord_dv == "sell":
-        if excg_cd in ("NASD", "NYSE", "AMEX"):
-            if svr == 'vps':
-                tr_id = "VTTT1006U"
-            elif svr == 'my_prod':
-                tr_id = "TTTT1006U"  # 미국 매도 주문 [모의투자] VTTT1006U
-        else:
-            print("해외거래소코드 확인요망!!!")
-            return None
-    else:
+    if ord_dv not in ORDER_SLL_TYPE:
         print("매수/매도 구분 확인요망!")
         return None
 
+    if excg_cd not in US_ORDER_EXCHANGES:
+        print("해외거래소코드 확인요망!!!")
+        return None
+    tr_id = ORDER_TR_IDS[(ord_dv, svr)]
+
     if itm_no == "":
         print("주문종목번호(상품번호) 확인요망!!!")
         return None
@@ -66,30 +80,22 @@ def get_overseas_order(svr, ord_dv="", excg_cd="", itm_no="", qty=0, unpr=0, tr_
         print("해외주문단가 확인요망!!!")
         return None
 
-    if ord_dv == "buy":
-        sll_type = ""
-    elif ord_dv == "sell":
-        sll_type = "00"
-    else:
-        print("매수/매도 구분 확인요망!!!")
-        return None
-
     params = {
-        "CANO": kis.getTREnv().my_acct,         # 종합계좌번호 8자리
-        "ACNT_PRDT_CD": kis.getTREnv().my_prod, # 계좌상품코드 2자리
+        "CANO": _env(client).my_acct,         # 종합계좌번호 8자리
+        "ACNT_PRDT_CD": _env(client).my_prod, # 계좌상품코드 2자리
         "OVRS_EXCG_CD": excg_cd,                # 해외거래소코드
                                                 # NASD:나스닥,NYSE:뉴욕,AMEX:아멕스,SEHK:홍콩,SHAA:중국상해,SZAA:중국심천,TKSE:일본,HASE:베트남하노이,VNSE:호치민
         "PDNO": itm_no,                         # 종목코드
         "ORD_DVSN": "00",                       # 주문구분 00:지정가, 01:시장가, 02:조건부지정가  나머지주문구분 API 문서 참조
         "ORD_QTY": str(int(qty)),               # 주문주식수
-        "OVRS_ORD_UNPR": str(int(unpr)),        # 해외주문단가
-        "SLL_TYPE": sll_type,                   # 판매유형
+        "OVRS_ORD_UNPR": format_price(unpr),    # 해외주문단가 (소수점 2자리, ex. 45.67)
+        "SLL_TYPE": ORDER_SLL_TYPE[ord_dv],     # 판매유형
         "ORD_SVR_DVSN_CD": "0"                  # 주문서버구분코드l
     }
 
-    res = kis._url_fetch(url, tr_id, tr_cont, params, postFlag=True)
+    res = _fetch(client, url, tr_id, tr_cont, params, postFlag=True)
     if str(res.getBody().rt_cd) == "0":
-        current_data = pd.DataFrame(res.getBody().output, index=[0])
+        current_data = res.frame('output')
         dataframe = current_data
     else:
         print(res.getBody().msg_cd + "," + res.getBody().msg1)
@@ -134,7 +140,8 @@ def get_overseas_order(svr, ord_dv="", excg_cd="", itm_no="", qty=0, unpr=0, tr_
 # 해외주식 체결기준현재잔고 List를 DataFrame 으로 반환
 # Input: None (Option) 상세 Input값 변경이 필요한 경우 API문서 참조
 # Output: DataFrame (Option) output API 문서 참조 등
-def get_overseas_inquire_present_balance(svr, dv="03", dvsn="01", natn="000", mkt="00", inqr_dvsn="00", tr_cont="", FK100="", NK100="", dataframe=None):
+def get_overseas_inquire_present_balance(svr, dv="03", dvsn="01", natn="000", mkt="00", inqr_dvsn="00", tr_cont="", FK100="", NK100="", dataframe=None, client=None):
+    svr = client.svr if client is not None else svr
     url = '/uapi/overseas-stock/v1/trading/inquire-present-balance'
     if svr == 'vps':
         tr_id = "VTRP6504R"
@@ -144,8 +151,8 @@ def get_overseas_inquire_present_balance(svr, dv="03", dvsn="01", natn="000", mk
     t_cnt = 0
 
     params = {
-        "CANO": kis.getTREnv().my_acct,         # 종합계좌번호 8자리
-        "ACNT_PRDT_CD": kis.getTREnv().my_prod, # 계좌상품코드 2자리
+        "CANO": _env(client).my_acct,         # 종합계좌번호 8자리
+        "ACNT_PRDT_CD": _env(client).my_prod, # 계좌상품코드 2자리
         "WCRC_FRCR_DVSN_CD": dvsn,              # 원화외화구분코드 01 : 원화, 02 : 외화
         "NATN_CD": natn,                        # 국가코드 000 전체, 840 미국, 344 홍콩, 156 중국, 392 일본, 704 베트남
         "TR_MKET_CD": mkt,                      # 거래시장코드 00:전체 (API문서 참조)
@@ -153,15 +160,15 @@ def get_overseas_inquire_present_balance(svr, dv="03", dvsn="01", natn="000", mk
     }
 
 
-    res = kis._url_fetch(url, tr_id, tr_cont, params)
+    res = _fetch(client, url, tr_id, tr_cont, params)
 
     if str(res.getBody().rt_cd) == "0":
         if dv == "01":
-            current_data = pd.DataFrame(res.getBody().output1)
+            current_data = res.frame('output1')
         elif dv == "02":
-            current_data = pd.DataFrame(res.getBody().output2)
+            current_data = res.frame('output2')
         else:
-            current_data = pd.DataFrame(res.getBody().output3, index=[0])
+            current_data = res.frame('output3')
         dataframe = current_data
     else:
         print(res.getBody().msg_cd + "," + res.getBody().msg1)
@@ -179,7 +186,8 @@ def get_overseas_inquire_present_balance(svr, dv="03", dvsn="01", natn="000", mk
 # 해외주식 매수가능금액조회 List를 DataFrame 으로 반환
 # Input: None (Option) 상세 Input값 변경이 필요한 경우 API문서 참조
 # Output: DataFrame (Option) output API 문서 참조 등
-def get_overseas_inquire_psamount(svr, dv="03", dvsn="01", natn="000", mkt="00", inqr_dvsn="00", tr_cont="", FK100="", NK100="", dataframe=None):
+def get_overseas_inquire_psamount(svr, dv="03", dvsn="01", natn="000", mkt="00", inqr_dvsn="00", tr_cont="", FK100="", NK100="", dataframe=None, client=None):
+    svr = client.svr if client is not None else svr
     url = '/uapi/overseas-stock/v1/trading/inquire-psamount'
     if svr == 'vps':
         tr_id = "VTTT1002U"
@@ -189,17 +197,17 @@ def get_overseas_inquire_psamount(svr, dv="03", dvsn="01", natn="000", mkt="00",
     t_cnt = 0
 
     params = {
-        "CANO": kis.getTREnv().my_acct,         # 종합계좌번호 8자리
-        "ACNT_PRDT_CD": kis.getTREnv().my_prod, # 계좌상품코드 2자리
+        "CANO": _env(client).my_acct,         # 종합계좌번호 8자리
+        "ACNT_PRDT_CD": _env(client).my_prod, # 계좌상품코드 2자리
         "OVRS_EXCG_CD": dvsn,              # 원화외화구분코드 01 : 원화, 02 : 외화
         "OVRS_ORD_UNPR": natn,                        # 국가코드 000 전체, 840 미국, 344 홍콩, 156 중국, 392 일본, 704 베트남
         "ITEM_CD": inqr_dvsn               # 00 : 전체,01 : 일반해외주식,02 : 미니스탁
     }
 
-    res = kis._url_fetch(url, tr_id, tr_cont, params)
+    res = _fetch(client, url, tr_id, tr_cont, params)
 
     if str(res.getBody().rt_cd) == "0":
-        current_data = pd.DataFrame(res.getBody().output, index=[0])
+        current_data = res.frame('output')
         dataframe = current_data
     else:
         print(res.getBody().msg_cd + "," + res.getBody().msg1)
@@ -231,7 +239,7 @@ def get_overseas_inquire_psamount(svr, dv="03", dvsn="01", natn="000", mkt="00",
 # 해외주식 현재가상세 시세 Object를 DataFrame 으로 반환
 # Input: None (Option) 상세 Input값 변경이 필요한 경우 API문서 참조
 # Output: DataFrame (Option) output
-def get_overseas_price_quot_price_detail(excd="", itm_no="", tr_cont="", dataframe=None):
+def get_overseas_price_quot_price_detail(excd="", itm_no="", tr_cont="", dataframe=None, client=None):
     url = '/uapi/overseas-price/v1/quotations/price-detail'
     tr_id = "HHDFS76200200" # 해외주식 현재가상세
 
@@ -240,10 +248,10 @@ def get_overseas_price_quot_price_detail(excd="", itm_no="", tr_cont="", datafra
         "EXCD": excd,       # 	종목번호 (6자리) ETN의 경우, Q로 시작 (EX. Q500001)
         "SYMB": itm_no      # 종목번호 (6자리) ETN의 경우, Q로 시작 (EX. Q500001)
     }
-    res = kis._url_fetch(url, tr_id, tr_cont, params)
+    res = _fetch(client, url, tr_id, tr_cont, params)
 
     # Assuming 'output' is a dictionary that you want to convert to a DataFrame
-    current_data = pd.DataFrame(res.getBody().output, index=[0])  # getBody() kis_auth.py 존재
+    current_data = res.frame('output')  # getBody() kis_auth.py 존재
     last_price = float(res.getBody().output['last']) 
     dataframe = current_data
 
@@ -266,7 +274,8 @@ def get_overseas_price_quot_price_detail(excd="", itm_no="", tr_cont="", datafra
 # 해외주식 잔고 List를 DataFrame 으로 반환
 # Input: None (Option) 상세 Input값 변경이 필요한 경우 API문서 참조
 # Output: DataFrame (Option) output API 문서 참조 등
-def get_overseas_inquire_balance(svr, excg_cd="", crcy_cd="", tr_cont="", FK100="", NK100="", dataframe=None):
+def get_overseas_inquire_balance(svr, excg_cd="", crcy_cd="", tr_cont="", FK100="", NK100="", dataframe=None, client=None, output="output2"):
+    svr = client.svr if client is not None else svr
     url = '/uapi/overseas-stock/v1/trading/inquire-balance'
     if svr == 'vps':
         tr_id = "VTTS3012R"
@@ -276,18 +285,18 @@ def get_overseas_inquire_balance(svr, excg_cd="", crcy_cd="", tr_cont="", FK100=
     t_cnt = 0
 
     params = {
-        "CANO": kis.getTREnv().my_acct,         # 종합계좌번호 8자리
-        "ACNT_PRDT_CD": kis.getTREnv().my_prod, # 계좌상품코드 2자리
+        "CANO": _env(client).my_acct,         # 종합계좌번호 8자리
+        "ACNT_PRDT_CD": _env(client).my_prod, # 계좌상품코드 2자리
         "OVRS_EXCG_CD": excg_cd,                # 해외거래소코드 NASD:나스닥,NYSE:뉴욕,AMEX:아멕스,SEHK:홍콩,SHAA:중국상해,SZAA:중국심천,TKSE:일본,HASE:베트남하노이,VNSE:호치민
         "TR_CRCY_CD": crcy_cd,                  # 거래통화코드 USD : 미국달러,HKD : 홍콩달러,CNY : 중국위안화,JPY : 일본엔화,VND : 베트남동
         "CTX_AREA_FK200": FK100,                # 공란 : 최초 조회시 이전 조회 Output CTX_AREA_FK100 값 : 다음페이지 조회시(2번째부터)
         "CTX_AREA_NK200": NK100                 # 공란 : 최초 조회시 이전 조회 Output CTX_AREA_NK100 값 : 다음페이지 조회시(2번째부터)
     }
 
-    res = kis._url_fetch(url, tr_id, tr_cont, params)
+    res = _fetch(client, url, tr_id, tr_cont, params)
 
     if str(res.getBody().rt_cd) == "0":
-        current_data = pd.DataFrame(res.getBody().output2, index=[0])
+        current_data = res.frame(output)  # output1: 종목별 잔고, output2: 계좌 합계
         dataframe = current_data
     else:
         print(res.getBody().msg_cd + "," + res.getBody().msg1)
@@ -318,7 +327,7 @@ def get_overseas_inquire_balance(svr, excg_cd="", crcy_cd="", tr_cont="", FK100=
 # 해외주식 해외주식분봉조회 시세 Object를 DataFrame 으로 반환
 # Input: None (Option) 상세 Input값 변경이 필요한 경우 API문서 참조
 # Output: DataFrame (Option) output
-def get_overseas_price_quot_inquire_time_itemchartprice(div="02", excd="", itm_no="", nmin="", pinc="0", tr_cont="", dataframe=None, next_value = "0",nrec = "120", keyb=""):
+def get_overseas_price_quot_inquire_time_itemchartprice(div="02", excd="", itm_no="", nmin="", pinc="0", tr_cont="", dataframe=None, next_value = "0",nrec = "120", keyb="", client=None):
     url = '/uapi/overseas-price/v1/quotations/inquire-time-itemchartprice'
     tr_id = "HHDFS76950200" # 해외주식 해외주식분봉조회
 
@@ -334,13 +343,13 @@ def get_overseas_price_quot_inquire_time_itemchartprice(div="02", excd="", itm_n
         "FILL": "",         # (사용안함)미체결채움구분
         "KEYB": keyb          # (사용안함)NEXT KEY BUFF
     }
-    res = kis._url_fetch(url, tr_id, tr_cont, params)
+    res = _fetch(client, url, tr_id, tr_cont, params)
 
     # Assuming 'output' is a dictionary that you want to convert to a DataFrame
     if div == "02":
-        current_data = pd.DataFrame(res.getBody().output2)
+        current_data = res.frame('output2')
     else:
-        current_data = pd.DataFrame(res.getBody().output1, index=[0])
+        current_data = res.frame('output1')
 
     dataframe = current_data
 
@@ -354,7 +363,7 @@ def get_overseas_price_quot_inquire_time_itemchartprice(div="02", excd="", itm_n
 # ※ 해당 API로 미국주식 조회 시, 다우30, 나스닥100, S&P500 종목만 조회 가능합니다.
 #   더 많은 미국주식 종목 시세를 이용할 시에는, 해외주식기간별시세 API 사용 부탁드립니다.
 ###########################################################################
-def get_overseas_price_quot_inquire_daily_price(div="N", itm_no="", inqr_strt_dt="", inqr_end_dt="", period="D", tr_cont="", dataframe=None):
+def get_overseas_price_quot_inquire_daily_price(div="N", itm_no="", inqr_strt_dt="", inqr_end_dt="", period="D", tr_cont="", dataframe=None, client=None):
     url = '/uapi/overseas-price/v1/quotations/inquire-daily-chartprice'
     tr_id = "FHKST03030100" # 해외주식 종목/지수/환율기간별시세(일/주/월/년)
 
@@ -371,10 +380,10 @@ def get_overseas_price_quot_inquire_daily_price(div="N", itm_no="", inqr_strt_dt
         "FID_INPUT_DATE_2": inqr_end_dt,           # 종료일자(YYYYMMDD)
         "FID_PERIOD_DIV_CODE": period              # 기간분류코드 D:일, W:주, M:월, Y:년
     }
-    res = kis._url_fetch(url, tr_id, tr_cont, params)
+    res = _fetch(client, url, tr_id, tr_cont, params)
 
     # Assuming 'output' is a dictionary that you want to convert to a DataFrame
-    current_data = pd.DataFrame(res.getBody().output1, index=[0])
+    current_data = res.frame('output1')
 
     dataframe = current_data
 
@@ -384,7 +393,7 @@ def get_overseas_price_quot_inquire_daily_price(div="N", itm_no="", inqr_strt_dt
 ##############################################################################################
 # [해외주식] 기본시세 > 해외주식 종목/지수/환율기간별시세(일/주/월/년) → 일자별정보 (최대 30일까지 조회)
 ##############################################################################################
-def get_overseas_price_quot_inquire_daily_chartprice(div="N", itm_no="", inqr_strt_dt="", inqr_end_dt="", period="D", tr_cont="", dataframe=None):
+def get_overseas_price_quot_inquire_daily_chartprice(div="N", itm_no="", inqr_strt_dt="", inqr_end_dt="", period="D", tr_cont="", dataframe=None, client=None):
     url = '/uapi/overseas-price/v1/quotations/inquire-daily-chartprice'
     tr_id = "FHKST03030100" # 해외주식 종목/지수/환율기간별시세(일/주/월/년)
 
@@ -401,10 +410,10 @@ def get_overseas_price_quot_inquire_daily_chartprice(div="N", itm_no="", inqr_st
         "FID_INPUT_DATE_2": inqr_end_dt,           # 종료일자(YYYYMMDD)
         "FID_PERIOD_DIV_CODE": period              # 기간분류코드 D:일, W:주, M:월, Y:년
     }
-    res = kis._url_fetch(url, tr_id, tr_cont, params)
+    res = _fetch(client, url, tr_id, tr_cont, params)
 
     # Assuming 'output' is a dictionary that you want to convert to a DataFrame
-    current_data = pd.DataFrame(res.getBody().output2)
+    current_data = res.frame('output2')
 
     dataframe = current_data
 
@@ -0,0 +1,260 @@
+import asyncio
+import contextvars
+import json
+
+import pandas as pd
+
+import chart_decoder
+import gap_planner
+import kis_auth as kis
+import kis_scheduler
+import kis_transport
+import main_api
+
+try:
+    import aiohttp
+except ImportError:  # pip install aiohttp
+    aiohttp = None
+
+
+# 🔹 main_api 의 비동기(asyncio) 버전
+# - 인증/헤더/계좌 정보는 kis_auth 와 공유 (ka.auth() 이후 사용), client= 를 주면 해당 KISClient 기준
+# - 호출 한도는 kis_auth 의 스케줄러를 그대로 사용 (주문 우선)
+# - 초당 거래건수 초과(EGW00201) / 5xx(GET) 응답은 kis_transport 와 같은 기준으로 백오프 후 재전송
+#   재전송도 호출 한도에 포함되므로 보낼 때마다 스케줄러 토큰을 받는다
+# - fetch_minute_range(): 과거 구간을 keyb 시간창으로 나눠 동시에 조회
+#
+#   async with AsyncKIS() as api:
+#       df = await api.fetch_minute_range("AMS", "SOXL", start, end)
+
+# 태스크별 스케줄러 우선순위 (None 이면 TR ID 기준)
+_priority = contextvars.ContextVar('kis_priority', default=None)
+
+
+def _should_retry(method, status, text):
+    """kis_transport.Transport._should_retry 와 같은 기준 (호출 한도 초과는 모든 메서드, 그 외 5xx 는 GET 만)"""
+    if status >= 500:
+        try:
+            if json.loads(text).get('msg_cd') in kis_transport.THROTTLE_CODES:
+                return True
+        except ValueError:
+            pass
+    return method == 'GET' and status in kis_transport.RETRY_STATUS
+
+
+class AsyncKIS:
+    def __init__(self, pool_size=10, timeout=10, client=None, retries=3, backoff=0.3):
+        """client: kis_client.KISClient (없으면 kis_auth 전역 환경)"""
+        if aiohttp is None:
+            raise ImportError("main_api_async 사용을 위해 aiohttp 설치가 필요합니다. (pip install aiohttp)")
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.client = client
+        self._session = None
+
+    @property
+    def env(self):
+        return kis.getTREnv() if self.client is None else self.client.env
+
+    @property
+    def is_paper(self):
+        return kis.isPaperTrading() if self.client is None else self.client.is_paper
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60)
+        self._session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    # API 호출 공통 (kis_auth._url_fetch 와 동일한 헤더 / TR ID 처리)
+    async def fetch(self, api_url, ptr_id, tr_cont="", params=None, postFlag=False):
+        url = f"{self.env.my_url}{api_url}"
+        headers = kis._getBaseHeader() if self.client is None else self.client.base_header()
+
+        tr_id = kis._tr_id(ptr_id, self.is_paper)
+        headers["tr_id"] = tr_id
+        headers["custtype"] = "P"
+        headers["tr_cont"] = tr_cont
+
+        method = 'POST' if postFlag else 'GET'
+        for attempt in range(self.retries + 1):
+            if attempt:
+                await asyncio.sleep(self.backoff * (2 ** (attempt - 1)))
+            await self._throttle(tr_id)  # 재전송도 호출 한도에 포함
+            try:
+                status, text = await self._send(method, url, headers, params)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if method != 'GET' or attempt == self.retries:  # 주문 POST 는 재전송하지 않음
+                    raise
+                continue
+            if not _should_retry(method, status, text):
+                break
+
+        if status != 200:
+            print("Error Code : " + str(status) + " | " + text)
+            return None
+        return json.loads(text)
+
+    async def _throttle(self, tr_id):
+        # 스케줄러는 스레드 기반이므로 대기는 별도 스레드에서
+        if self.client is None:
+            await asyncio.to_thread(kis._throttle, tr_id, _priority.get())
+        else:
+            await asyncio.to_thread(self.client.throttle, tr_id, _priority.get())
+
+    async def _send(self, method, url, headers, params):
+        if method == 'POST':
+            req = self._session.post(url, headers=headers, data=json.dumps(params))
+        else:
+            req = self._session.get(url, headers=headers, params=params)
+        async with req as res:
+            return res.status, await res.text()
+
+    async def _fetch_ok(self, api_url, tr_id, params, postFlag=False):
+        body = await self.fetch(api_url, tr_id, "", params, postFlag)
+        if body is None:
+            return None
+        if str(body.get('rt_cd')) != "0":
+            print(f"{body.get('msg_cd')},{body.get('msg1')}")
+            return None
+        return body
+
+    ##############################################################################################
+    # 기본시세
+    ##############################################################################################
+    async def get_overseas_price_quot_price_detail(self, excd="", itm_no=""):
+        params = {"AUTH": "", "EXCD": excd, "SYMB": itm_no}
+        body = await self._fetch_ok('/uapi/overseas-price/v1/quotations/price-detail', "HHDFS76200200", params)
+        return None if body is None else float(body['output']['last'])
+
+    async def get_overseas_price_quot_inquire_time_itemchartprice(self, div="02", excd="", itm_no="", nmin="", pinc="0",
+                                                                  next_value="0", nrec="120", keyb=""):
+        params = {
+            "AUTH": "", "EXCD": excd, "SYMB": itm_no, "NMIN": nmin, "PINC": pinc,
+            "NEXT": next_value, "NREC": nrec, "FILL": "", "KEYB": keyb
+        }
+        body = await self._fetch_ok('/uapi/overseas-price/v1/quotations/inquire-time-itemchartprice', "HHDFS76950200", params)
+        if body is None:
+            return pd.DataFrame()
+        if div == "02":
+            return pd.DataFrame(body['output2'])
+        return pd.DataFrame(body['output1'], index=[0])
+
+    async def get_overseas_price_quot_inquire_daily_chartprice(self, div="N", itm_no="", inqr_strt_dt="", inqr_end_dt="", period="D"):
+        params = {
+            "FID_COND_MRKT_DIV_CODE": div, "FID_INPUT_ISCD": itm_no,
+            "FID_INPUT_DATE_1": inqr_strt_dt, "FID_INPUT_DATE_2": inqr_end_dt, "FID_PERIOD_DIV_CODE": period
+        }
+        body = await self._fetch_ok('/uapi/overseas-price/v1/quotations/inquire-daily-chartprice', "FHKST03030100", params)
+        return pd.DataFrame() if body is None else pd.DataFrame(body['output2'])
+
+    ##############################################################################################
+    # 주문/계좌
+    ##############################################################################################
+    async def get_overseas_order(self, svr, ord_dv="", excg_cd="", itm_no="", qty=0, unpr=0):
+        svr = self.client.svr if self.client is not None else svr
+        if ord_dv not in main_api.ORDER_SLL_TYPE or excg_cd not in main_api.US_ORDER_EXCHANGES:
+            print("매수/매도 구분 또는 해외거래소코드 확인요망!!!")
+            return None
+        if itm_no == "" or qty == 0 or unpr == 0:
+            print("주문종목번호 / 주문수량 / 해외주문단가 확인요망!!!")
+            return None
+
+        tr_id = main_api.ORDER_TR_IDS[(ord_dv, svr)]  # 주문 TR ID / 단가 형식은 main_api 와 공유
+        params = {
+            "CANO": self.env.my_acct,
+            "ACNT_PRDT_CD": self.env.my_prod,
+            "OVRS_EXCG_CD": excg_cd,
+            "PDNO": itm_no,
+            "ORD_DVSN": "00",
+            "ORD_QTY": str(int(qty)),
+            "OVRS_ORD_UNPR": main_api.format_price(unpr),
+            "SLL_TYPE": main_api.ORDER_SLL_TYPE[ord_dv],
+            "ORD_SVR_DVSN_CD": "0"
+        }
+        body = await self._fetch_ok('/uapi/overseas-stock/v1/trading/order', tr_id, params, postFlag=True)
+        return None if body is None else pd.DataFrame(body['output'], index=[0])
+
+    async def get_overseas_inquire_present_balance(self, svr, dv="03", dvsn="01", natn="000", mkt="00", inqr_dvsn="00"):
+        svr = self.client.svr if self.client is not None else svr
+        tr_id = "VTRP6504R" if svr == 'vps' else "CTRP6504R"
+        params = {
+            "CANO": self.env.my_acct,
+            "ACNT_PRDT_CD": self.env.my_prod,
+            "WCRC_FRCR_DVSN_CD": dvsn,
+            "NATN_CD": natn,
+            "TR_MKET_CD": mkt,
+            "INQR_DVSN_CD": inqr_dvsn
+        }
+        body = await self._fetch_ok('/uapi/overseas-stock/v1/trading/inquire-present-balance', tr_id, params)
+        if body is None:
+            return None
+        if dv == "01":
+            return pd.DataFrame(body['output1'])
+        elif dv == "02":
+            return pd.DataFrame(body['output2'])
+        return pd.DataFrame(body['output3'], index=[0])
+
+    async def get_overseas_inquire_balance(self, svr, excg_cd="", crcy_cd="", FK100="", NK100=""):
+        svr = self.client.svr if self.client is not None else svr
+        tr_id = "VTTS3012R" if svr == 'vps' else "TTTS3012R"
+        params = {
+            "CANO": self.env.my_acct,
+            "ACNT_PRDT_CD": self.env.my_prod,
+            "OVRS_EXCG_CD": excg_cd,
+            "TR_CRCY_CD": crcy_cd,
+            "CTX_AREA_FK200": FK100,
+            "CTX_AREA_NK200": NK100
+        }
+        body = await self._fetch_ok('/uapi/overseas-stock/v1/trading/inquire-balance', tr_id, params)
+        return None if body is None else pd.DataFrame(body['output2'], index=[0])
+
+    ##############################################################################################
+    # 과거 분봉 병렬 조회
+    ##############################################################################################
+    async def fetch_minute_range(self, excd, itm_no, start, end, nrec=120, concurrency=4):
+        """[start, end] 구간(뉴욕 현지시각)의 1분봉을 keyb 시간창으로 나눠 동시에 조회"""
+        windows = split_keyb_windows(start, end, nrec)
+        sem = asyncio.Semaphore(concurrency)
+
+        async def one(window_start, window_end, keyb):
+            _priority.set(kis_scheduler.PRIORITY_BACKFILL)
+            async with sem:
+                df = await self.get_overseas_price_quot_inquire_time_itemchartprice(
+                    div="02", excd=excd, itm_no=itm_no, nmin="1", pinc="1", next_value="1", nrec=str(nrec), keyb=keyb
+                )
+            if df.empty:
+                return df
+            df = chart_decoder.decode(df)
+            return df[(df['datetime'] >= window_start) & (df['datetime'] <= window_end)]
+
+        frames = await asyncio.gather(*(one(*w) for w in windows))
+        frames = [f for f in frames if not f.empty]
+        if not frames:
+            return pd.DataFrame(columns=['datetime', 'open', 'high', 'low', 'close', 'volume'])
+        return pd.concat(frames).drop_duplicates(subset='datetime').sort_values('datetime').reset_index(drop=True)
+
+
+def split_keyb_windows(start, end, nrec=120):
+    """거래 분(프리마켓 ~ 애프터마켓) 시각을 nrec 개씩 나눠 (창 시작, 창 끝, keyb) 목록 생성
+
+    keyb 는 창 끝 다음 1분 → 해당 시각 이전 nrec 개 봉이 한 페이지로 조회된다.
+    """
+    minutes = gap_planner.expected_minutes(start, end)  # 휴장일 / 조기 폐장 제외
+
+    windows = []
+    for i in range(0, len(minutes), nrec):
+        chunk = minutes[i:i + nrec]
+        keyb = (chunk[-1] + pd.Timedelta(minutes=1)).strftime('%Y%m%d%H%M%S')
+        windows.append((chunk[0], chunk[-1], keyb))
+    return windows
+
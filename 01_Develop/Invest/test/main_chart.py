@@ -0,0 +1,61 @@
+import matplotlib.pyplot as plt
+import mplfinance as mpf
+import numpy as np
+
+import main_s
+
+
+# 🔹 캔들 차트 렌더링 (main_s.compute_signals 결과를 그리기만 함)
+# - 실시간 모드(1, 2)는 이 모듈을 import 하지 않음 → matplotlib 로딩 / addplot 생성 없음
+#
+#   df = main_s.compute_signals(bars, {'rsi': False})
+#   main_chart.plot_signals(df)
+
+
+def _addplots(df):
+    """df 에 계산되어 있는 지표 컬럼만 addplot 으로 변환"""
+    apds = []
+    if 'MACD' in df.columns:
+        apds.append(mpf.make_addplot(df['MACD'], panel=0, color='purple', secondary_y=True, label='MACD'))
+        apds.append(mpf.make_addplot(df['Signal'], panel=0, color='orange', secondary_y=True, label='Signal'))
+    if 'RSI' in df.columns:
+        apds.append(mpf.make_addplot(df['RSI'], panel=1, color='blue', ylabel='RSI'))
+    if 'UpperBB' in df.columns:
+        apds.append(mpf.make_addplot(df['UpperBB'], color='red', linestyle='dashed'))
+        apds.append(mpf.make_addplot(df['lowerBB'], color='blue', linestyle='dashed'))
+    if 'Hedging_Upper' in df.columns:
+        apds.append(mpf.make_addplot(df['Hedging_Upper'], color='red', linestyle='--', width=1.2))
+        apds.append(mpf.make_addplot(df['Hedging_Lower'], color='red', linestyle='--', width=1.2))
+        apds.append(mpf.make_addplot(df['Hedging_Center'], color='blue', width=1.4))
+    return apds
+
+
+def plot_signals(df, title='Candlestick with Indicators'):
+    """compute_signals 결과 프레임을 캔들 + 지표 + 매수/매도 마커로 표시"""
+    apds = _addplots(df)
+    buy_marker = np.where(df['buy_signal'], df['close'], np.nan)
+    sell_marker = np.where(df['sell_signal'], df['close'], np.nan)
+    apds.append(mpf.make_addplot(buy_marker, scatter=True, marker='^', color='green', markersize=100))
+    apds.append(mpf.make_addplot(sell_marker, scatter=True, marker='v', color='red', markersize=100))
+
+    fig, axes = mpf.plot(
+        df, type='candle', volume=True, style='charles',
+        title=title, ylabel='Price', ylabel_lower='Volume',
+        addplot=apds, figsize=(14, 8), returnfig=True
+    )
+    ax_price = axes[0]
+    handles, labels = ax_price.get_legend_handles_labels()
+    ax_price.legend(handles, labels, loc="upper left", bbox_to_anchor=(1.1, 1))
+    plt.show()
+    return fig
+
+
+def plot_candlestick(df, show_rsi=True, show_macd=True, show_bollinger=True, show_volume=True,
+                     show_hedging_band=True, mode=3):
+    """기존 main_s.plot_candlestick 과 같은 동작: 시그널 계산 후 mode 3 일 때만 차트 표시"""
+    df = main_s.compute_signals(df, {
+        'macd': show_macd, 'rsi': show_rsi, 'bollinger': show_bollinger, 'hedging_band': show_hedging_band,
+    })
+    if mode == 3:
+        plot_signals(df)
+    return df
@@ -1,93 +1,120 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import mplfinance as mpf
 from pytz import timezone
 
+import market_calendar
 
-def is_regular_trading_hours(time):
-    """미국 정규장 시간인지 확인"""
-    ny_time = time.tz_convert('America/New_York')
-    return pd.Timestamp("09:30").time() <= ny_time.time() <= pd.Timestamp("16:00").time()
 
+# 🔹 정규장 시간 (뉴욕 기준, 양 끝 포함 / 휴장일 · 조기 폐장은 market_calendar 기준)
+RTH_OPEN = market_calendar.OPEN
+RTH_CLOSE = market_calendar.CLOSE
+FORCED_EXIT_MINUTES = 10  # 폐장 N분 전부터 강제 청산 (조기 폐장일은 12:50)
 
-def apply_macd(df):
-    """MACD 시그널 생성"""
-    short_ema = df['close'].ewm(span=12, adjust=False).mean()
-    long_ema = df['close'].ewm(span=26, adjust=False).mean()
-    df['MACD'] = short_ema - long_ema
-    df['Signal'] = df['MACD'].ewm(span=3, adjust=False).mean()
 
-    highest_price = 0
-    holding = False
-    last_trading_time = pd.Timestamp("15:50", tz="America/New_York").time()
+def is_regular_trading_hours(time):
+    """미국 정규장 시간인지 확인 (단일 시각)"""
+    return market_calendar.is_regular(time)
 
-    for i in range(1, len(df)):
-        current_price = df['close'].iloc[i]
-        current_time = df.index[i]
-        ny_time = current_time.tz_convert('America/New_York')
 
-        if not is_regular_trading_hours(current_time):
-            continue
+def is_last_trading_window(time):
+    """폐장 FORCED_EXIT_MINUTES 분 전 이후인지 (단일 시각)"""
+    left = market_calendar.minutes_left(time)
+    return left is not None and left <= FORCED_EXIT_MINUTES
 
-        if df['MACD'].iloc[i-1] < df['Signal'].iloc[i-1] and df['MACD'].iloc[i] > df['Signal'].iloc[i]:
-            df.at[df.index[i], 'buy_signal'] = True
-            highest_price = current_price
-            holding = True
 
-        elif df['MACD'].iloc[i-1] > df['Signal'].iloc[i-1] and df['MACD'].iloc[i] < df['Signal'].iloc[i]:
-            df.at[df.index[i], 'sell_signal'] = True
-            holding = False
+def regular_hours_mask(index):
+    """DatetimeIndex 전체의 정규장 여부를 한 번에 계산 (is_regular_trading_hours 의 벡터 버전)"""
+    return market_calendar.regular_hours_mask(index)
 
-        elif holding and ny_time.time() >= last_trading_time and not df['sell_signal'].any():
-            df.at[df.index[i], 'sell_signal'] = True
-            holding = False
 
-        if holding:
-            highest_price = max(highest_price, current_price)
+def apply_macd(df, fast=12, slow=26, signal_span=3):
+    """MACD 시그널 생성 (기본값: 12 / 26 / 3)
+
+    교차 판정은 한 칸 민 배열 비교로, 보유 상태와 15:50 강제 청산은 누적합 한 번으로 계산한다.
+    (기존 행 단위 루프와 buy_signal / sell_signal 결과가 동일)
+    """
+    short_ema = df['close'].ewm(span=fast, adjust=False).mean()
+    long_ema = df['close'].ewm(span=slow, adjust=False).mean()
+    df['MACD'] = short_ema - long_ema
+    df['Signal'] = df['MACD'].ewm(span=signal_span, adjust=False).mean()
+
+    n = len(df)
+    if n < 2:
+        return df
+
+    macd = df['MACD'].to_numpy(dtype=float)
+    signal = df['Signal'].to_numpy(dtype=float)
+    rth = market_calendar.regular_hours_mask(df.index)
+
+    buy = np.zeros(n, dtype=bool)
+    sell = np.zeros(n, dtype=bool)
+
+    # 골든/데드 크로스 (i-1 → i), 정규장 봉만 대상
+    buy[1:] = rth[1:] & (macd[:-1] < signal[:-1]) & (macd[1:] > signal[1:])
+    sell[1:] = rth[1:] & ~buy[1:] & (macd[:-1] > signal[:-1]) & (macd[1:] < signal[1:])
+
+    # 폐장 10분 전(15:50, 조기 폐장일 12:50) 이후 강제 청산: 매수 이후 한 번도 매도 신호가 없었던 첫 봉에서만 발생
+    # (기존 루프의 `not df['sell_signal'].any()` 조건과 동일 → 최대 1회)
+    already_sold = 'sell_signal' in df.columns and bool(df['sell_signal'].any())
+    if not already_sold:
+        buys_before = np.cumsum(buy) - buy
+        sells_before = np.cumsum(sell) - sell
+        late = rth & ~buy & ~sell & (market_calendar.minutes_to_close(df.index) <= FORCED_EXIT_MINUTES)
+        late[0] = False
+        forced = np.flatnonzero(late & (buys_before > 0) & (sells_before == 0))
+        if len(forced):
+            sell[forced[0]] = True
+
+    if buy.any():
+        df.loc[buy, 'buy_signal'] = True
+    if sell.any():
+        df.loc[sell, 'sell_signal'] = True
 
     return df
 
 
-def apply_rsi(df):
-    """RSI 시그널 생성"""
+def apply_rsi(df, window=14, lower=20, upper=80):
+    """RSI 시그널 생성 (lower 이하 매수, upper 이상 매도)"""
     delta = df['close'].diff()
-    gain = delta.where(delta > 0, 0).rolling(window=14).mean()
-    loss = -delta.where(delta < 0, 0).rolling(window=14).mean()
+    gain = delta.where(delta > 0, 0).rolling(window=window).mean()
+    loss = -delta.where(delta < 0, 0).rolling(window=window).mean()
     rs = gain / loss
     df['RSI'] = 100 - (100 / (1 + rs))
 
-    for i in range(len(df)):
-        if df['RSI'].iloc[i] <= 20 and is_regular_trading_hours(df.index[i]):
-            df.at[df.index[i], 'buy_signal'] = True
-        elif df['RSI'].iloc[i] >= 80 and is_regular_trading_hours(df.index[i]):
-            df.at[df.index[i], 'sell_signal'] = True
+    rsi = df['RSI'].to_numpy(dtype=float)
+    rth = market_calendar.regular_hours_mask(df.index)
+    buy = rth & (rsi <= lower)
+    sell = rth & ~buy & (rsi >= upper)
+    if buy.any():
+        df.loc[buy, 'buy_signal'] = True
+    if sell.any():
+        df.loc[sell, 'sell_signal'] = True
 
     return df
 
 
-def apply_bollinger(df):
-    """Bollinger Band 계산"""
-    df['MA20'] = df['close'].rolling(window=20).mean()
-    df['UpperBB'] = df['MA20'] + df['close'].rolling(20).std() * 2
-    df['lowerBB'] = df['MA20'] - df['close'].rolling(20).std() * 2
+def apply_bollinger(df, window=20, k=2):
+    """Bollinger Band 계산 (컬럼 이름은 기본값 기준 MA20 유지)"""
+    df['MA20'] = df['close'].rolling(window=window).mean()
+    df['UpperBB'] = df['MA20'] + df['close'].rolling(window).std() * k
+    df['lowerBB'] = df['MA20'] - df['close'].rolling(window).std() * k
     return df
 
 
-def apply_hedging_band(df):
+def apply_hedging_band(df, window=21, atr_window=14, k=2):
     """Hedging Band 계산 (Keltner + Bollinger + Donchian)"""
-    kc_ema = df['close'].ewm(span=21, adjust=False).mean()
-    kc_atr = (df['high'] - df['low']).rolling(window=14).mean()
-    kc_upper = kc_ema + 2 * kc_atr
-    kc_lower = kc_ema - 2 * kc_atr
+    kc_ema = df['close'].ewm(span=window, adjust=False).mean()
+    kc_atr = (df['high'] - df['low']).rolling(window=atr_window).mean()
+    kc_upper = kc_ema + k * kc_atr
+    kc_lower = kc_ema - k * kc_atr
 
-    bb_sma = df['close'].rolling(window=21).mean()
-    bb_std = df['close'].rolling(window=21).std()
-    bb_upper = bb_sma + 2 * bb_std
-    bb_lower = bb_sma - 2 * bb_std
+    bb_sma = df['close'].rolling(window=window).mean()
+    bb_std = df['close'].rolling(window=window).std()
+    bb_upper = bb_sma + k * bb_std
+    bb_lower = bb_sma - k * bb_std
 
-    dc_upper = df['high'].rolling(window=21).max()
-    dc_lower = df['low'].rolling(window=21).min()
+    dc_upper = df['high'].rolling(window=window).max()
+    dc_lower = df['low'].rolling(window=window).min()
 
     df['Hedging_Upper'] = pd.concat([kc_upper, bb_upper, dc_upper], axis=1).max(axis=1)
     df['Hedging_Lower'] = pd.concat([kc_lower, bb_lower, dc_lower], axis=1).min(axis=1)
@@ -96,59 +123,85 @@ def apply_hedging_band(df):
     return df
 
 
-def plot_candlestick(
-    df, 
-    show_rsi=True, 
-    show_macd=True, 
-    show_bollinger=True, 
-    show_volume=True, 
-    show_hedging_band=True, 
-    mode=3
-):
+# 🔹 시그널 파이프라인 설정 (지표 on/off + 파라미터, 기본값은 기존 하드코딩 값)
+SIGNAL_CONFIG = {
+    'macd': True, 'rsi': False, 'bollinger': True, 'hedging_band': True,
+    'macd_fast': 12, 'macd_slow': 26, 'macd_signal': 3,
+    'rsi_window': 14, 'rsi_lower': 20, 'rsi_upper': 80,
+    'bb_window': 20, 'bb_k': 2,
+    'hb_window': 21, 'hb_atr_window': 14, 'hb_k': 2,
+}
+
+
+def prepare_frame(df):
+    """time 컬럼 → 뉴욕 시간 인덱스, OHLCV float 변환, 시그널 컬럼 초기화 (원본은 변경하지 않음)"""
+    df = df.copy()
     df['time'] = pd.to_datetime(df['time'])
     df.set_index('time', inplace=True)
-    df.index = df.index.tz_localize('America/New_York', ambiguous='NaT', nonexistent='shift_forward')
+    if df.index.tz is None:
+        df.index = df.index.tz_localize('America/New_York', ambiguous='NaT', nonexistent='shift_forward')
     df[['open', 'high', 'low', 'close', 'volume']] = df[['open', 'high', 'low', 'close', 'volume']].astype(float)
     df['buy_signal'] = False
     df['sell_signal'] = False
+    return df
 
-    apds = []
-
-    if show_macd:
-        df = apply_macd(df)
-        apds.append(mpf.make_addplot(df['MACD'], panel=0, color='purple', secondary_y=True, label='MACD'))
-        apds.append(mpf.make_addplot(df['Signal'], panel=0, color='orange', secondary_y=True, label='Signal'))
-
-    if show_rsi:
-        df = apply_rsi(df)
-        apds.append(mpf.make_addplot(df['RSI'], panel=1, color='blue', ylabel='RSI'))
-
-    if show_bollinger:
-        df = apply_bollinger(df)
-        apds.append(mpf.make_addplot(df['UpperBB'], color='red', linestyle='dashed'))
-        apds.append(mpf.make_addplot(df['lowerBB'], color='blue', linestyle='dashed'))
-
-    if show_hedging_band:
-        df = apply_hedging_band(df)
-        apds.append(mpf.make_addplot(df['Hedging_Upper'], color='red', linestyle='--', width=1.2))
-        apds.append(mpf.make_addplot(df['Hedging_Lower'], color='red', linestyle='--', width=1.2))
-        apds.append(mpf.make_addplot(df['Hedging_Center'], color='blue', width=1.4))
-
-    df['buy_marker'] = np.where(df['buy_signal'], df['close'], np.nan)
-    df['sell_marker'] = np.where(df['sell_signal'], df['close'], np.nan)
-
-    if mode == 3:
-        apds.append(mpf.make_addplot(df['buy_marker'], scatter=True, marker='^', color='green', markersize=100))
-        apds.append(mpf.make_addplot(df['sell_marker'], scatter=True, marker='v', color='red', markersize=100))
-
-        fig, axes = mpf.plot(
-            df, type='candle', volume=True, style='charles',
-            title='Candlestick with Indicators', ylabel='Price', ylabel_lower='Volume',
-            addplot=apds, figsize=(14, 8), returnfig=True
-        )
-        ax_price = axes[0]
-        handles, labels = ax_price.get_legend_handles_labels()
-        ax_price.legend(handles, labels, loc="upper left", bbox_to_anchor=(1.1, 1))
-        plt.show()
 
+def apply_signals(df, config=None):
+    """prepare_frame 이 끝난 df 에 config 에서 켠 지표 / 시그널 적용"""
+    c = {**SIGNAL_CONFIG, **(config or {})}
+    if c['macd']:
+        df = apply_macd(df, c['macd_fast'], c['macd_slow'], c['macd_signal'])
+    if c['rsi']:
+        df = apply_rsi(df, c['rsi_window'], c['rsi_lower'], c['rsi_upper'])
+    if c['bollinger']:
+        df = apply_bollinger(df, c['bb_window'], c['bb_k'])
+    if c['hedging_band']:
+        df = apply_hedging_band(df, c['hb_window'], c['hb_atr_window'], c['hb_k'])
     return df
+
+
+def compute_signals(df, config=None):
+    """N분봉(time, open, high, low, close, volume) → 지표 + buy_signal / sell_signal 프레임
+
+    matplotlib / mplfinance 를 쓰지 않는 순수 계산 경로 (실시간 모드용).
+    차트는 main_chart.plot_signals 로 따로 그린다.
+    """
+    return apply_signals(prepare_frame(df), config)
+
+
+def closed_bar(df, interval, now):
+    """now(뉴욕 시각) 에 막 마감된 interval 분봉 행 (없으면 None, 행 이름 = 봉 시작 시각)
+
+    인덱스(compute_signals 결과는 뉴욕 tz-aware) 와 now 의 tz 유무가 달라도 뉴욕 현지시각으로 맞춰 비교한다.
+    진행 중인 봉이 같이 있어도 그 앞 봉 기준.
+    """
+    if df.empty:
+        return None
+    times = pd.DatetimeIndex(df['time'] if isinstance(df.index, pd.RangeIndex) else df.index)
+    if times.tz is not None:
+        times = times.tz_convert(market_calendar.NYT).tz_localize(None)
+    target = pd.Timestamp(now).floor('min') - pd.Timedelta(minutes=interval)
+    if target.tzinfo is not None:
+        target = target.tz_convert(market_calendar.NYT).tz_localize(None)
+    mask = times == target
+    if not mask.any():
+        return None
+    return df[mask].iloc[-1]
+
+
+def bar_signal(bar):
+    """봉 한 행의 시그널 → "buy" / "sell" / None"""
+    if bar is None:
+        return None
+    if bar.get('buy_signal', False):
+        return "buy"
+    if bar.get('sell_signal', False):
+        return "sell"
+    return None
+
+
+def plot_candlestick(df, show_rsi=True, show_macd=True, show_bollinger=True, show_volume=True,
+                     show_hedging_band=True, mode=3):
+    """이전 호출부 호환용 (main_chart.plot_candlestick 으로 위임)"""
+    import main_chart
+    return main_chart.plot_candlestick(df, show_rsi, show_macd, show_bollinger, show_volume, show_hedging_band, mode)
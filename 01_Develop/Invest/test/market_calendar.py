@@ -0,0 +1,209 @@
+from datetime import date, datetime, time as dt_time, timedelta
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from pytz import timezone
+
+
+# 🔹 미국 주식시장(NYSE/NASDAQ) 세션 달력
+# - 휴장일: 신정, MLK, 대통령의 날, 성금요일, 메모리얼, 준틴스(2022~), 독립기념일, 노동절, 추수감사절, 성탄절
+#   (토요일 → 금요일, 일요일 → 월요일 대체. 단 신정이 토요일이면 전년도 12/31 은 정상 개장)
+# - 조기 폐장(13:00): 독립기념일 전날, 추수감사절 다음날, 성탄 전야
+# - DST 는 뉴욕 시간으로 변환해서 처리 (UTC 인덱스도 그대로 사용 가능)
+# - regular_hours_mask: DatetimeIndex 전체를 한 번에 판정 (행마다 tz_convert 하지 않음)
+
+NYT = timezone("America/New_York")
+OPEN = dt_time(9, 30)
+CLOSE = dt_time(16, 0)
+EARLY_CLOSE = dt_time(13, 0)
+PREMARKET_OPEN = dt_time(4, 0)
+AFTER_HOURS = timedelta(hours=4)  # 애프터마켓 종료 = 폐장 + 4시간 (16:00 → 20:00, 조기 폐장일 13:00 → 17:00)
+
+# 임시 휴장 (국장일 등)
+SPECIAL_CLOSURES = {date(2018, 12, 5), date(2025, 1, 9)}
+
+_US_PER_MINUTE = 60 * 1_000_000
+
+
+def _us(t):
+    return ((t.hour * 60 + t.minute) * 60 + t.second) * 1_000_000 + t.microsecond
+
+
+def _nth_weekday(year, month, weekday, n):
+    """month 의 n 번째 weekday (n=-1 이면 마지막)"""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _easter(year):
+    """그레고리력 부활절 (Anonymous Gregorian algorithm)"""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month = (h + l - 7 * m + 114) // 31
+    day = (h + l - 7 * m + 114) % 31 + 1
+    return date(year, month, day)
+
+
+def _observed(d):
+    if d.weekday() == 5:
+        return d - timedelta(days=1)
+    if d.weekday() == 6:
+        return d + timedelta(days=1)
+    return d
+
+
+@lru_cache(maxsize=None)
+def holidays(year):
+    """year 의 휴장일 집합"""
+    days = {
+        _nth_weekday(year, 1, 0, 3),              # MLK
+        _nth_weekday(year, 2, 0, 3),              # 대통령의 날
+        _easter(year) - timedelta(days=2),        # 성금요일
+        _nth_weekday(year, 5, 0, -1),             # 메모리얼 데이
+        _observed(date(year, 7, 4)),              # 독립기념일
+        _nth_weekday(year, 9, 0, 1),              # 노동절
+        _nth_weekday(year, 11, 3, 4),             # 추수감사절
+        _observed(date(year, 12, 25)),            # 성탄절
+    }
+    new_year = date(year, 1, 1)
+    if new_year.weekday() != 5:
+        days.add(_observed(new_year))
+    if year >= 2022:
+        days.add(_observed(date(year, 6, 19)))    # 준틴스
+    days |= {d for d in SPECIAL_CLOSURES if d.year == year}
+    return frozenset(days)
+
+
+@lru_cache(maxsize=None)
+def early_closes(year):
+    """year 의 13:00 조기 폐장일 집합"""
+    off = holidays(year)
+    candidates = [
+        date(year, 7, 3),
+        _nth_weekday(year, 11, 3, 4) + timedelta(days=1),
+        date(year, 12, 24),
+    ]
+    return frozenset(d for d in candidates if d.weekday() < 5 and d not in off)
+
+
+def is_trading_day(d):
+    return d.weekday() < 5 and d not in holidays(d.year)
+
+
+def session(d):
+    """d 의 정규장 (개장, 폐장) 뉴욕 시각, 휴장일이면 None"""
+    if not is_trading_day(d):
+        return None
+    close = EARLY_CLOSE if d in early_closes(d.year) else CLOSE
+    return NYT.localize(datetime.combine(d, OPEN)), NYT.localize(datetime.combine(d, close))
+
+
+def extended_session(d):
+    """d 의 프리마켓 시작 ~ 애프터마켓 종료 뉴욕 시각 (KIS 분봉이 나오는 구간), 휴장일이면 None"""
+    bounds = session(d)
+    if bounds is None:
+        return None
+    return NYT.localize(datetime.combine(d, PREMARKET_OPEN)), bounds[1] + AFTER_HOURS
+
+
+def next_trading_day(d):
+    d += timedelta(days=1)
+    while not is_trading_day(d):
+        d += timedelta(days=1)
+    return d
+
+
+def phase(now, preopen_minutes=10):
+    """실시간 루프용 현재 구간: 'preopen' / 'open' / 'closed'(당일 장 마감 후) / 'off'(장 전 · 휴장일)"""
+    now = now.astimezone(NYT) if now.tzinfo else NYT.localize(now)
+    bounds = session(now.date())
+    if bounds is None:
+        return 'off'
+    open_, close = bounds
+    if open_ <= now < close:
+        return 'open'
+    if now >= close:
+        return 'closed'
+    if now >= open_ - timedelta(minutes=preopen_minutes):
+        return 'preopen'
+    return 'off'
+
+
+def _to_ny(ts):
+    ts = pd.Timestamp(ts)
+    return ts.tz_convert(NYT) if ts.tzinfo else ts.tz_localize(NYT)
+
+
+def is_regular(ts):
+    """단일 시각이 정규장(개장 ~ 폐장, 양 끝 포함)인지"""
+    ts = _to_ny(ts)
+    bounds = session(ts.date())
+    return bounds is not None and bounds[0] <= ts <= bounds[1]
+
+
+def minutes_left(ts):
+    """단일 시각 기준 폐장까지 남은 분 (휴장일이면 None)"""
+    ts = _to_ny(ts)
+    bounds = session(ts.date())
+    return None if bounds is None else (bounds[1] - ts).total_seconds() / 60
+
+
+# 벡터 연산 ##############################################################################
+
+def _ny_parts(index):
+    """DatetimeIndex → (뉴욕 기준 날짜 int64[day], 하루 중 경과 마이크로초)"""
+    if index.tz is not None:
+        # tz_convert 는 인덱스 전체에 한 번, 이후는 정수 연산
+        index = index.tz_convert(NYT).tz_localize(None)
+    local = index.to_numpy('datetime64[ns]').view(np.int64)
+    ns_per_day = 86_400 * 1_000_000_000
+    days = local // ns_per_day
+    tod = (local - days * ns_per_day) // 1_000
+    return days, tod
+
+
+def _day_set(years, fn):
+    values = [np.datetime64(d, 'D').astype(np.int64) for y in years for d in fn(int(y))]
+    return np.array(values, dtype=np.int64)
+
+
+def session_close_us(index):
+    """각 시각이 속한 날짜의 폐장 시각 (하루 중 마이크로초), 휴장일 / 주말은 -1"""
+    days, _ = _ny_parts(index)
+    if len(days) == 0:
+        return np.zeros(0, dtype=np.int64)
+    years = np.unique(days.astype('datetime64[D]').astype('datetime64[Y]').astype(np.int64) + 1970)
+    weekday = (days + 3) % 7  # 1970-01-01 은 목요일 → 월요일 = 0
+    closed = (weekday >= 5) | np.isin(days, _day_set(years, holidays))
+    early = np.isin(days, _day_set(years, early_closes))
+    close = np.where(early, _us(EARLY_CLOSE), _us(CLOSE))
+    return np.where(closed, -1, close)
+
+
+def regular_hours_mask(index, include_close=True):
+    """DatetimeIndex 전체의 정규장 여부 (휴장일 · 조기 폐장 · DST 반영)
+
+    include_close=True 면 폐장 시각 봉(16:00 / 13:00)도 포함 (기존 is_regular_trading_hours 와 동일)
+    """
+    _, tod = _ny_parts(index)
+    close = session_close_us(index)
+    after_open = tod >= _us(OPEN)
+    before_close = tod <= close if include_close else tod < close
+    return (close >= 0) & after_open & before_close
+
+
+def minutes_to_close(index):
+    """폐장까지 남은 분 (휴장일은 NaN)"""
+    _, tod = _ny_parts(index)
+    close = session_close_us(index)
+    return np.where(close >= 0, (close - tod) / _US_PER_MINUTE, np.nan)
@@ -0,0 +1,291 @@
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import main_api
+import market_calendar
+
+
+# 🔹 해외주식 주문 관리
+# - 주문 상태: new(전송 전 / 응답 불명) → acked(접수, 주문번호) → partial → filled / cancelled / rejected
+# - 상태가 바뀔 때마다 JSONL 저널에 한 줄 추가, 재시작 시 저널을 다시 읽어 상태 복원
+# - (거래소, 매수/매도) 별 요청 템플릿(TR ID + 계좌 · 고정 파라미터)을 미리 만들어두고
+#   주문 시에는 종목 / 수량 / 단가만 채워 바로 전송 (주문 전 잔고 조회 없음, 1 round trip)
+# - submit() 은 주문 스레드풀에 넘기고 바로 반환 → 시그널 처리 스레드가 응답을 기다리지 않음
+# - 같은 idempotency key 로 다시 submit 하면 새 주문을 내지 않고 기존 주문 반환 (같은 봉 시그널 중복 방지)
+# - 백그라운드에서 get_overseas_inquire_balance(종목별 잔고) 로 체결 수량 대사 → partial / filled
+#   잔고는 미체결 주문이 있는 거래소별로 조회해 합침 (모의투자는 거래소코드별로만 조회됨, ex. SOXL 은 AMEX)
+#   (장 마감 후 남은 미체결은 cancelled, 당일 주문 소멸)
+#
+#   orders = order_manager.OrderManager(kis_client.get('vps'), journal_path='orders.jsonl').start()
+#   order = orders.submit('buy', 'AMS', 'SOXL', qty=1, price=45.67, key='SOXL:buy:2025-03-10 10:15')
+
+NEW, ACKED, PARTIAL, FILLED, CANCELLED, REJECTED = 'new', 'acked', 'partial', 'filled', 'cancelled', 'rejected'
+OPEN_STATES = (NEW, ACKED, PARTIAL)
+
+ORDER_URL = '/uapi/overseas-stock/v1/trading/order'
+CANCEL_URL = '/uapi/overseas-stock/v1/trading/order-rvsecncl'
+CANCEL_TR_IDS = {'my_prod': 'TTTT1004U', 'vps': 'VTTT1004U'}  # 미국 정정취소 주문
+
+# 시세 조회용 거래소코드 → 주문용 거래소코드
+ORDER_EXCHANGES = {'AMS': 'AMEX', 'NAS': 'NASD', 'NYS': 'NYSE', 'BAA': 'AMEX', 'BAQ': 'NASD', 'BAY': 'NYSE'}
+
+
+class Order:
+    __slots__ = ('key', 'side', 'excg', 'symbol', 'qty', 'price', 'state', 'odno', 'filled_qty', 'base_qty',
+                 'created', 'updated', 'ack_ms', 'message')
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return f"Order({self.key} {self.side} {self.symbol} {self.filled_qty or 0}/{self.qty}@{self.price} {self.state})"
+
+
+class OrderManager:
+    def __init__(self, client, journal_path=None, max_workers=2, reconcile_interval=5.0, on_update=None):
+        """client: kis_client.KISClient, on_update(order): 상태 변경 시 호출 (ex. 알림)"""
+        self.client = client
+        self.journal_path = journal_path
+        self.reconcile_interval = reconcile_interval
+        self.on_update = on_update
+        self.orders = {}        # idempotency key → Order
+        self.positions = None   # 최근 대사 결과 {종목: 잔고 수량}
+        self._position_excg = {}  # 종목 → 잔고를 조회한 거래소코드
+        self._futures = {}
+        self._lock = threading.RLock()
+        self._pool = ThreadPoolExecutor(max_workers, thread_name_prefix='kis-order')
+        self._templates = self._build_templates()
+        self._stop = threading.Event()
+        self._thread = None
+        if journal_path:
+            self._replay()
+
+    # 요청 템플릿 ########################################################################
+    def _build_templates(self):
+        env = self.client.env
+        templates = {}
+        for excg in main_api.US_ORDER_EXCHANGES:
+            for side, sll_type in main_api.ORDER_SLL_TYPE.items():
+                templates[(excg, side)] = (main_api.ORDER_TR_IDS[(side, self.client.svr)], {
+                    "CANO": env.my_acct,
+                    "ACNT_PRDT_CD": env.my_prod,
+                    "OVRS_EXCG_CD": excg,
+                    "PDNO": "",
+                    "ORD_DVSN": "00",           # 지정가
+                    "ORD_QTY": "",
+                    "OVRS_ORD_UNPR": "",
+                    "SLL_TYPE": sll_type,
+                    "ORD_SVR_DVSN_CD": "0",
+                })
+        return templates
+
+    # 저널 ##############################################################################
+    def _journal(self, order):
+        if not self.journal_path:
+            return
+        line = json.dumps({'ts': datetime.now().isoformat(timespec='milliseconds'), **order.to_dict()}, ensure_ascii=False)
+        with open(self.journal_path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+
+    def _replay(self):
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # 기록 중 끊긴 마지막 줄
+                record.pop('ts', None)
+                self.orders[record['key']] = Order(**record)
+
+    def _update(self, order, state, **fields):
+        """상태 변경 + 저널 기록, 상태가 바뀌었으면 True (알림은 _notify 로 잠금 밖에서)"""
+        with self._lock:
+            for name, value in fields.items():
+                setattr(order, name, value)
+            changed = order.state != state
+            order.state = state
+            order.updated = time.time()
+            self._journal(order)
+        return changed
+
+    def _notify(self, order):
+        if self.on_update is None:
+            return
+        try:
+            self.on_update(order)
+        except Exception as e:
+            print("❌ 주문 알림 오류:", e)
+
+    # 주문 ##############################################################################
+    def submit(self, side, excd, symbol, qty, price, key=None):
+        """주문을 비동기로 전송하고 Order 를 바로 반환 (같은 key 는 기존 주문 반환)"""
+        excg = ORDER_EXCHANGES.get(excd, excd)
+        if side not in main_api.ORDER_SLL_TYPE or excg not in main_api.US_ORDER_EXCHANGES:
+            raise ValueError(f"매수/매도 구분 또는 해외거래소코드 확인요망: {side} / {excd}")
+        if int(qty) <= 0 or float(price) <= 0:
+            raise ValueError(f"주문수량 / 해외주문단가 확인요망: {qty} / {price}")
+
+        key = key or uuid.uuid4().hex
+        with self._lock:
+            existing = self.orders.get(key)
+            if existing is not None and existing.state != REJECTED:
+                return existing
+            base = None if self.positions is None else self.positions.get(symbol, 0.0)
+            order = Order(key=key, side=side, excg=excg, symbol=symbol, qty=int(qty), price=float(price),
+                          state=NEW, filled_qty=0, base_qty=base, created=time.time())
+            order.updated = order.created
+            self.orders[key] = order
+            self._journal(order)  # 전송 전에 기록 → 재시작해도 같은 key 로 중복 주문 안 함
+            self._futures[key] = self._pool.submit(self._send, order)
+        return order
+
+    def _send(self, order):
+        tr_id, template = self._templates[(order.excg, order.side)]
+        params = {**template, "PDNO": order.symbol, "ORD_QTY": str(order.qty),
+                  "OVRS_ORD_UNPR": main_api.format_price(order.price)}
+        started = time.perf_counter()
+        try:
+            res = self.client.fetch(ORDER_URL, tr_id, "", params, postFlag=True)
+        except Exception as e:
+            res, error = None, str(e)
+        else:
+            error = "HTTP 오류"
+        ack_ms = (time.perf_counter() - started) * 1000
+
+        if res is None:
+            # 브로커 도달 여부를 알 수 없음 → new 유지 (대사에서 체결 확인, 같은 key 재주문 방지)
+            changed = self._update(order, order.state, ack_ms=ack_ms, message=error)
+        elif not res.isOK():
+            changed = self._update(order, REJECTED, ack_ms=ack_ms, message=f"{res.getErrorCode()},{res.getErrorMessage()}")
+        else:
+            # 응답보다 대사가 먼저 체결을 확인했으면 상태는 그대로 두고 주문번호만 기록
+            state = ACKED if order.state == NEW else order.state
+            changed = self._update(order, state, ack_ms=ack_ms, odno=res.getBody().output.get('ODNO'))
+        if changed:
+            self._notify(order)
+        return order
+
+    def wait(self, key, timeout=None):
+        """전송 결과(접수 / 거부)까지 대기"""
+        future = self._futures.get(key)
+        if future is not None:
+            future.result(timeout)
+        return self.orders.get(key)
+
+    def cancel(self, key):
+        """미체결 수량 취소 요청 (접수된 주문만)"""
+        order = self.orders.get(key)
+        if order is None or order.state not in (ACKED, PARTIAL) or not order.odno:
+            return False
+        _, template = self._templates[(order.excg, order.side)]
+        params = {
+            "CANO": template["CANO"],
+            "ACNT_PRDT_CD": template["ACNT_PRDT_CD"],
+            "OVRS_EXCG_CD": order.excg,
+            "PDNO": order.symbol,
+            "ORGN_ODNO": order.odno,            # 원주문번호
+            "RVSE_CNCL_DVSN_CD": "02",          # 01: 정정, 02: 취소
+            "ORD_QTY": str(order.qty - (order.filled_qty or 0)),
+            "OVRS_ORD_UNPR": "0",
+            "ORD_SVR_DVSN_CD": "0",
+        }
+        res = self.client.fetch(CANCEL_URL, CANCEL_TR_IDS[self.client.svr], "", params, postFlag=True)
+        if res is None or not res.isOK():
+            print("❌ 주문 취소 실패:", order.key, None if res is None else res.getErrorMessage())
+            return False
+        if self._update(order, CANCELLED, message="취소"):
+            self._notify(order)
+        return True
+
+    def open_orders(self):
+        with self._lock:
+            return [o for o in self.orders.values() if o.state in OPEN_STATES]
+
+    # 잔고 대사 ##########################################################################
+    def _holdings(self, exchanges):
+        """거래소별 종목 잔고 {종목: (거래소코드, 수량)}, 하나라도 조회 실패면 None"""
+        holdings = {}
+        for excg in sorted(exchanges):
+            df = main_api.get_overseas_inquire_balance(self.client.svr, excg_cd=excg, crcy_cd="USD",
+                                                       client=self.client, output="output1")
+            if df is None:
+                return None
+            for _, row in df.iterrows():
+                holdings[row['ovrs_pdno']] = (excg, float(row['ovrs_cblc_qty']))
+        return holdings
+
+    def reconcile(self):
+        """종목별 잔고 변화로 미체결 주문의 체결 수량 갱신 (같은 종목 / 방향은 먼저 낸 주문부터 배분)"""
+        # 미체결 주문이 있는 거래소만 조회 (없으면 기준점용으로 미국 전체)
+        exchanges = {o.excg for o in self.open_orders()} or set(main_api.US_ORDER_EXCHANGES)
+        holdings = self._holdings(exchanges)
+        if holdings is None:
+            return
+        with self._lock:
+            # 이번에 조회하지 않은 거래소 종목은 이전 잔고 유지
+            positions = {symbol: qty for symbol, qty in (self.positions or {}).items()
+                         if self._position_excg.get(symbol) not in exchanges}
+            for symbol, (excg, qty) in holdings.items():
+                positions[symbol] = qty
+                self._position_excg[symbol] = excg
+        session_over = market_calendar.phase(datetime.now(market_calendar.NYT)) == 'closed'
+
+        changed = []
+        with self._lock:
+            groups = {}
+            for order in sorted(self.open_orders(), key=lambda o: o.created):
+                if order.base_qty is None:
+                    order.base_qty = positions.get(order.symbol, 0.0)  # 첫 대사 시점을 기준으로
+                groups.setdefault((order.symbol, order.side), []).append(order)
+
+            for (symbol, side), orders in groups.items():
+                sign = 1 if side == 'buy' else -1
+                remaining = max(0.0, (positions.get(symbol, 0.0) - orders[0].base_qty) * sign)
+                for order in orders:
+                    filled = int(min(order.qty, remaining))
+                    remaining -= filled
+                    if filled >= order.qty:
+                        state, message = FILLED, order.message
+                    elif session_over:
+                        state, message = CANCELLED, "장 마감 미체결 소멸"
+                    elif filled > (order.filled_qty or 0):
+                        state, message = PARTIAL, order.message
+                    else:
+                        continue
+                    if self._update(order, state, filled_qty=filled, message=message):
+                        changed.append(order)
+            self.positions = positions
+
+        for order in changed:
+            self._notify(order)
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self.positions is None or self.open_orders():
+                try:
+                    self.reconcile()
+                except Exception as e:
+                    print("❌ 주문 대사 오류:", e)
+            self._stop.wait(self.reconcile_interval)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='kis-order-reconcile', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._pool.shutdown(wait=True)
@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+
+import chart_decoder
+
+
+# 🔹 페이지 단위 백필 누적기
+# - 페이지(chart_decoder.decode 결과)를 미리 잡아둔 컬럼 버퍼(time int64 + OHLCV float64)에 이어 붙임
+#   (매 페이지마다 concat → drop_duplicates → sort_values 로 누적 결과 전체를 복사 / 재정렬하지 않음)
+# - 중복은 epoch(ns) 집합으로 걸러냄 (페이지 경계에서 겹치는 봉 / keyb 재조회)
+#   집합은 현재 버퍼 + 직전 flush 분만 유지 (sink 는 upsert 이므로 그 이전 봉과의 중복은 무해, 메모리 일정)
+# - 페이지는 각각 시간순이므로 끝날 때 페이지(run) 순서만 뒤집어 이어 붙이고, 순서가 어긋날 때만 argsort 한 번
+# - sink 를 주면 flush_rows 건이 쌓일 때마다 sink(df) 로 넘기고 버퍼를 비움 → 여러 날 백필도 메모리 일정
+#
+#   acc = page_buffer.PageAccumulator(sink=save_to_db)
+#   for ...: acc.add(chart_decoder.decode(rt_data))
+#   acc.finish()
+
+COLUMNS = chart_decoder.COLUMNS
+VALUES = COLUMNS[1:]
+FLUSH_ROWS = 2400  # sink 로 넘기는 기본 단위 (1분봉 약 6거래일)
+
+
+class PageAccumulator:
+    def __init__(self, capacity=2400, sink=None, flush_rows=FLUSH_ROWS):
+        """capacity: 초기 버퍼 행 수 (부족하면 2배씩 확장), flush_rows: sink 로 넘길 단위"""
+        self.sink = sink
+        self.flush_rows = flush_rows
+        if sink is not None:
+            capacity = min(capacity, self.flush_rows * 2)  # flush 단위 이상은 쌓이지 않음
+        self._times = np.empty(capacity, dtype=np.int64)
+        self._values = np.empty((len(VALUES), capacity), dtype=np.float64)
+        self._size = 0
+        self._runs = []      # 페이지별 (시작, 끝) 버퍼 위치
+        self._seen = set()   # 버퍼 + 직전 flush 봉 시각
+        self.total = 0       # 중복 제외 누적 건수
+        self.flushed = 0     # sink 로 넘긴 건수
+
+    def __len__(self):
+        return self._size
+
+    def _reserve(self, n):
+        capacity = len(self._times)
+        if self._size + n <= capacity:
+            return
+        while capacity < self._size + n:
+            capacity *= 2
+        times = np.empty(capacity, dtype=np.int64)
+        values = np.empty((len(VALUES), capacity), dtype=np.float64)
+        times[:self._size] = self._times[:self._size]
+        values[:, :self._size] = self._values[:, :self._size]
+        self._times, self._values = times, values
+
+    def add(self, page):
+        """시간순 페이지 추가 → 새로 추가된(중복 제외) 건수"""
+        if page is None or page.empty:
+            return 0
+        times = page['datetime'].to_numpy('datetime64[ns]').view(np.int64)
+        seen = self._seen
+        keep = np.fromiter((t not in seen for t in times.tolist()), dtype=bool, count=len(times))
+        if len(times) > 1:
+            keep[1:] &= times[1:] != times[:-1]  # 페이지 안의 연속 중복
+        n = int(keep.sum())
+        if n == 0:
+            return 0
+
+        self._reserve(n)
+        start, end = self._size, self._size + n
+        self._times[start:end] = times[keep]
+        for i, col in enumerate(VALUES):
+            self._values[i, start:end] = page[col].to_numpy(np.float64)[keep]
+        seen.update(self._times[start:end].tolist())
+        self._runs.append((start, end))
+        self._size = end
+        self.total += n
+
+        if self.sink is not None and self._size >= self.flush_rows:
+            self.flush()
+        return n
+
+    def frame(self):
+        """버퍼에 남아 있는 봉 → 시간순 DataFrame"""
+        if self._size == 0:
+            return chart_decoder.empty()
+        # 과거 방향 페이징이면 run 을 역순으로 잇기만 하면 정렬 완료
+        order = np.concatenate([np.arange(s, e) for s, e in reversed(self._runs)])
+        times = self._times[order]
+        if len(times) > 1 and not np.all(times[:-1] < times[1:]):
+            order = np.argsort(self._times[:self._size], kind='stable')
+            times = self._times[order]
+        columns = {'datetime': times.view('datetime64[ns]')}
+        for i, col in enumerate(VALUES):
+            columns[col] = self._values[i, order]
+        return pd.DataFrame(columns)
+
+    def flush(self):
+        """버퍼 내용을 sink 로 넘기고 비움"""
+        if self._size == 0 or self.sink is None:
+            return
+        df = self.frame()
+        self.sink(df)
+        self.flushed += len(df)
+        self._seen = set(self._times[:self._size].tolist())  # 직전 flush 분만 남김 (다음 페이지와 경계 중복)
+        self._size = 0
+        self._runs = []
+
+    def finish(self):
+        """sink 가 있으면 남은 봉을 넘기고 넘긴 총 건수, 없으면 전체 결과 DataFrame"""
+        if self.sink is not None:
+            self.flush()
+            return self.flushed
+        return self.frame()
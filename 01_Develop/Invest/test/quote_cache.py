@@ -0,0 +1,160 @@
+import threading
+import time
+from collections import OrderedDict
+
+import kis_auth as kis
+import main_api
+
+
+# 🔹 시세 / 잔고 조회 read-through 캐시
+# - 엔드포인트별 TTL (현재가 1초, 잔고 2초 ...) 안에 같은 인자로 다시 부르면 API 호출 없이 직전 결과
+# - 같은 키를 여러 스레드가 동시에 조회하면 HTTP 호출은 1번, 나머지는 그 결과를 같이 받음 (in-flight coalescing)
+# - 전체 maxsize 건을 넘으면 가장 오래 안 쓴 항목부터 제거 (LRU)
+# - 실패(None) 결과는 캐시하지 않음, 주문 후에는 invalidate() 로 잔고 캐시 비움
+# - 반환되는 DataFrame 은 캐시와 같은 객체이므로 읽기 전용으로 사용
+#
+#   last = quote_cache.price_detail("AMS", "SOXL")
+#   quote_cache.stats()  # {'price_detail': {'hits': .., 'misses': .., 'coalesced': .., 'hit_rate': ..}, ...}
+
+DEFAULT_TTLS = {
+    'price_detail': 1.0,        # 현재가상세
+    'present_balance': 2.0,     # 체결기준현재잔고
+    'balance': 2.0,             # 잔고
+    'psamount': 2.0,            # 매수가능금액
+}
+
+
+class _Flight:
+    __slots__ = ('done', 'value', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class QuoteCache:
+    def __init__(self, ttls=None, maxsize=256):
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.maxsize = maxsize
+        self._entries = OrderedDict()   # (endpoint, key) → (만료 monotonic, 값)
+        self._flights = {}              # (endpoint, key) → _Flight
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def _stat(self, endpoint):
+        stat = self._stats.get(endpoint)
+        if stat is None:
+            stat = self._stats[endpoint] = {'hits': 0, 'misses': 0, 'coalesced': 0, 'evictions': 0}
+        return stat
+
+    def get(self, endpoint, key, loader):
+        """캐시에 유효한 값이 있으면 반환, 없으면 loader() 1번 호출 (동시 호출은 결과 공유)"""
+        full_key = (endpoint, key)
+        with self._lock:
+            stat = self._stat(endpoint)
+            entry = self._entries.get(full_key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(full_key)
+                    stat['hits'] += 1
+                    return entry[1]
+                del self._entries[full_key]
+
+            flight = self._flights.get(full_key)
+            if flight is not None:
+                stat['coalesced'] += 1
+                owner = False
+            else:
+                flight = self._flights[full_key] = _Flight()
+                stat['misses'] += 1
+                owner = True
+
+        if not owner:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[full_key]
+                if flight.error is None and flight.value is not None:
+                    self._put(full_key, flight.value)
+            flight.done.set()
+        return flight.value
+
+    def _put(self, full_key, value):
+        self._entries[full_key] = (time.monotonic() + self.ttls.get(full_key[0], 1.0), value)
+        self._entries.move_to_end(full_key)
+        while len(self._entries) > self.maxsize:
+            evicted, _ = self._entries.popitem(last=False)
+            self._stat(evicted[0])['evictions'] += 1
+
+    def invalidate(self, endpoint=None):
+        """endpoint 캐시 비움 (None 이면 전체, 이름 일부로 지정 → 'balance' 는 present_balance / balance 모두)"""
+        with self._lock:
+            for full_key in [k for k in self._entries if endpoint is None or endpoint in k[0]]:
+                del self._entries[full_key]
+
+    def stats(self):
+        with self._lock:
+            result = {}
+            for endpoint, stat in self._stats.items():
+                total = stat['hits'] + stat['misses'] + stat['coalesced']
+                result[endpoint] = {**stat, 'hit_rate': (stat['hits'] + stat['coalesced']) / total if total else 0.0}
+            return result
+
+
+_cache = QuoteCache()
+
+
+def configure(ttls=None, maxsize=None):
+    """config.yaml 의 quote_cache_ttl 등으로 TTL / 크기 변경"""
+    if ttls:
+        _cache.ttls.update(ttls)
+    if maxsize:
+        _cache.maxsize = maxsize
+
+
+def invalidate(endpoint=None):
+    _cache.invalidate(endpoint)
+
+
+def stats():
+    return _cache.stats()
+
+
+def _client_key(client):
+    if client is None:
+        return ('global', kis.isPaperTrading())  # kis_auth 전역 환경
+    return (client.svr, client.env.my_acct, client.env.my_prod)
+
+
+# main_api 래퍼 (인자 · 클라이언트가 같으면 같은 캐시 항목) ###########################
+
+def price_detail(excd="", itm_no="", client=None):
+    return _cache.get('price_detail', (_client_key(client), excd, itm_no),
+                      lambda: main_api.get_overseas_price_quot_price_detail(excd=excd, itm_no=itm_no, client=client))
+
+
+def present_balance(svr, dv="03", dvsn="01", natn="000", mkt="00", inqr_dvsn="00", client=None):
+    return _cache.get('present_balance', (_client_key(client), svr, dv, dvsn, natn, mkt, inqr_dvsn),
+                      lambda: main_api.get_overseas_inquire_present_balance(
+                          svr, dv=dv, dvsn=dvsn, natn=natn, mkt=mkt, inqr_dvsn=inqr_dvsn, client=client))
+
+
+def inquire_balance(svr, excg_cd="", crcy_cd="", client=None):
+    return _cache.get('balance', (_client_key(client), svr, excg_cd, crcy_cd),
+                      lambda: main_api.get_overseas_inquire_balance(svr, excg_cd=excg_cd, crcy_cd=crcy_cd, client=client))
+
+
+def psamount(svr, dv="03", dvsn="01", natn="000", mkt="00", inqr_dvsn="00", client=None):
+    return _cache.get('psamount', (_client_key(client), svr, dv, dvsn, natn, mkt, inqr_dvsn),
+                      lambda: main_api.get_overseas_inquire_psamount(
+                          svr, dv=dv, dvsn=dvsn, natn=natn, mkt=mkt, inqr_dvsn=inqr_dvsn, client=client))
@@ -0,0 +1,221 @@
+import itertools
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+import backtest
+
+
+# 🔹 파라미터 스윕 (MACD / RSI 설정 그리드 · 랜덤 탐색)
+# - 1분봉은 부모 프로세스가 공유 메모리 한 블록에 (time int64 + OHLCV float64) 로 올리고
+#   워커는 이름으로 붙어서 읽기만 함 (DataFrame pickle 전송 없음)
+# - 워커별로 interval 마다 한 번만 resample, 조합마다 시그널 + 시뮬레이션만 다시 계산
+# - 결과는 DuckDB sweep_results 테이블에 (sweep_id, run_id) 단위로 저장
+# - 볼린저밴드 / 헤징밴드는 매매 시그널이 아닌 차트용 지표라 스윕 대상에서 제외 (MACD / RSI 만)
+#
+#   params = sweep.grid(macd_fast=[8, 12], macd_slow=[21, 26], interval=[5, 15])
+#   results = sweep.run_sweep(df_minute, params, max_workers=8)
+#   sweep.save_results(con, results)
+
+PARAM_COLUMNS = ['interval', 'use_macd', 'use_rsi'] + list(backtest.DEFAULT_PARAMS)
+STAT_COLUMNS = ['total_return', 'max_drawdown', 'sharpe', 'trades', 'win_rate', 'avg_trade_return', 'turnover', 'exposure']
+OHLCV = ['open', 'high', 'low', 'close', 'volume']
+DEFAULTS = {'interval': 15, 'use_macd': True, 'use_rsi': False, **backtest.DEFAULT_PARAMS}
+
+
+def _valid(p):
+    return p['macd_fast'] < p['macd_slow'] and p['rsi_lower'] < p['rsi_upper']
+
+
+def grid(**space):
+    """키별 후보 리스트의 모든 조합 (지정하지 않은 키는 기본값, fast >= slow 같은 조합은 제외)"""
+    keys = list(space)
+    combos = ({**DEFAULTS, **dict(zip(keys, values))} for values in itertools.product(*space.values()))
+    return [p for p in combos if _valid(p)]
+
+
+def random_search(n, seed=None, **space):
+    """키별 후보 리스트에서 n 개 조합 무작위 추출 (중복 제외)"""
+    rng = random.Random(seed)
+    keys = list(space)
+    seen, result = set(), []
+    attempts = 0
+    while len(result) < n and attempts < n * 20:
+        attempts += 1
+        p = {**DEFAULTS, **{k: rng.choice(space[k]) for k in keys}}
+        key = tuple(p[k] for k in PARAM_COLUMNS)
+        if key in seen or not _valid(p):
+            continue
+        seen.add(key)
+        result.append(p)
+    return result
+
+
+# 공유 메모리 ###########################################################################
+
+class SharedBars:
+    """1분봉을 공유 메모리에 올려두는 부모 쪽 핸들 (with 블록 종료 시 해제)"""
+
+    def __init__(self, df_minute):
+        time_col = 'time' if 'time' in df_minute.columns else 'datetime'
+        times = pd.to_datetime(df_minute[time_col])
+        if times.dt.tz is not None:
+            times = times.dt.tz_convert('America/New_York').dt.tz_localize(None)
+
+        n = len(df_minute)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(n * 6 * 8, 1))
+        t, ohlcv = _views(self.shm.buf, n)
+        t[:] = times.to_numpy('datetime64[ns]').view(np.int64)
+        ohlcv[:] = df_minute[OHLCV].to_numpy(float).T
+        self.spec = (self.shm.name, n)
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _views(buf, n):
+    t = np.ndarray((n,), dtype=np.int64, buffer=buf)
+    ohlcv = np.ndarray((5, n), dtype=np.float64, buffer=buf, offset=n * 8)
+    return t, ohlcv
+
+
+def _attach(name):
+    """워커에서 공유 메모리 연결 (해제는 부모 SharedBars.close 에서만)"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13: 워커는 부모의 resource_tracker 를 같이 쓰므로 그대로 연결
+        return shared_memory.SharedMemory(name=name)
+
+
+# 워커 #################################################################################
+
+_worker = {}
+
+
+def _init_worker(spec):
+    name, n = spec
+    shm = _attach(name)
+    t, ohlcv = _views(shm.buf, n)
+    frame = pd.DataFrame(dict(zip(OHLCV, ohlcv)))
+    frame.insert(0, 'time', t.view('datetime64[ns]'))
+    _worker.update(shm=shm, minute=frame, bars={})
+
+
+def _bars(interval):
+    cache = _worker['bars']
+    if interval not in cache:
+        minute = _worker['minute']
+        cache[interval] = backtest.prepare(backtest.resample(minute, interval) if interval > 1 else minute)
+    return cache[interval]
+
+
+def evaluate(p, slippage_bps=5.0, commission_bps=2.5):
+    """파라미터 한 조합 백테스트 → 파라미터 + 통계 dict"""
+    bars = _bars(p['interval']).copy()
+    signal_params = {k: p[k] for k in backtest.DEFAULT_PARAMS}
+    bars = backtest.apply_signals(bars, use_macd=p['use_macd'], use_rsi=p['use_rsi'], **signal_params)
+    curve, trades = backtest.simulate(bars, slippage_bps, commission_bps)
+    stats = backtest.summarize(curve, trades, p['interval'])
+    return {**{k: p[k] for k in PARAM_COLUMNS}, **{k: float(stats[k]) for k in STAT_COLUMNS}}
+
+
+def _evaluate_chunk(chunk, slippage_bps, commission_bps):
+    return [evaluate(p, slippage_bps, commission_bps) for p in chunk]
+
+
+def _chunks(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def run_sweep(df_minute, params_list, max_workers=None, slippage_bps=5.0, commission_bps=2.5):
+    """params_list 전체를 프로세스 풀에서 평가 (결과 DataFrame, sharpe 내림차순)"""
+    started = time.perf_counter()
+    max_workers = max_workers or os.cpu_count() or 1
+    # 같은 interval 끼리 묶어야 워커 resample 캐시 재사용이 잘 됨
+    params_list = sorted(params_list, key=lambda p: p['interval'])
+    chunk_size = max(1, len(params_list) // (max_workers * 4))
+
+    rows = []
+    with SharedBars(df_minute) as shared:
+        with ProcessPoolExecutor(max_workers, initializer=_init_worker, initargs=(shared.spec,)) as pool:
+            chunks = _chunks(params_list, chunk_size)
+            for result in pool.map(_evaluate_chunk, chunks, [slippage_bps] * len(chunks), [commission_bps] * len(chunks)):
+                rows.extend(result)
+
+    elapsed = time.perf_counter() - started
+    print(f"🔁 스윕 완료: {len(rows)}개 조합, {max_workers} 프로세스, {elapsed:.1f}초")
+    df = pd.DataFrame(rows, columns=PARAM_COLUMNS + STAT_COLUMNS)
+    return df.sort_values('sharpe', ascending=False, ignore_index=True)
+
+
+# 결과 저장 (DuckDB) ###################################################################
+
+def init_schema(con):
+    con.execute("""
+    CREATE TABLE IF NOT EXISTS sweep_results (
+        sweep_id VARCHAR,
+        run_id INTEGER,
+        created_at TIMESTAMP,
+        interval INTEGER,
+        use_macd BOOLEAN,
+        use_rsi BOOLEAN,
+        macd_fast INTEGER,
+        macd_slow INTEGER,
+        macd_signal INTEGER,
+        rsi_window INTEGER,
+        rsi_lower DOUBLE,
+        rsi_upper DOUBLE,
+        total_return DOUBLE,
+        max_drawdown DOUBLE,
+        sharpe DOUBLE,
+        trades INTEGER,
+        win_rate DOUBLE,
+        avg_trade_return DOUBLE,
+        turnover DOUBLE,
+        exposure DOUBLE,
+        PRIMARY KEY (sweep_id, run_id)
+    )
+    """)
+
+
+def save_results(con, results, sweep_id=None):
+    """run_sweep 결과를 sweep_results 에 저장, sweep_id 반환"""
+    init_schema(con)
+    sweep_id = sweep_id or datetime.now().strftime('%Y%m%d_%H%M%S')
+    frame = results[PARAM_COLUMNS + STAT_COLUMNS].copy()
+    frame.insert(0, 'created_at', datetime.now())
+    frame.insert(0, 'run_id', np.arange(len(frame), dtype=np.int32))
+    frame.insert(0, 'sweep_id', sweep_id)
+
+    con.register('_sweep_rows', frame)
+    try:
+        cols = ', '.join(frame.columns)
+        con.execute(f"INSERT OR REPLACE INTO sweep_results ({cols}) SELECT {cols} FROM _sweep_rows")
+    finally:
+        con.unregister('_sweep_rows')
+    return sweep_id
+
+
+def top_results(con, sweep_id=None, order_by='sharpe', limit=10):
+    """저장된 스윕 결과 상위 조합 (sweep_id 미지정 시 가장 최근 스윕, order_by 는 STAT_COLUMNS 중 하나)"""
+    if order_by not in STAT_COLUMNS:
+        raise ValueError(f"정렬 기준 확인요망: {order_by} (가능: {', '.join(STAT_COLUMNS)})")
+    if sweep_id is None:
+        sweep_id = con.execute("SELECT sweep_id FROM sweep_results ORDER BY created_at DESC LIMIT 1").fetchone()[0]
+    return con.execute(f"""
+        SELECT * FROM sweep_results WHERE sweep_id = ?
+        ORDER BY {order_by} DESC LIMIT {int(limit)}
+    """, [sweep_id]).df()
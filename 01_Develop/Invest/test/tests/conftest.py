@@ -0,0 +1,35 @@
+import os
+import sys
+import tempfile
+
+# 🔹 테스트 공통 설정
+# - 테스트 대상 모듈(상위 폴더)을 import 경로에 추가
+# - kis_auth 는 import 시 현재 폴더의 config\config.yaml 을 읽고 토큰 파일 경로를 정한다
+#   → 임시 폴더에 테스트용 설정을 두고 그 폴더에서 먼저 import (실제 앱키 / 토큰 파일을 건드리지 않음)
+#   URL 은 로컬 주소이므로 실제 API 는 호출되지 않음 (네트워크가 필요한 테스트는 kis_simulator 사용)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TEST_CONFIG = """\
+my_app: TEST_APP
+my_sec: TEST_SEC
+my_acct: "12345678"
+my_prod: "01"
+my_url: http://127.0.0.1:9
+paper_app: TEST_PAPER_APP
+paper_sec: TEST_PAPER_SEC
+paper_url: http://127.0.0.1:9
+my_paper_stock: "87654321"
+my_agent: pytest
+"""
+
+_work = tempfile.mkdtemp(prefix='kis-test-')
+os.makedirs(os.path.join(_work, 'config'), exist_ok=True)
+with open(_work + '\\config\\config.yaml', 'w', encoding='utf-8') as f:  # kis_auth 와 같은 경로 조합
+    f.write(TEST_CONFIG)
+_cwd = os.getcwd()
+os.chdir(_work)
+try:
+    import kis_auth  # noqa: F401  이후 import 는 이 모듈을 그대로 사용
+finally:
+    os.chdir(_cwd)
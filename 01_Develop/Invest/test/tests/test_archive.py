@@ -0,0 +1,64 @@
+from datetime import date
+
+import duckdb
+import pandas as pd
+
+import archive
+import bar_store
+import gap_planner
+
+
+def _con(days):
+    con = duckdb.connect()
+    con.execute("CREATE TABLE SOXL_minute_data (time TIMESTAMP PRIMARY KEY, open DOUBLE, high DOUBLE, low DOUBLE,"
+                " close DOUBLE, volume DOUBLE)")
+    con.execute("CREATE TABLE minute_bars (symbol VARCHAR, excd VARCHAR, time TIMESTAMP, open DOUBLE, high DOUBLE,"
+                " low DOUBLE, close DOUBLE, volume DOUBLE, PRIMARY KEY (symbol, time))")
+    for d in days:
+        for minute in ('04:00', '09:30', '19:59'):
+            t = pd.Timestamp(f'{d} {minute}').to_pydatetime()
+            con.execute("INSERT INTO SOXL_minute_data VALUES (?, 1, 1, 1, 1, 1)", [t])
+            con.execute("INSERT INTO minute_bars VALUES ('TQQQ', 'NAS', ?, 2, 2, 2, 2, 2)", [t])
+    return con
+
+
+def test_archive_keeps_gap_scan_window_hot(tmp_path):
+    # 2024-12-25 휴장 + 주말 → 5거래일 전은 달력 기준 7일보다 이전
+    days = ['2024-12-16', '2024-12-17', '2024-12-18', '2024-12-19', '2024-12-20', '2024-12-23', '2024-12-24',
+            '2024-12-26', '2024-12-27', '2024-12-30']
+    today = date(2024, 12, 31)
+    con, root = _con(days), str(tmp_path)
+    start = gap_planner.scan_start(today, 5)
+    assert start.date() == date(2024, 12, 23) and start.date() < archive.cutoff(today, keep_days=7)
+
+    archive.archive_closed_days(con, root, today=today, lookback_days=5)
+    archive.archive_closed_days(con, root, table='minute_bars', symbol=None, today=today, lookback_days=5)
+    archive.create_history_view(con, root, watch_table='minute_bars')
+
+    # 누락 탐지 구간의 분봉은 모두 hot 테이블에 남아 있음 (다시 받지 않음)
+    end = pd.Timestamp('2024-12-30 19:59')
+    for table, symbol in (('SOXL_minute_data', None), ('minute_bars', 'TQQQ')):
+        stored = gap_planner.stored_times_duckdb(con, start, end, table=table, symbol=symbol)
+        assert len(stored) == 3 * 5, table
+    assert con.execute("SELECT MIN(time) FROM minute_bars").fetchone()[0] == start.to_pydatetime()
+
+    # 보관분 + hot 테이블 통합 뷰에는 감시 종목까지 전부 있음
+    for symbol, price in (('SOXL', 1), ('TQQQ', 2)):
+        df = archive.read_history(con, symbol, '2024-12-16', '2024-12-30 23:59')
+        assert len(df) == 3 * len(days) and (df['close'] == price).all()
+    assert (tmp_path / 'symbol=TQQQ' / 'date=2024-12-20' / 'bars.parquet').exists()
+
+
+def test_backfill_into_archived_day_keeps_aggregated_bars(tmp_path):
+    con, root = _con(['2024-12-20', '2024-12-23']), str(tmp_path)
+    bar_store.init_duckdb(con)
+    daily = lambda: con.execute("SELECT time, volume FROM bars_1d ORDER BY time").fetchall()
+    before = daily()
+    archive.archive_closed_days(con, root, today=date(2024, 12, 23), keep_days=0)
+    assert archive.last_archived_day(root) == date(2024, 12, 20)
+
+    # 보관된 날짜에 1분봉 하나를 늦게 채움 → 그 날짜의 봉은 다시 집계하지 않음
+    t = pd.Timestamp('2024-12-20 12:00').to_pydatetime()
+    con.execute("INSERT INTO SOXL_minute_data VALUES (?, 1, 1, 1, 1, 1)", [t])
+    bar_store.refresh_duckdb(con, t, not_before=archive.last_archived_day(root) + pd.Timedelta(days=1))
+    assert daily() == before
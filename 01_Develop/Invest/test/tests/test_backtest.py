@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import backtest
+
+
+def test_empty_range_gives_zero_stats():
+    df = pd.DataFrame({'time': pd.to_datetime([]), 'open': [], 'high': [], 'low': [], 'close': [], 'volume': []})
+    stats = backtest.run(df, interval=15)['stats']
+    assert stats['bars'] == 0 and stats['start'] is None
+    assert all(stats[k] == 0 for k in ('total_return', 'max_drawdown', 'sharpe', 'trades', 'turnover', 'exposure'))
+
+
+def _bars(signals):
+    """손으로 만든 5개 봉: 시가 10, 11, 12, ... / 종가 = 시가 + 0.5"""
+    times = pd.date_range('2025-03-10 10:00', periods=len(signals), freq='15min', tz='America/New_York')
+    opens = 10.0 + np.arange(len(signals))
+    return pd.DataFrame({'open': opens, 'close': opens + 0.5,
+                         'buy_signal': [s == 'buy' for s in signals],
+                         'sell_signal': [s == 'sell' for s in signals]}, index=times)
+
+
+def test_fills_at_next_bar_open_with_costs():
+    df = _bars(['buy', None, 'sell', None, None])
+    curve, trades = backtest.simulate(df, slippage_bps=10, commission_bps=5, initial_capital=1000)
+
+    assert list(curve['position']) == [0, 1, 1, 0, 0]  # 시그널 다음 봉부터 보유
+    assert len(trades) == 1
+    trade = trades.iloc[0]
+    assert trade['entry_time'] == df.index[1] and trade['exit_time'] == df.index[3]
+    assert trade['entry_price'] == pytest.approx(11 * 1.001)  # 다음 봉 시가 + 슬리피지
+    assert trade['exit_price'] == pytest.approx(13 * 0.999)
+    assert trade['return'] == pytest.approx(13 * 0.999 * 0.9995 / (11 * 1.001 * 1.0005) - 1)
+    assert trade['bars_held'] == 2
+
+    cost = 15 / 1e4  # 진입 / 청산 봉에서 슬리피지 + 수수료
+    expected = [0.0, 11.5 / 11 - 1 - cost, (12 / 11.5) * (12.5 / 12) - 1, 13 / 12.5 - 1 - cost, 0.0]
+    np.testing.assert_allclose(curve['return'], expected)
+    assert curve['equity'].iloc[-1] == pytest.approx(1000 * np.prod(1 + np.array(expected)))
+
+
+def test_open_trade_and_conflicting_signals():
+    df = _bars(['buy', 'sell', None, 'buy', None])
+    df.loc[df.index[1], 'buy_signal'] = True  # 같은 봉에 매수·매도 → 무시
+    curve, trades = backtest.simulate(df, slippage_bps=0, commission_bps=0)
+    assert list(curve['position']) == [0, 1, 1, 1, 1]
+    assert len(trades) == 1 and pd.isna(trades.iloc[0]['exit_time']) and trades.iloc[0]['bars_held'] == 4
+
+
+def test_sharpe_annualized_by_bars_per_session():
+    # 04:00 ~ 20:00 확장 세션 15분봉 이틀 → 거래일당 64봉
+    times = pd.DatetimeIndex([t for d in ('2025-03-10', '2025-03-11')
+                              for t in pd.date_range(f'{d} 04:00', f'{d} 19:45', freq='15min')])
+    returns = np.random.default_rng(3).normal(0.0005, 0.01, len(times))
+    curve = pd.DataFrame({'position': 1.0, 'return': returns, 'equity': 10_000 * np.cumprod(1 + returns)},
+                         index=times)
+    stats = backtest.summarize(curve, pd.DataFrame({'exit_price': [], 'return': []}), interval=15)
+    assert stats['sharpe'] == pytest.approx(returns.mean() / returns.std() * np.sqrt(252 * 64))
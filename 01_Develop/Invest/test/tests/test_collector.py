@@ -0,0 +1,29 @@
+import pandas as pd
+
+import collector
+import main_api
+
+
+def _output2(start, n):
+    """최신순 분봉 응답 (output2)"""
+    times = pd.date_range(start, periods=n, freq='1min')[::-1]
+    return pd.DataFrame({'xymd': times.strftime('%Y%m%d'), 'xhms': times.strftime('%H%M%S'), 'open': '1',
+                         'high': '2', 'low': '0.5', 'last': [str(t.minute) for t in times], 'evol': '10'})
+
+
+def test_fetch_symbol_pages_backwards_without_duplicates(monkeypatch):
+    calls = []
+    pages = [_output2('2025-03-10 10:00', 5), _output2('2025-03-10 09:56', 5), pd.DataFrame()]
+
+    def fake(**kwargs):
+        calls.append(kwargs['keyb'])
+        return pages[len(calls) - 1]
+
+    monkeypatch.setattr(main_api, 'get_overseas_price_quot_inquire_time_itemchartprice', fake)
+    df = collector.fetch_symbol('AMS', 'SOXL', pages=3)
+
+    assert calls == ['', '20250310100000', '20250310095600']  # 페이지 첫 봉 = 다음 keyb
+    assert list(df.columns) == collector.MINUTE_BAR_COLUMNS
+    assert list(df['datetime']) == list(pd.date_range('2025-03-10 09:56', '2025-03-10 10:04', freq='1min'))
+    assert (df['symbol'] == 'SOXL').all() and (df['excd'] == 'AMS').all()
+    assert list(df['close']) == [float(t.minute) for t in df['datetime']]
@@ -0,0 +1,70 @@
+from datetime import datetime
+
+import pandas as pd
+
+import gap_planner
+import main_api
+
+
+def _chart_api(traded, calls):
+    """traded(체결 있는 분) 기준으로 keyb 이전 nrec 개를 최신순으로 돌려주는 분봉 API 대역"""
+    def fetch(keyb="", nrec="120", **kwargs):
+        calls.append(keyb)
+        end = pd.Timestamp(datetime.strptime(keyb, '%Y%m%d%H%M%S'))
+        page = traded[traded < end][-int(nrec):][::-1]
+        n = len(page)
+        return pd.DataFrame({
+            'xymd': page.strftime('%Y%m%d'), 'xhms': page.strftime('%H%M%S'),
+            'open': ['1'] * n, 'high': ['1'] * n, 'low': ['1'] * n, 'last': ['1'] * n, 'evol': ['10'] * n,
+        })
+    return fetch
+
+
+def test_expected_minutes_cover_extended_session():
+    day = gap_planner.expected_minutes('2025-03-10 00:00', '2025-03-10 23:59')
+    assert day[0] == pd.Timestamp('2025-03-10 04:00') and day[-1] == pd.Timestamp('2025-03-10 19:59')
+    assert len(day) == 960
+
+    early = gap_planner.expected_minutes('2025-11-28 00:00', '2025-11-28 23:59')  # 추수감사절 다음날 13:00 폐장
+    assert early[-1] == pd.Timestamp('2025-11-28 16:59')
+    assert len(gap_planner.expected_minutes('2025-11-27 00:00', '2025-11-27 23:59')) == 0  # 휴장
+
+
+def test_find_gaps_joins_overnight_gap():
+    minutes = gap_planner.expected_minutes('2025-03-10 04:00', '2025-03-11 19:59')
+    stored = minutes[(minutes < pd.Timestamp('2025-03-10 19:50')) | (minutes >= pd.Timestamp('2025-03-11 04:10'))]
+    gaps = gap_planner.find_gaps(stored, minutes[0], minutes[-1])
+    assert gaps == [(pd.Timestamp('2025-03-10 19:50'), pd.Timestamp('2025-03-11 04:09'), 20)]
+
+
+def test_fetch_pages_overnight_and_no_trade_minutes(monkeypatch):
+    start, end = pd.Timestamp('2025-03-10 18:00'), pd.Timestamp('2025-03-11 06:00')
+    minutes = gap_planner.expected_minutes(start, end)
+    no_trade = minutes[(minutes >= pd.Timestamp('2025-03-11 05:00')) & (minutes < pd.Timestamp('2025-03-11 05:10'))]
+    traded = minutes.difference(no_trade)
+    calls = []
+    monkeypatch.setattr(main_api, 'get_overseas_price_quot_inquire_time_itemchartprice', _chart_api(traded, calls))
+
+    gaps, pages = gap_planner.plan([], start, end)
+    recorded = []
+    df = gap_planner.fetch_pages('AMS', 'SOXL', pages, empty_sink=recorded.extend)
+
+    # 한 번 실행으로 밤사이 구간까지 모두 복구 (페이지당 1회 조회)
+    assert list(df['datetime']) == list(traded)
+    assert len(calls) == len(pages)
+    assert list(recorded) == list(no_trade)
+
+    # 체결 없던 분을 같이 넘기면 다음 실행에서는 조회할 구간이 없음
+    gaps, pages = gap_planner.plan(list(df['datetime']) + recorded, start, end)
+    assert gaps == [] and pages == []
+
+
+def test_unconfirmed_trailing_minutes_are_not_recorded(monkeypatch):
+    start, end = pd.Timestamp('2025-03-10 10:00'), pd.Timestamp('2025-03-10 10:29')
+    minutes = gap_planner.expected_minutes(start, end)
+    traded = minutes[minutes < pd.Timestamp('2025-03-10 10:20')]  # 마지막 10분은 아직 응답에 없음
+    monkeypatch.setattr(main_api, 'get_overseas_price_quot_inquire_time_itemchartprice', _chart_api(traded, []))
+
+    recorded = []
+    gap_planner.fetch_pages('AMS', 'SOXL', gap_planner.plan([], start, end)[1], empty_sink=recorded.extend)
+    assert recorded == []
@@ -0,0 +1,157 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+import indicator_stream
+import main_s
+
+COLUMNS = ['MACD', 'Signal', 'RSI', 'MA20', 'UpperBB', 'lowerBB', 'Hedging_Upper', 'Hedging_Lower', 'Hedging_Center']
+
+
+def _bars(days=('2025-03-10', '2025-03-11', '2025-03-12'), seed=7):
+    """정규장 15분봉 랜덤워크 (폐장 10분 전 강제 청산 구간 포함)"""
+    times = pd.DatetimeIndex([t for d in days for t in pd.date_range(f'{d} 09:30', f'{d} 15:45', freq='15min')])
+    rng = np.random.default_rng(seed)
+    close = 20 + np.cumsum(rng.normal(0, 0.3, len(times)))
+    spread = np.abs(rng.normal(0, 0.2, len(times)))
+    return pd.DataFrame({'time': times, 'open': close + rng.normal(0, 0.1, len(times)), 'high': close + spread,
+                         'low': close - spread, 'close': close, 'volume': rng.integers(100, 1000, len(times))})
+
+
+def test_engine_matches_batch_signals():
+    df = _bars()
+    batch = main_s.compute_signals(df, {'rsi': True})
+    engine = indicator_stream.IndicatorEngine({'rsi': True})
+    stream = pd.DataFrame([engine.update(bar) for bar in batch.reset_index()[['time', 'open', 'high', 'low', 'close']]
+                          .to_dict('records')]).set_index('time')
+
+    for col in COLUMNS:
+        np.testing.assert_allclose(stream[col].to_numpy(float), batch[col].to_numpy(float), rtol=1e-9, atol=1e-9,
+                                   err_msg=col)
+    assert batch['buy_signal'].any() and batch['sell_signal'].any()
+    assert (stream['buy_signal'].to_numpy() == batch['buy_signal'].to_numpy()).all()
+    assert (stream['sell_signal'].to_numpy() == batch['sell_signal'].to_numpy()).all()
+
+
+def test_rolling_window_matches_pandas_over_long_stream():
+    values = 1e4 + np.random.default_rng(1).normal(0, 1, 5000)  # 큰 평균 + 작은 분산 (누적 오차 확인)
+    values[100] = float('nan')
+    win = indicator_stream.RollingWindow(20)
+    means, stds = [], []
+    for v in values:
+        win.push(float(v))
+        means.append(win.mean())
+        stds.append(win.std())
+    s = pd.Series(values)
+    np.testing.assert_allclose(means, s.rolling(20).mean(), rtol=1e-12)
+    np.testing.assert_allclose(stds, s.rolling(20).std(), rtol=1e-6)
+
+    restored = indicator_stream.RollingWindow(20)
+    restored.load_state(win.state_dict())
+    assert math.isclose(restored.std(), win.std(), rel_tol=1e-9)
+
+
+CUSTOM = {'rsi': True, 'macd_fast': 8, 'macd_slow': 21, 'macd_signal': 5, 'rsi_window': 10, 'bb_window': 10,
+          'bb_k': 1.5, 'hb_window': 15, 'hb_atr_window': 10, 'hb_k': 1.5}
+
+
+def _stream(df, config=None, frame_bars=160):
+    engine = indicator_stream.IndicatorEngine(config, frame_bars)
+    bars = main_s.prepare_frame(df).reset_index()[['time', 'open', 'high', 'low', 'close']].to_dict('records')
+    return pd.DataFrame([engine.update(bar) for bar in bars]).set_index('time')
+
+
+def test_engine_uses_signal_config_and_forced_exit():
+    df = _bars(days=[f'2025-03-{d:02d}' for d in range(10, 15)], seed=11)
+    df = df.set_index('time').resample('5min').interpolate().reset_index()  # 5분봉 → 15:50 / 15:55 강제 청산 구간 포함
+    batch = main_s.compute_signals(df, CUSTOM)
+    stream = _stream(df, CUSTOM, frame_bars=len(df))
+    for col in COLUMNS:
+        np.testing.assert_allclose(stream[col].to_numpy(float), batch[col].to_numpy(float), rtol=1e-9, atol=1e-9,
+                                   err_msg=col)
+    assert (stream['buy_signal'].to_numpy() == batch['buy_signal'].to_numpy()).all()
+    assert (stream['sell_signal'].to_numpy() == batch['sell_signal'].to_numpy()).all()
+
+
+def _forced_exit_days():
+    """1일차: 오후 급등(매수) → 15:50 강제 청산, 2일차: 시가 급락(매도) 후 완만한 하락 → 오후 급등(매수)"""
+    rows = []
+    for day, gap in (('2025-03-10', 0.0), ('2025-03-11', -5.0)):
+        times = pd.date_range(f'{day} 09:30', f'{day} 15:55', freq='5min')
+        base = 30.0 + gap
+        for t in times:
+            minutes = (t - t.normalize()).seconds / 60
+            if minutes < 12 * 60:
+                price = base - 0.001 * (minutes - 9.5 * 60)
+            else:
+                price = base * 1.004 ** ((minutes - 12 * 60) / 5)
+            rows.append((t, price))
+        base = rows[-1][1]
+    df = pd.DataFrame(rows, columns=['time', 'close'])
+    df['open'] = df['high'] = df['low'] = df['close']
+    df['volume'] = 100.0
+    return df
+
+
+def test_forced_exit_is_scoped_to_frame_like_batch():
+    df = _forced_exit_days()
+    last_day = df['time'] >= pd.Timestamp('2025-03-11 09:35')
+    frame = int(last_day.sum())  # 2일차 09:35 ~ 15:55 (시가 급락 봉 제외)
+
+    whole = main_s.compute_signals(df)
+    day2 = main_s.compute_signals(df[last_day])
+    at = pd.Timestamp('2025-03-11 15:50', tz='America/New_York')
+    assert not whole.loc[at, 'sell_signal'] and day2.loc[at, 'sell_signal']  # 프레임에 따라 결과가 다름
+
+    assert not _stream(df, frame_bars=len(df)).loc[at, 'sell_signal']
+    assert _stream(df, frame_bars=frame).loc[at, 'sell_signal']
+
+
+def _minutes(days=('2025-03-10', '2025-03-11'), seed=5):
+    times = pd.DatetimeIndex([t for d in days for t in pd.date_range(f'{d} 04:00', f'{d} 19:59', freq='1min')])
+    rng = np.random.default_rng(seed)
+    close = 20 + np.cumsum(rng.normal(0, 0.05, len(times)))
+    df = pd.DataFrame({'time': times, 'open': close, 'high': close + 0.02, 'low': close - 0.02, 'close': close,
+                       'volume': 10.0})
+    return df.drop(index=rng.choice(len(df), 200, replace=False)).reset_index(drop=True)  # 체결 없는 분
+
+
+def test_live_signals_match_batch_and_resume_from_checkpoint(tmp_path):
+    df = _minutes()
+    bars = df.resample('15min', on='time').agg({'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last',
+                                                 'volume': 'sum'}).dropna().reset_index()
+    batch = main_s.compute_signals(bars, CUSTOM)
+
+    path = str(tmp_path / 'indicators.json')
+    live = indicator_stream.LiveSignals(15, CUSTOM, frame_bars=len(bars), checkpoint_path=path)
+    half = len(df) // 2
+    rows = live.feed(df.iloc[:half])
+    live.save_checkpoint()
+
+    resumed = indicator_stream.LiveSignals(15, CUSTOM, frame_bars=len(bars), checkpoint_path=path)
+    assert resumed.last_minute == df['time'].iloc[half - 1]
+    rows += resumed.feed(df)  # 이미 반영한 분은 건너뜀
+    rows += resumed.flush(df['time'].iloc[-1] + pd.Timedelta(minutes=15))
+    stream = pd.DataFrame(rows).set_index('time')
+
+    assert list(stream.index) == list(batch.index)
+    for col in ('MACD', 'Signal', 'RSI', 'MA20', 'Hedging_Upper', 'Hedging_Lower'):
+        np.testing.assert_allclose(stream[col].to_numpy(float), batch[col].to_numpy(float), rtol=1e-9, err_msg=col)
+    assert (stream['buy_signal'].to_numpy() == batch['buy_signal'].to_numpy()).all()
+    assert (stream['sell_signal'].to_numpy() == batch['sell_signal'].to_numpy()).all()
+
+    other = indicator_stream.LiveSignals(5, CUSTOM, checkpoint_path=path)  # 설정이 다른 체크포인트는 버림
+    assert other.last_minute is None
+
+
+def test_resampler_closes_on_last_minute():
+    r = indicator_stream.BarResampler(15)
+    bar = lambda t: {'time': pd.Timestamp(t), 'open': 1, 'high': 1, 'low': 1, 'close': 1, 'volume': 1}
+    assert r.update(bar('2025-03-10 10:00')) == []
+    closed = r.update(bar('2025-03-10 10:14'))  # 다음 봉을 기다리지 않고 마감
+    assert [b['time'] for b in closed] == [pd.Timestamp('2025-03-10 10:00')]
+    assert r.update(bar('2025-03-10 10:05')) == []  # 이미 닫은 구간의 늦은 봉
+    r.update(bar('2025-03-10 10:16'))
+    assert r.flush(pd.Timestamp('2025-03-10 10:29:59')) == []
+    assert [b['time'] for b in r.flush(pd.Timestamp('2025-03-10 10:30'))] == [pd.Timestamp('2025-03-10 10:15')]
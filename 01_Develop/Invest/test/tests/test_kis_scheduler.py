@@ -0,0 +1,74 @@
+import json
+import threading
+import time
+
+import kis_scheduler
+import kis_simulator
+import kis_transport
+
+
+def _acquire_times(rate, count, workers=8):
+    """여러 스레드에서 동시에 acquire → 토큰 받은 시각(첫 호출 기준 초) 목록"""
+    scheduler = kis_scheduler.RequestScheduler()
+    scheduler.configure('app', rate)
+    times, lock = [], threading.Lock()
+
+    def run(n):
+        for _ in range(n):
+            scheduler.acquire('app')
+            with lock:
+                times.append(time.monotonic())
+
+    threads = [threading.Thread(target=run, args=(count // workers + (i < count % workers),)) for i in range(workers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    times.sort()
+    return [t - times[0] for t in times]
+
+
+def _max_in_window(times, window=1.0):
+    return max(sum(1 for u in times if t <= u < t + window) for t in times)
+
+
+def test_scheduler_never_exceeds_rate_in_any_second():
+    times = _acquire_times(rate=20, count=45)
+    assert len(times) == 45
+    assert _max_in_window(times) <= 20
+
+
+def test_paper_rate_is_evenly_spaced():
+    times = _acquire_times(rate=2, count=3, workers=3)
+    assert _max_in_window(times) == 2
+    assert times[1] >= 0.45 and times[2] >= 0.95
+
+
+def test_throttled_retry_takes_scheduler_token():
+    sim = kis_simulator.KISSimulator(rate_limit=1).start()
+    transport = kis_transport.Transport(retries=3, backoff=0.01)
+    try:
+        token = transport.post(f"{sim.url}/oauth2/tokenP", data=json.dumps({'appkey': 'app'})).json()['access_token']
+        headers = {'appkey': 'app', 'authorization': f'Bearer {token}', 'tr_id': 'HHDFS76200200'}
+        url = f"{sim.url}/uapi/overseas-price/v1/quotations/price-detail"
+        params = {'EXCD': 'AMS', 'SYMB': 'SOXL'}
+
+        scheduler = kis_scheduler.RequestScheduler()
+        scheduler.configure('app', 1)
+        resends = []
+
+        def throttle():
+            resends.append(scheduler.acquire('app'))
+
+        throttle()
+        assert transport.get(url, headers=headers, params=params, throttle=throttle).status_code == 200
+        assert len(resends) == 1  # 첫 전송은 한도 안 → 재전송 없음
+
+        res = transport.get(url, headers=headers, params=params, throttle=throttle)  # 같은 1초 안 → EGW00201
+        assert res.status_code == 200
+        throttled = sim.stats()['/uapi/overseas-price/v1/quotations/price-detail']['throttled']
+        assert throttled >= 1 and len(resends) == 1 + throttled  # 재전송마다 스케줄러 토큰
+        assert resends[1] > 0.5  # 백오프(0.01초)가 아니라 다음 토큰까지 대기
+    finally:
+        transport.close()
+        sim.stop()
@@ -0,0 +1,86 @@
+import asyncio
+
+import pandas as pd
+
+import kis_stream
+
+AES_KEY = 'k' * 32  # AES-256
+AES_IV = 'i' * 16
+
+TICKS = [
+    ('DAMSSOXL', '2025-03-10 10:00:05', 20.10, 100),
+    ('DAMSSOXL', '2025-03-10 10:00:20', 20.35, 50),
+    ('DAMSSOXL', '2025-03-10 10:00:59', 20.05, 25),
+    ('DAMSSOXL', '2025-03-10 10:01:00', 20.00, 10),
+    ('DAMSSOXL', '2025-03-10 10:01:30', 19.80, 40),
+    ('DNASTQQQ', '2025-03-10 10:01:31', 70.00, 5),   # 구독하지 않은 종목
+    ('DAMSSOXL', '2025-03-10 10:03:10', 20.20, 60),  # 10:02 는 체결 없음
+]
+NOTICE = ['testid', '8765432101', '0000000001', '', '02', '0', '00', 'SOXL', '1', '20.05', '100000',
+          '0', '2', '', '', '1', '', 'SOXL', '', '', '', '', '', '', '20.050000000000']
+
+
+def _expected_bars():
+    df = pd.DataFrame([t for t in TICKS if t[0] == 'DAMSSOXL'], columns=['tr_key', 'datetime', 'price', 'volume'])
+    df['datetime'] = pd.to_datetime(df['datetime']).dt.floor('min')
+    bars = df.groupby('datetime').agg(open=('price', 'first'), high=('price', 'max'), low=('price', 'min'),
+                                      close=('price', 'last'), volume=('volume', 'sum')).reset_index()
+    return [{'symbol': 'SOXL', **row} for row in bars.to_dict('records')]
+
+
+async def _until(cond, timeout=5.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not cond():
+        assert loop.time() < deadline, "timeout"
+        await asyncio.sleep(0.02)
+
+
+async def _run_stream():
+    server = await kis_stream.mock_server(port=0, ticks=TICKS, aes_key=AES_KEY, aes_iv=AES_IV, notices=[NOTICE],
+                                          interval=0.001)
+    port = server.sockets[0].getsockname()[1]
+    bars, ticks, notices = [], [], []
+    stream = kis_stream.KISStream('vps', [("AMS", "SOXL")], on_bar=bars.append, hts_id='testid',
+                                  on_tick=lambda *t: ticks.append(t), on_notice=notices.append,
+                                  url=f'ws://127.0.0.1:{port}', approval_key='test-approval', reconnect_delay=0.05)
+    task = asyncio.create_task(stream.run())
+    try:
+        n = sum(1 for t in TICKS if t[0] == 'DAMSSOXL')
+        await _until(lambda: len(bars) == 3 and len(notices) == 1)
+        first = list(bars)
+
+        for conn in list(server.connections):  # 서버 쪽에서 끊기 → 재접속 · 재구독
+            await conn.close()
+        await _until(lambda: len(ticks) == 2 * n and len(notices) == 2)
+        return stream, first, bars, notices
+    finally:
+        stream.stop()
+        await asyncio.wait_for(task, 5)
+        server.close()
+        await server.wait_closed()
+
+
+def test_stream_bars_notice_and_resubscribe():
+    stream, first, bars, notices = asyncio.run(_run_stream())
+
+    assert first == _expected_bars()  # 틱 → 1분봉 (빈 10:02 는 봉 없음)
+    assert stream.keys == {'H0GSCNI9': (AES_KEY, AES_IV)}
+    assert notices[0] == dict(zip(kis_stream.NOTICE_COLUMNS, NOTICE))  # AES 복호화
+
+    # 재구독 후 다시 온 틱은 이미 마감한 분 → 봉을 다시 만들지 않음
+    builder = stream.builders['DAMSSOXL']
+    assert bars == first and builder.late_ticks == sum(1 for t in TICKS if t[0] == 'DAMSSOXL')
+    assert notices[1] == notices[0]
+
+
+def test_parse_frame_decrypts_notice():
+    from base64 import b64encode
+    from Crypto.Cipher import AES
+    from Crypto.Util.Padding import pad
+
+    cipher = AES.new(AES_KEY.encode(), AES.MODE_CBC, AES_IV.encode())
+    body = b64encode(cipher.encrypt(pad('^'.join(NOTICE).encode(), AES.block_size))).decode()
+    kind, tr_id, records = kis_stream.parse_frame(f"1|H0GSCNI0|001|{body}", {'H0GSCNI0': (AES_KEY, AES_IV)})
+    assert (kind, tr_id) == ('data', 'H0GSCNI0')
+    assert records == [dict(zip(kis_stream.NOTICE_COLUMNS, NOTICE))]
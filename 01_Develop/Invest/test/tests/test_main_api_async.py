@@ -0,0 +1,57 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import requests
+
+import kis_scheduler
+import kis_simulator
+import main_api_async
+
+PRICE_URL = '/uapi/overseas-price/v1/quotations/price-detail'
+
+
+class _Client:
+    """AsyncKIS(client=) 용 최소 클라이언트 (시뮬레이터 주소 + 초당 1건 스케줄러)"""
+
+    def __init__(self, url, token):
+        self.env = SimpleNamespace(my_url=url)
+        self.is_paper = False
+        self.token = token
+        self.scheduler = kis_scheduler.RequestScheduler()
+        self.scheduler.configure('app', 1)
+        self.waits = []
+
+    def base_header(self):
+        return {'content-type': 'application/json', 'appkey': 'app', 'authorization': f'Bearer {self.token}'}
+
+    def throttle(self, tr_id, level=None):
+        self.waits.append(self.scheduler.acquire('app') if level is None else self.scheduler.acquire('app', level))
+
+
+def test_throttled_fetch_is_resent_with_scheduler_token():
+    sim = kis_simulator.KISSimulator(rate_limit=1).start()
+    try:
+        token = requests.post(f"{sim.url}/oauth2/tokenP", data=json.dumps({'appkey': 'app'})).json()['access_token']
+        client = _Client(sim.url, token)
+        # 스케줄러를 거치지 않은 호출로 이번 1초 한도를 먼저 소진 → 첫 전송은 EGW00201
+        requests.get(f"{sim.url}{PRICE_URL}", params={'EXCD': 'AMS', 'SYMB': 'SOXL'},
+                     headers={**client.base_header(), 'tr_id': 'HHDFS76200200'})
+
+        async def run():
+            async with main_api_async.AsyncKIS(client=client, backoff=0.01) as api:
+                return await api.get_overseas_price_quot_price_detail(excd='AMS', itm_no='SOXL')
+
+        assert asyncio.run(run()) == sim.last_price('SOXL')
+        assert sim.stats()[PRICE_URL]['throttled'] == 1
+        assert len(client.waits) == 2 and client.waits[1] > 0.5  # 재전송 전 다음 토큰까지 대기
+    finally:
+        sim.stop()
+
+
+def test_should_retry_matches_transport():
+    throttled = json.dumps({'rt_cd': '1', 'msg_cd': 'EGW00201'})
+    assert main_api_async._should_retry('POST', 500, throttled)
+    assert main_api_async._should_retry('GET', 503, 'Service Unavailable')
+    assert not main_api_async._should_retry('POST', 503, 'Service Unavailable')  # 주문은 재전송하지 않음
+    assert not main_api_async._should_retry('GET', 200, '{}')
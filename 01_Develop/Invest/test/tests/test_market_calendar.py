@@ -0,0 +1,85 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import market_calendar
+
+
+@pytest.mark.parametrize('day, trading', [
+    (date(2025, 1, 1), False),    # 신정
+    (date(2025, 1, 9), False),    # 임시 휴장 (국장일)
+    (date(2025, 1, 20), False),   # MLK
+    (date(2025, 2, 17), False),   # 대통령의 날
+    (date(2025, 4, 18), False),   # 성금요일
+    (date(2025, 5, 26), False),   # 메모리얼 데이
+    (date(2025, 6, 19), False),   # 준틴스
+    (date(2021, 6, 18), True),    # 준틴스 지정(2022) 이전
+    (date(2025, 7, 4), False),    # 독립기념일
+    (date(2026, 7, 3), False),    # 독립기념일 토요일 → 금요일 대체
+    (date(2025, 9, 1), False),    # 노동절
+    (date(2025, 11, 27), False),  # 추수감사절
+    (date(2025, 12, 25), False),  # 성탄절
+    (date(2021, 12, 31), True),   # 신정이 토요일 → 전년도 12/31 정상 개장
+    (date(2025, 3, 8), False),    # 토요일
+    (date(2025, 3, 10), True),
+])
+def test_holidays(day, trading):
+    assert market_calendar.is_trading_day(day) is trading
+
+
+@pytest.mark.parametrize('day, close', [
+    (date(2025, 7, 3), '13:00'),    # 독립기념일 전날
+    (date(2025, 11, 28), '13:00'),  # 추수감사절 다음날
+    (date(2025, 12, 24), '13:00'),  # 성탄 전야
+    (date(2026, 12, 24), '13:00'),
+    (date(2026, 7, 2), '16:00'),    # 7/3 이 대체 휴장이면 조기 폐장 없음
+    (date(2025, 12, 23), '16:00'),
+])
+def test_half_day_close(day, close):
+    open_, close_ = market_calendar.session(day)
+    assert open_.strftime('%H:%M') == '09:30' and close_.strftime('%H:%M') == close
+    assert market_calendar.extended_session(day)[1] - close_ == market_calendar.AFTER_HOURS
+
+
+@pytest.mark.parametrize('utc, expected', [
+    ('2025-03-07 20:00', 60),    # EST: 15:00 뉴욕
+    ('2025-03-10 19:00', 60),    # DST 시작 다음 거래일, EDT: 15:00 뉴욕
+    ('2025-03-10 20:00', 0),     # 16:00 폐장
+    ('2025-10-31 19:30', 30),    # EDT 마지막 거래일
+    ('2025-11-03 20:00', 60),    # DST 종료 다음 거래일, EST: 15:00 뉴욕
+    ('2025-11-28 17:00', 60),    # 조기 폐장 13:00 (EST)
+    ('2025-07-03 16:00', 60),    # 조기 폐장 13:00 (EDT)
+    ('2025-07-04 16:00', np.nan),  # 휴장일
+])
+def test_minutes_to_close_across_dst(utc, expected):
+    index = pd.DatetimeIndex([pd.Timestamp(utc, tz='UTC')])
+    np.testing.assert_equal(market_calendar.minutes_to_close(index), [expected])
+    if not np.isnan(expected):
+        assert market_calendar.minutes_left(index[0]) == expected  # 단일 시각 버전과 동일
+
+
+@pytest.mark.parametrize('ts, with_close, without_close', [
+    ('2025-03-10 09:29', False, False),
+    ('2025-03-10 09:30', True, True),
+    ('2025-03-10 15:59', True, True),
+    ('2025-03-10 16:00', True, False),  # 폐장 시각 봉
+    ('2025-03-10 16:01', False, False),
+    ('2025-11-28 13:00', True, False),  # 조기 폐장
+    ('2025-11-28 13:01', False, False),
+    ('2025-11-27 10:00', False, False),  # 휴장일
+    ('2025-03-08 10:00', False, False),  # 주말
+])
+def test_regular_hours_mask(ts, with_close, without_close):
+    naive = pd.DatetimeIndex([pd.Timestamp(ts)])
+    utc = naive.tz_localize('America/New_York').tz_convert('UTC')
+    for index in (naive, utc):
+        assert market_calendar.regular_hours_mask(index).tolist() == [with_close]
+        assert market_calendar.regular_hours_mask(index, include_close=False).tolist() == [without_close]
+    assert market_calendar.is_regular(naive[0]) is with_close
+
+
+def test_regular_hours_mask_matches_scalar_over_dst_weeks():
+    index = pd.date_range('2025-03-06', '2025-03-12', freq='30min', tz='UTC')
+    assert market_calendar.regular_hours_mask(index).tolist() == [market_calendar.is_regular(t) for t in index]
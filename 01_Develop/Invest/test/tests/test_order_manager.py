@@ -0,0 +1,125 @@
+import os
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+import kis_auth as kis
+import kis_client
+import kis_simulator
+import main_api
+import market_calendar
+import order_manager
+
+
+class _Res:
+    def __init__(self, ok=True, odno="0000000001", msg="정상처리"):
+        self.ok, self.odno, self.msg = ok, odno, msg
+
+    def isOK(self):
+        return self.ok
+
+    def getErrorCode(self):
+        return "APBK0001"
+
+    def getErrorMessage(self):
+        return self.msg
+
+    def getBody(self):
+        return SimpleNamespace(output={'ODNO': self.odno})
+
+
+class _FakeClient:
+    """주문은 순서대로 접수 / 거부, 잔고는 holdings[거래소] 로 응답하는 클라이언트 대역"""
+    svr = 'vps'
+    env = SimpleNamespace(my_acct="87654321", my_prod="01")
+
+    def __init__(self, reject=()):
+        self.reject = set(reject)
+        self.sent = []
+        self.holdings = {}
+
+    def fetch(self, api_url, tr_id, tr_cont, params, postFlag=False):
+        self.sent.append((tr_id, params))
+        if params['PDNO'] in self.reject:
+            return _Res(ok=False, msg="주문가능금액을 초과 하였습니다")
+        return _Res(odno=f"{len(self.sent):010d}")
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    client = _FakeClient(reject={'TQQQ'})
+
+    def balance(svr, excg_cd="", client=None, output="output2", **kwargs):
+        rows = [{'ovrs_pdno': s, 'ovrs_cblc_qty': str(q)} for s, q in client.holdings.get(excg_cd, {}).items()]
+        return pd.DataFrame(rows)
+
+    monkeypatch.setattr(main_api, 'get_overseas_inquire_balance', balance)
+    monkeypatch.setattr(market_calendar, 'phase', lambda now: 'open')
+    return client
+
+
+def test_order_lifecycle_and_journal_replay(fake, tmp_path):
+    journal = str(tmp_path / 'orders.jsonl')
+    orders = order_manager.OrderManager(fake, journal_path=journal)
+    fake.holdings = {'AMEX': {'SOXL': 10}}
+    orders.reconcile()  # 기준점
+
+    first = orders.wait(orders.submit('buy', 'AMS', 'SOXL', qty=3, price=20.5, key='a').key)
+    second = orders.wait(orders.submit('buy', 'AMS', 'SOXL', qty=2, price=20.5, key='b').key)
+    rejected = orders.wait(orders.submit('buy', 'NAS', 'TQQQ', qty=1, price=70, key='c').key)
+    assert (first.state, second.state, rejected.state) == ('acked', 'acked', 'rejected')
+    assert fake.sent[0][0] == 'VTTT1002U' and fake.sent[0][1]['OVRS_EXCG_CD'] == 'AMEX'
+    assert fake.sent[0][1]['OVRS_ORD_UNPR'] == '20.50'
+
+    assert orders.submit('buy', 'AMS', 'SOXL', qty=3, price=20.5, key='a') is first  # 같은 key → 재주문 없음
+    assert len(fake.sent) == 3
+
+    fake.holdings = {'AMEX': {'SOXL': 14}}  # 4주 체결 → 먼저 낸 주문부터 배분
+    orders.reconcile()
+    assert (first.state, first.filled_qty, second.state, second.filled_qty) == ('filled', 3, 'partial', 1)
+
+    fake.holdings = {'AMEX': {'SOXL': 15}}
+    orders.reconcile()
+    assert (second.state, second.filled_qty) == ('filled', 2)
+    orders.stop()
+
+    replayed = order_manager.OrderManager(fake, journal_path=journal)
+    assert {k: o.state for k, o in replayed.orders.items()} == {'a': 'filled', 'b': 'filled', 'c': 'rejected'}
+    replayed.stop()
+
+
+def test_reconcile_queries_exchange_of_open_orders(fake):
+    orders = order_manager.OrderManager(fake)
+    fake.holdings = {'NASD': {'TQQQ': 5}, 'AMEX': {'SOXL': 1}}
+    orders.reconcile()
+    assert orders.positions == {'TQQQ': 5.0, 'SOXL': 1.0}
+
+    order = orders.wait(orders.submit('sell', 'AMS', 'SOXL', qty=1, price=20, key='s').key)
+    fake.holdings = {'NASD': {}, 'AMEX': {}}  # SOXL 매도 체결, NASD 는 조회 안 함 → 이전 잔고 유지
+    orders.reconcile()
+    assert order.state == 'filled'
+    assert orders.positions == {'TQQQ': 5.0}
+    orders.stop()
+
+
+def test_paper_fill_on_amex_is_reconciled(monkeypatch, tmp_path):
+    sim = kis_simulator.KISSimulator().start()
+    cfg = kis.getEnv()
+    monkeypatch.setitem(cfg, 'paper_url', sim.url)
+    monkeypatch.setattr(kis._tokens, 'paths', {svr: os.path.join(tmp_path, f'KIS_{svr}') for svr in kis._tokens.paths})
+    monkeypatch.setattr(kis._tokens, '_tokens', {})
+    client = kis_client.KISClient('vps')
+    orders = order_manager.OrderManager(client)
+    try:
+        orders.reconcile()
+        price = round(sim.last_price('SOXL') * 1.05, 2)  # 현재가보다 높은 매수 지정가 → 바로 체결
+        order = orders.wait(orders.submit('buy', 'AMS', 'SOXL', qty=2, price=price).key)
+        assert order.state == 'acked'
+        orders.reconcile()
+        assert (order.state, order.filled_qty) == ('filled', 2)
+        assert orders.positions['SOXL'] == 2.0
+    finally:
+        orders.stop()
+        client.close()
+        sim.stop()
@@ -0,0 +1,22 @@
+import pandas as pd
+
+import page_buffer
+
+
+def _page(start, n):
+    times = pd.date_range(start, periods=n, freq='1min')
+    return pd.DataFrame({'datetime': times, 'open': 1.0, 'high': 1.0, 'low': 1.0, 'close': 1.0, 'volume': 1.0})
+
+
+def test_flush_keeps_only_last_batch_keys():
+    flushed = []
+    acc = page_buffer.PageAccumulator(sink=flushed.append, flush_rows=100)
+    # 과거 방향 페이징, 페이지 경계에서 1분씩 겹침
+    for i in range(10):
+        acc.add(_page(pd.Timestamp('2025-03-10 19:59') - pd.Timedelta(minutes=60 * (i + 1)), 61))
+        assert len(acc._seen) <= 2 * 100 + 61
+    assert acc.finish() == 601
+
+    df = pd.concat(flushed)
+    assert df['datetime'].is_unique and len(df) == 601
+    assert all(f['datetime'].is_monotonic_increasing for f in flushed)
@@ -0,0 +1,125 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import quote_cache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(quote_cache, 'time', SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+
+def _counter(values):
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return values[len(calls) - 1]
+    return loader, calls
+
+
+def test_ttl_expiry_per_endpoint(clock):
+    cache = quote_cache.QuoteCache(ttls={'price_detail': 1.0, 'present_balance': 2.0})
+    loader, calls = _counter(['a', 'b', 'c'])
+
+    assert cache.get('price_detail', 'SOXL', loader) == 'a'
+    clock.now += 0.99
+    assert cache.get('price_detail', 'SOXL', loader) == 'a'  # TTL 안 → 캐시
+    clock.now += 0.01
+    assert cache.get('price_detail', 'SOXL', loader) == 'b'  # 만료 → 다시 조회
+
+    assert cache.get('present_balance', 'vps', loader) == 'c'
+    clock.now += 1.5
+    assert cache.get('present_balance', 'vps', loader) == 'c'  # 엔드포인트별 TTL
+    assert len(calls) == 3
+    assert cache.stats()['price_detail'] == {'hits': 1, 'misses': 2, 'coalesced': 0, 'evictions': 0,
+                                             'hit_rate': 1 / 3}
+
+
+def test_lru_eviction(clock):
+    cache = quote_cache.QuoteCache(maxsize=2)
+    cache.get('price_detail', 'A', lambda: 'a')
+    cache.get('price_detail', 'B', lambda: 'b')
+    cache.get('price_detail', 'A', lambda: 'x')  # A 를 최근 사용으로
+    cache.get('price_detail', 'C', lambda: 'c')  # 가장 오래 안 쓴 B 제거
+
+    assert cache.get('price_detail', 'A', lambda: 'x') == 'a'
+    assert cache.get('price_detail', 'B', lambda: 'b2') == 'b2'
+    assert cache.stats()['price_detail']['evictions'] == 2  # B, 그 다음 C
+
+
+def test_none_and_errors_are_not_cached(clock):
+    cache = quote_cache.QuoteCache()
+    loader, calls = _counter([None, 'ok'])
+    assert cache.get('balance', 'k', loader) is None
+    assert cache.get('balance', 'k', loader) == 'ok'  # None 은 캐시하지 않음
+
+    def fail():
+        raise RuntimeError('boom')
+    with pytest.raises(RuntimeError):
+        cache.get('psamount', 'k', fail)
+    assert cache.get('psamount', 'k', lambda: 'ok') == 'ok'
+    assert len(calls) == 2
+
+
+def _concurrent(cache, loader, n=8):
+    """n 스레드가 같은 키를 동시에 조회 → 결과 / 예외 목록"""
+    results, errors = [], []
+
+    def run():
+        try:
+            results.append(cache.get('price_detail', 'SOXL', loader))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(n)]
+    for t in threads:
+        t.start()
+    return threads, results, errors
+
+
+def _wait_coalesced(cache, n, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while cache.stats().get('price_detail', {}).get('coalesced', 0) < n:
+        assert time.monotonic() < deadline, "timeout"
+        time.sleep(0.005)
+
+
+@pytest.mark.parametrize('fails', [False, True])
+def test_in_flight_coalescing(fails):
+    cache = quote_cache.QuoteCache()
+    release, calls = threading.Event(), []
+
+    def loader():
+        calls.append(1)
+        release.wait(5)
+        if fails:
+            raise RuntimeError('boom')
+        return 42.0
+
+    threads, results, errors = _concurrent(cache, loader)
+    _wait_coalesced(cache, 7)  # 나머지 7개는 진행 중인 조회를 기다림
+    release.set()
+    for t in threads:
+        t.join(5)
+
+    assert len(calls) == 1  # HTTP 호출은 1번
+    if fails:
+        assert results == [] and len(errors) == 8 and len({id(e) for e in errors}) == 1  # 같은 예외 전파
+        assert cache.get('price_detail', 'SOXL', lambda: 43.0) == 43.0  # 실패는 캐시하지 않음
+    else:
+        assert results == [42.0] * 8 and errors == []
+        assert cache.stats()['price_detail']['misses'] == 1
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+import main_s
+
+
+def _bars(days=('2025-03-10', '2025-03-11'), interval=15, seed=3):
+    """프리마켓 ~ 애프터마켓 15분봉 랜덤워크 (DB 와 같은 tz 없는 뉴욕 시각)"""
+    times = pd.DatetimeIndex([t for d in days for t in pd.date_range(f'{d} 04:00', f'{d} 19:45', freq=f'{interval}min')])
+    rng = np.random.default_rng(seed)
+    close = 20 + np.cumsum(rng.normal(0, 0.3, len(times)))
+    spread = np.abs(rng.normal(0, 0.2, len(times)))
+    return pd.DataFrame({'time': times, 'open': close, 'high': close + spread, 'low': close - spread,
+                         'close': close, 'volume': 100.0})
+
+
+def test_closed_bar_signal_fires_on_tz_aware_frame():
+    df = main_s.compute_signals(_bars())
+    assert df.index.tz is not None
+    fired = df[df['buy_signal'] | df['sell_signal']]
+    assert fired['buy_signal'].any() and fired['sell_signal'].any()
+
+    for ts, row in fired.iterrows():
+        expected = "buy" if row['buy_signal'] else "sell"
+        naive_now = ts.tz_localize(None) + pd.Timedelta(minutes=15, seconds=2)  # 마감 + 2초 (bar_scheduler)
+        for now in (naive_now.to_pydatetime(), naive_now.tz_localize('America/New_York')):
+            bar = main_s.closed_bar(df, 15, now)  # 뒤에 진행 중인 봉이 있어도 마감 봉 기준
+            assert bar is not None and bar.name == ts
+            assert main_s.bar_signal(bar) == expected
+
+
+def test_closed_bar_only_at_bucket_close():
+    df = main_s.compute_signals(_bars())
+    assert main_s.closed_bar(df, 15, pd.Timestamp('2025-03-10 10:31')) is None  # 마감 시각 아님
+    assert main_s.closed_bar(df, 15, pd.Timestamp('2025-03-12 10:30')) is None  # 데이터 없음
+    assert main_s.bar_signal(None) is None
+    raw = _bars()  # RangeIndex + time 컬럼
+    assert main_s.closed_bar(raw, 15, pd.Timestamp('2025-03-10 10:30'))['time'] == pd.Timestamp('2025-03-10 10:15')
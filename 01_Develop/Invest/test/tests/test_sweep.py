@@ -0,0 +1,46 @@
+import duckdb
+import numpy as np
+import pandas as pd
+import pytest
+
+import backtest
+import sweep
+
+
+def _minutes(days=('2025-03-10', '2025-03-11', '2025-03-12')):
+    times = pd.DatetimeIndex([t for d in days for t in pd.date_range(f'{d} 09:30', f'{d} 15:59', freq='1min')])
+    close = 20 + np.cumsum(np.random.default_rng(4).normal(0, 0.05, len(times)))
+    return pd.DataFrame({'time': times, 'open': close, 'high': close + 0.02, 'low': close - 0.02, 'close': close,
+                         'volume': 10.0})
+
+
+def test_grid_and_random_expansion():
+    params = sweep.grid(macd_fast=[8, 12, 30], macd_slow=[26], interval=[5, 15])
+    assert len(params) == 4  # fast >= slow 조합 제외
+    assert all(p['macd_signal'] == sweep.DEFAULTS['macd_signal'] for p in params)
+
+    picked = sweep.random_search(5, seed=1, macd_fast=[8, 12], macd_slow=[21, 26], rsi_window=[10, 14])
+    keys = {tuple(p[k] for k in sweep.PARAM_COLUMNS) for p in picked}
+    assert len(picked) == len(keys) == 5
+    assert picked == sweep.random_search(5, seed=1, macd_fast=[8, 12], macd_slow=[21, 26], rsi_window=[10, 14])
+
+
+def test_two_worker_sweep_matches_backtest_and_persists():
+    df = _minutes()
+    params = sweep.grid(macd_fast=[8, 12], interval=[5, 15])
+    results = sweep.run_sweep(df, params, max_workers=2)  # 워커는 공유 메모리에서 1분봉을 읽음
+
+    assert len(results) == len(params)
+    assert results['sharpe'].is_monotonic_decreasing
+    for row in results.to_dict('records'):
+        stats = backtest.run(df, interval=row['interval'], macd_fast=row['macd_fast'])['stats']
+        for k in sweep.STAT_COLUMNS:
+            assert row[k] == pytest.approx(float(stats[k])), k
+
+    con = duckdb.connect()
+    sweep_id = sweep.save_results(con, results, sweep_id='t1')
+    top = sweep.top_results(con, order_by='total_return', limit=2)
+    assert sweep_id == 't1' and len(top) == 2
+    assert list(top['total_return']) == sorted(results['total_return'], reverse=True)[:2]
+    with pytest.raises(ValueError):
+        sweep.top_results(con, order_by='sharpe; DROP TABLE sweep_results')